@@ -0,0 +1,309 @@
+import json
+import logging
+import os
+import time
+
+from odoo import Command, fields
+from odoo.tests import tagged
+
+from odoo.addons.account_reconcile_model_oca.tests.common import (
+    TestAccountReconciliationCommon,
+)
+
+_logger = logging.getLogger(__name__)
+
+# Volumes can be tuned from the environment so that the same suite can be used
+# as a quick smoke run on a laptop and as the full benchmark on a staging box:
+#
+#   RECONCILE_BENCH_OPEN_ITEMS=100000 RECONCILE_BENCH_STATEMENT_LINES=10000 \
+#   RECONCILE_BENCH_REPORT=/tmp/reconcile_bench.json \
+#   odoo-bin -d bench -i account_reconcile_oca --test-tags reconcile_benchmark
+OPEN_ITEMS = int(os.environ.get("RECONCILE_BENCH_OPEN_ITEMS", 100000))
+STATEMENT_LINES = int(os.environ.get("RECONCILE_BENCH_STATEMENT_LINES", 10000))
+SAMPLE_SIZE = int(os.environ.get("RECONCILE_BENCH_SAMPLE", 1000))
+PARTNERS = int(os.environ.get("RECONCILE_BENCH_PARTNERS", 2000))
+REPORT_PATH = os.environ.get("RECONCILE_BENCH_REPORT")
+LINES_PER_MOVE = 500
+CREATE_BATCH = 1000
+
+
+@tagged("post_install", "-at_install", "-standard", "reconcile_benchmark")
+class TestReconcileBenchmark(TestAccountReconciliationCommon):
+    """Throughput benchmark for the statement matching pipeline.
+
+    It is excluded from the standard test run and only executed with
+    ``--test-tags reconcile_benchmark``. Results are logged and, when
+    ``RECONCILE_BENCH_REPORT`` is set, written as JSON so that two runs
+    (before / after a matching change) can be compared.
+    """
+
+    @classmethod
+    def _setup_context(cls):
+        return {
+            **cls.env.context,
+            "tracking_disable": True,
+            "mail_notrack": True,
+            "mail_create_nolog": True,
+        }
+
+    @classmethod
+    def setUpClass(cls, chart_template_ref=None):
+        super().setUpClass(chart_template_ref=chart_template_ref)
+        cls.env = cls.env(context=cls._setup_context())
+        cls.env["account.reconcile.model"].search(
+            [("company_id", "=", cls.company.id)]
+        ).active = False
+        cls.bank_journal_euro.suspense_account_id = (
+            cls.env.company.account_journal_suspense_account_id
+        )
+        cls.writeoff_account = cls.env["account.account"].search(
+            [
+                ("account_type", "=", "asset_current"),
+                ("company_id", "=", cls.company.id),
+            ],
+            limit=1,
+        )
+        cls.matching_rule = cls.env["account.reconcile.model"].create(
+            {
+                "name": "Benchmark invoice matching",
+                "sequence": 1,
+                "rule_type": "invoice_matching",
+                "auto_reconcile": False,
+                "match_nature": "both",
+                "match_partner": False,
+                "match_text_location_label": True,
+                "match_text_location_reference": True,
+                "allow_payment_tolerance": True,
+                "payment_tolerance_type": "percentage",
+                "payment_tolerance_param": 0.0,
+                "company_id": cls.company.id,
+            }
+        )
+        cls.writeoff_rule = cls.env["account.reconcile.model"].create(
+            {
+                "name": "Benchmark write-off suggestion",
+                "sequence": 10,
+                "rule_type": "writeoff_suggestion",
+                "auto_reconcile": False,
+                "match_label": "contains",
+                "match_label_param": "BANK FEE",
+                "company_id": cls.company.id,
+                "line_ids": [
+                    Command.create(
+                        {"account_id": cls.writeoff_account.id, "label": "Fee"}
+                    )
+                ],
+            }
+        )
+        cls.partners = cls.env["res.partner"].create(
+            [
+                {"name": "Bench Partner %05d" % index, "is_company": True}
+                for index in range(PARTNERS)
+            ]
+        )
+        started = time.time()
+        cls.open_items = cls._seed_open_items()
+        cls.statement_lines = cls._seed_statement_lines()
+        _logger.info(
+            "Reconcile benchmark seeded %s open items and %s statement lines in %.1fs",
+            len(cls.open_items),
+            len(cls.statement_lines),
+            time.time() - started,
+        )
+        cls.report = {
+            "open_items": len(cls.open_items),
+            "statement_lines": len(cls.statement_lines),
+            "sample_size": SAMPLE_SIZE,
+            "metrics": {},
+        }
+
+    @classmethod
+    def tearDownClass(cls):
+        report = json.dumps(cls.report, indent=2, sort_keys=True)
+        _logger.info("Reconcile benchmark report:\n%s", report)
+        if REPORT_PATH:
+            with open(REPORT_PATH, "w") as report_file:
+                report_file.write(report)
+        super().tearDownClass()
+
+    @classmethod
+    def _bench_reference(cls, index):
+        return "INV/BENCH/%06d" % index
+
+    @classmethod
+    def _seed_open_items(cls):
+        """Create ``OPEN_ITEMS`` receivable/payable lines.
+
+        Lines are grouped in large balanced journal entries so that the seed
+        does not depend on the invoice machinery and stays reasonably fast.
+        """
+        receivable = cls.company_data["default_account_receivable"]
+        payable = cls.company_data["default_account_payable"]
+        counterpart = cls.company_data["default_account_revenue"]
+        journal = cls.company_data["default_journal_misc"]
+        date = fields.Date.today()
+        move_vals_list = []
+        for start in range(0, OPEN_ITEMS, LINES_PER_MOVE):
+            line_vals = []
+            total = 0.0
+            for index in range(start, min(start + LINES_PER_MOVE, OPEN_ITEMS)):
+                amount = 10.0 + (index % 997)
+                is_payable = index % 4 == 3
+                balance = -amount if is_payable else amount
+                total += balance
+                line_vals.append(
+                    Command.create(
+                        {
+                            "name": cls._bench_reference(index),
+                            "account_id": (payable if is_payable else receivable).id,
+                            "partner_id": cls.partners[index % PARTNERS].id,
+                            "balance": balance,
+                            "date_maturity": date,
+                        }
+                    )
+                )
+            line_vals.append(
+                Command.create(
+                    {
+                        "name": "Benchmark counterpart",
+                        "account_id": counterpart.id,
+                        "balance": -total,
+                    }
+                )
+            )
+            move_vals_list.append(
+                {
+                    "move_type": "entry",
+                    "journal_id": journal.id,
+                    "date": date,
+                    "line_ids": line_vals,
+                }
+            )
+        moves = cls.env["account.move"]
+        for start in range(0, len(move_vals_list), 10):
+            batch = cls.env["account.move"].create(move_vals_list[start : start + 10])
+            batch.action_post()
+            moves |= batch
+        return moves.line_ids.filtered(lambda line: line.account_id.reconcile)
+
+    @classmethod
+    def _statement_line_vals(cls, index):
+        """Realistic statement line: most reference an open item, some are
+        bank fees (write-off candidates) and some carry no usable reference."""
+        kind = index % 10
+        item_index = (index * 7) % OPEN_ITEMS
+        amount = 10.0 + (item_index % 997)
+        if item_index % 4 == 3:
+            amount = -amount
+        vals = {
+            "journal_id": cls.bank_journal_euro.id,
+            "date": fields.Date.today(),
+            "amount": amount,
+        }
+        if kind < 7:
+            vals["payment_ref"] = "PAYMENT %s %s" % (
+                cls._bench_reference(item_index),
+                cls.partners[item_index % PARTNERS].name,
+            )
+            vals["partner_id"] = cls.partners[item_index % PARTNERS].id
+        elif kind < 9:
+            vals["payment_ref"] = "BANK FEE %06d" % index
+            vals["amount"] = -2.5
+        else:
+            vals["payment_ref"] = "TRANSFER %06d" % index
+        return vals
+
+    @classmethod
+    def _seed_statement_lines(cls, count=STATEMENT_LINES, offset=0):
+        lines = cls.env["account.bank.statement.line"]
+        for start in range(offset, offset + count, CREATE_BATCH):
+            lines |= cls.env["account.bank.statement.line"].create(
+                [
+                    cls._statement_line_vals(index)
+                    for index in range(start, min(start + CREATE_BATCH, offset + count))
+                ]
+            )
+        return lines
+
+    def _measure(self, key, records, callback):
+        """Run ``callback`` on every record and store throughput figures."""
+        self.env.flush_all()
+        queries_before = self.env.cr.sql_log_count
+        started = time.perf_counter()
+        for record in records:
+            callback(record)
+        self.env.flush_all()
+        elapsed = time.perf_counter() - started
+        queries = self.env.cr.sql_log_count - queries_before
+        count = len(records) or 1
+        metric = {
+            "lines": len(records),
+            "seconds": round(elapsed, 3),
+            "lines_per_second": round(len(records) / elapsed, 2) if elapsed else None,
+            "queries": queries,
+            "queries_per_line": round(queries / count, 2),
+        }
+        self.report["metrics"][key] = metric
+        _logger.info("Reconcile benchmark %s: %s", key, metric)
+        return metric
+
+    def test_01_rule_matching(self):
+        models = self.matching_rule
+        sample = self.statement_lines.filtered(
+            lambda line: line.payment_ref.startswith("PAYMENT")
+        )[:SAMPLE_SIZE]
+        matched = []
+
+        def match(st_line):
+            if models._apply_rules(st_line, st_line._retrieve_partner()).get("amls"):
+                matched.append(st_line.id)
+
+        metric = self._measure("rule_matching", sample, match)
+        metric["match_ratio"] = round(len(matched) / (len(sample) or 1), 3)
+        self.assertTrue(matched)
+
+    def test_02_writeoff_suggestion(self):
+        models = self.matching_rule + self.writeoff_rule
+        sample = self.statement_lines.filtered(
+            lambda line: line.payment_ref.startswith("BANK FEE")
+        )[:SAMPLE_SIZE]
+
+        def suggest(st_line):
+            st_line._default_reconcile_data()
+
+        suggested = models._apply_rules(sample[:1], sample[:1]._retrieve_partner())
+        self.assertEqual(suggested.get("status"), "write_off")
+        self._measure("writeoff_suggestion", sample, suggest)
+
+    def test_03_bulk_auto_reconcile(self):
+        (self.matching_rule + self.writeoff_rule).auto_reconcile = True
+        bench_env = self.env(
+            context={**self.env.context, "_test_account_reconcile_oca": True}
+        )
+        vals_list = [
+            self._statement_line_vals(index)
+            for index in range(STATEMENT_LINES, STATEMENT_LINES + SAMPLE_SIZE)
+        ]
+        self.env.flush_all()
+        queries_before = self.env.cr.sql_log_count
+        started = time.perf_counter()
+        created = bench_env["account.bank.statement.line"]
+        for start in range(0, len(vals_list), CREATE_BATCH):
+            created |= bench_env["account.bank.statement.line"].create(
+                vals_list[start : start + CREATE_BATCH]
+            )
+        self.env.flush_all()
+        elapsed = time.perf_counter() - started
+        queries = self.env.cr.sql_log_count - queries_before
+        reconciled = created.filtered("is_reconciled")
+        metric = {
+            "lines": len(created),
+            "reconciled": len(reconciled),
+            "seconds": round(elapsed, 3),
+            "lines_per_second": round(len(created) / elapsed, 2) if elapsed else None,
+            "queries": queries,
+            "queries_per_line": round(queries / (len(created) or 1), 2),
+        }
+        self.report["metrics"]["bulk_auto_reconcile"] = metric
+        _logger.info("Reconcile benchmark bulk_auto_reconcile: %s", metric)
+        self.assertTrue(reconciled)
@@ -1,6 +1,6 @@
 {
     "name": "Commission AX",
-    "version": "17.0.1.0.0",
+    "version": "17.0.1.1.0",
     "summary": "Automated commission management for Odoo 17",
     "description": "Automates commission purchase orders, vendor bills, and reconciliation for sales.",
     "author": "Your Company",
@@ -0,0 +1,31 @@
+# -*- coding: utf-8 -*-
+"""
+Migration Script: v17.0.1.1.0 Post-Migration
+Purpose: Backfill the source sale order of the commission purchase orders
+
+The source sale order used to be computed from the purchase order origin on
+every change. It is now set when the commission purchase orders are created,
+so the purchase orders missing it are linked once here.
+"""
+import logging
+
+_logger = logging.getLogger(__name__)
+
+
+def migrate(cr, version):
+    if not version:
+        return
+    cr.execute("""
+        UPDATE purchase_order po
+           SET origin_so_id = (
+                SELECT so.id
+                  FROM sale_order so
+                 WHERE so.name = po.origin
+              ORDER BY so.date_order DESC, so.id DESC
+                 LIMIT 1
+           )
+         WHERE po.origin_so_id IS NULL
+           AND po.origin IS NOT NULL
+           AND EXISTS (SELECT 1 FROM sale_order so WHERE so.name = po.origin)
+    """)
+    _logger.info("Linked %s commission purchase orders to their source sale order", cr.rowcount)
@@ -1,9 +1,13 @@
-from odoo import models, fields, api
+from collections import defaultdict
+from odoo import models, fields, api, tools
 from odoo.exceptions import UserError, ValidationError
 import logging
 
 _logger = logging.getLogger(__name__)
 
+# Vendor bills created together by the automatic creation cron
+VENDOR_BILL_BATCH_SIZE = 100
+
 class PurchaseOrderEnhanced(models.Model):
     _inherit = 'purchase.order'
 
@@ -33,19 +37,14 @@ class PurchaseOrderEnhanced(models.Model):
         compute="_compute_payment_received",
         store=True
     )
+    # Set when the commission purchase orders are created from the sale order
     origin_so_id = fields.Many2one(
         'sale.order',
         string='Source Sales Order',
-        compute='_compute_origin_so_id',
-        store=True
+        index='btree_not_null',
+        copy=False
     )
 
-    @api.depends('origin')
-    def _compute_origin_so_id(self):
-        for order in self:
-            so = self.env['sale.order'].search([('name', '=', order.origin)], limit=1)
-            order.origin_so_id = so if so else False
-
     @api.depends('vendor_bill_ids', 'vendor_bill_ids.payment_state')
     def _compute_vendor_bill_count(self):
         for order in self:
@@ -86,54 +85,37 @@ class PurchaseOrderEnhanced(models.Model):
         
         return self._create_commission_vendor_bill()
 
-    def _create_commission_vendor_bill(self):
-        """Create vendor bill for commission payment"""
+    def _prepare_commission_vendor_bill_vals(self, expense_account):
+        """Prepare values of the vendor bill paying this commission"""
         self.ensure_one()
-        
-        # Prepare vendor bill values
-        bill_vals = {
+        return {
             'move_type': 'in_invoice',
             'partner_id': self.partner_id.id,
             'purchase_id': self.id,
             'currency_id': self.currency_id.id,
+            'company_id': self.company_id.id,
             'invoice_origin': f"Commission for {self.origin_so_id.name}",
             'payment_reference': f"COMM-{self.origin_so_id.name}-{self.partner_id.name}",
             'invoice_date': fields.Date.today(),
             'ref': f"Commission Payment - {self.origin_so_id.name}",
-            'invoice_line_ids': []
-        }
-        
-        # Create invoice lines from purchase order lines
-        for line in self.order_line:
-            line_vals = {
+            'invoice_line_ids': [(0, 0, {
                 'name': f"Commission: {line.name}",
                 'product_id': line.product_id.id,
                 'quantity': line.product_qty,
                 'price_unit': line.price_unit,
                 'tax_ids': [(6, 0, line.taxes_id.ids)],
                 'purchase_line_id': line.id,
-                'account_id': self._get_commission_expense_account().id,
-            }
-            bill_vals['invoice_line_ids'].append((0, 0, line_vals))
-        
-        # Create the vendor bill
-        vendor_bill = self.env['account.move'].create(bill_vals)
-        
-        # Log the creation
-        _logger.info(f"Created vendor bill {vendor_bill.name} for commission PO {self.name}")
-        
-        # Add message to both PO and SO
-        self.message_post(
-            body=f"Vendor bill {vendor_bill.name} created for commission payment",
-            subject="Vendor Bill Created"
-        )
-        
-        if self.origin_so_id:
-            self.origin_so_id.message_post(
-                body=f"Vendor bill {vendor_bill.name} created for commission PO {self.name}",
-                subject="Commission Vendor Bill Created"
-            )
-        
+                'account_id': expense_account.id,
+            }) for line in self.order_line],
+        }
+
+    def _create_commission_vendor_bill(self):
+        """Create vendor bill for commission payment"""
+        self.ensure_one()
+        vendor_bill = self._create_commission_vendor_bills({
+            self.company_id: self._get_commission_expense_account(),
+        })
+
         return {
             'type': 'ir.actions.act_window',
             'name': 'Vendor Bill',
@@ -143,8 +125,39 @@ class PurchaseOrderEnhanced(models.Model):
             'target': 'current',
         }
 
-    def _get_commission_expense_account(self):
+    def _create_commission_vendor_bills(self, expense_accounts):
+        """Create the vendor bills of these commission purchase orders at once.
+
+        :param expense_accounts: commission expense account per company
+        :return: the created vendor bills, in the order of the purchase orders
+        """
+        vendor_bills = self.env['account.move'].create([
+            order._prepare_commission_vendor_bill_vals(expense_accounts[order.company_id])
+            for order in self
+        ])
+        _logger.info("Created %s vendor bills for commission purchase orders", len(vendor_bills))
+
+        # Log the creation on both PO and SO
+        self._message_log_batch(
+            bodies={
+                order.id: f"Vendor bill {bill.name} created for commission payment"
+                for order, bill in zip(self, vendor_bills)
+            },
+        )
+        sale_bodies = defaultdict(list)
+        for order, bill in zip(self, vendor_bills):
+            if order.origin_so_id:
+                sale_bodies[order.origin_so_id.id].append(
+                    f"Vendor bill {bill.name} created for commission PO {order.name}")
+        if sale_bodies:
+            self.env['sale.order'].browse(list(sale_bodies))._message_log_batch(
+                bodies={order_id: "<br/>".join(lines) for order_id, lines in sale_bodies.items()},
+            )
+        return vendor_bills
+
+    def _get_commission_expense_account(self, company=None):
         """Get the commission expense account from configuration"""
+        company = company or self.company_id
         commission_account_id = self.env['ir.config_parameter'].sudo().get_param(
             'commission_ax.commission_expense_account_id'
         )
@@ -159,8 +172,8 @@ class PurchaseOrderEnhanced(models.Model):
         
         # Fallback to default expense account
         expense_account = self.env['account.account'].search([
-            ('user_type_id.name', '=', 'Expenses'),
-            ('company_id', '=', self.company_id.id)
+            ('account_type', '=', 'expense'),
+            ('company_id', '=', company.id)
         ], limit=1)
         
         if not expense_account:
@@ -186,8 +199,11 @@ class PurchaseOrderEnhanced(models.Model):
         return action
 
     @api.model
-    def _cron_auto_create_vendor_bills(self):
-        """Cron job to automatically create vendor bills for commission POs"""
+    def _cron_auto_create_vendor_bills(self, batch_size=VENDOR_BILL_BATCH_SIZE):
+        """Cron job to automatically create vendor bills for commission POs.
+
+        Bills are created by batches with one create per batch, and the
+        expense account is resolved once per company."""
         _logger.info("Starting automatic vendor bill creation for commissions")
         
         # Find commission POs that meet criteria for auto bill creation
@@ -196,20 +212,40 @@ class PurchaseOrderEnhanced(models.Model):
             ('auto_create_bill', '=', True),  # Auto creation enabled
             ('payment_received', '=', True),  # Payment received
             ('state', 'in', ['purchase', 'done']),  # PO is confirmed
-            ('vendor_bill_count', '=', 0),  # No vendor bill exists yet
+            # No vendor bill exists yet
+            ('order_line', 'not any', [('invoice_lines', 'any', [('parent_state', '!=', 'cancel')])]),
         ])
         
+        expense_accounts = {}
+        for company in eligible_pos.company_id:
+            try:
+                expense_accounts[company] = self._get_commission_expense_account(company)
+            except UserError as e:
+                _logger.error(f"Cannot auto-create vendor bills for company {company.name}: {str(e)}")
+        
         created_bills = 0
         failed_bills = 0
-        
-        for po in eligible_pos:
+        auto_commit = not tools.config['test_enable']
+        for po_ids in tools.split_every(batch_size, eligible_pos.ids):
+            batch = self.browse(po_ids)
+            no_account = batch.filtered(lambda po: po.company_id not in expense_accounts)
+            failed_bills += len(no_account)
+            batch -= no_account
             try:
-                po._create_commission_vendor_bill()
-                created_bills += 1
-                _logger.info(f"Auto-created vendor bill for commission PO {po.name}")
+                with self.env.cr.savepoint():
+                    created_bills += len(batch._create_commission_vendor_bills(expense_accounts))
             except Exception as e:
-                failed_bills += 1
-                _logger.error(f"Failed to auto-create vendor bill for PO {po.name}: {str(e)}")
+                _logger.warning(f"Batch vendor bill creation failed, retrying PO by PO: {str(e)}")
+                for po in batch:
+                    try:
+                        with self.env.cr.savepoint():
+                            po._create_commission_vendor_bills(expense_accounts)
+                        created_bills += 1
+                    except Exception as e:
+                        failed_bills += 1
+                        _logger.error(f"Failed to auto-create vendor bill for PO {po.name}: {str(e)}")
+            if auto_commit:
+                self.env.cr.commit()
         
         _logger.info(
             f"Automatic vendor bill creation completed. "
@@ -1,6 +1,6 @@
 {
     'name': 'Enhanced Commission Management System',
-    'version': '17.0.2.0.0',
+    'version': '17.0.2.1.0',
     'summary': 'Advanced commission calculation with dual-group structure and comprehensive automation',
     'description': '''
         Enhanced Commission Management System for Odoo 17
@@ -33,7 +33,10 @@
         'data/commission_demo_data.xml',
         'data/commission_email_templates.xml',
         'data/purchase_order_cron.xml',
+        'data/commission_ledger_data.xml',
         'views/commission_ax_views.xml',
+        'views/commission_ledger_views.xml',
+        'views/commission_statement_views.xml',
         'views/sale_order.xml',
         'views/purchase_order_views.xml',
         'reports/commission_payout_report_professional.xml',
@@ -0,0 +1,12 @@
+from odoo import http
+from odoo.http import request
+
+
+class CommissionStatementController(http.Controller):
+
+    @http.route('/commission_ax/statement', type='json', auth='user')
+    def commission_statement(self, partner_id, date_from=None, date_to=None, company_ids=None):
+        """Commission statement of a partner: earned, invoiced basis, paid
+        and outstanding commissions per sale order, with totals"""
+        return request.env['commission.statement'].get_statement(
+            partner_id, date_from=date_from, date_to=date_to, company_ids=company_ids)
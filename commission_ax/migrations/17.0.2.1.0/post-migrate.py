@@ -0,0 +1,21 @@
+# -*- coding: utf-8 -*-
+"""
+Migration Script: v17.0.2.1.0 Post-Migration
+Purpose: Fill the commission ledger from the existing sale orders
+
+The ledger is filled at installation only (noupdate data), so databases
+upgraded from an earlier version get their existing orders synchronized here.
+"""
+import logging
+
+from odoo import api, SUPERUSER_ID
+
+_logger = logging.getLogger(__name__)
+
+
+def migrate(cr, version):
+    if not version:
+        return
+    env = api.Environment(cr, SUPERUSER_ID, {})
+    env['commission.ledger']._rebuild()
+    _logger.info("Commission ledger filled from the existing sale orders")
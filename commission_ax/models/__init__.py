@@ -2,3 +2,6 @@
 
 from . import sale_order
 from . import purchase_order
+from . import commission_ledger
+from . import commission_report
+from . import commission_statement
@@ -0,0 +1,201 @@
+from odoo import models, fields, api, tools
+from odoo.tools.sql import create_index
+import logging
+
+_logger = logging.getLogger(__name__)
+
+# Commission roles of a sale order, in processing order:
+# (role, category, partner field, amount field, rate field, commission type field, label)
+# Legacy roles have no commission type: they are a percentage of the order total.
+COMMISSION_ROLES = [
+    ('consultant', 'legacy', 'consultant_id', 'salesperson_commission',
+     'consultant_comm_percentage', None, "Consultant Commission"),
+    ('manager_legacy', 'legacy', 'manager_id', 'manager_commission',
+     'manager_comm_percentage', None, "Manager Commission"),
+    ('second_agent', 'legacy', 'second_agent_id', 'second_agent_commission',
+     'second_agent_comm_percentage', None, "Second Agent Commission"),
+    ('director_legacy', 'legacy', 'director_id', 'director_commission',
+     'director_comm_percentage', None, "Director Commission"),
+    ('broker', 'external', 'broker_partner_id', 'broker_amount',
+     'broker_rate', 'broker_commission_type', "Broker Commission"),
+    ('referrer', 'external', 'referrer_partner_id', 'referrer_amount',
+     'referrer_rate', 'referrer_commission_type', "Referrer Commission"),
+    ('cashback', 'external', 'cashback_partner_id', 'cashback_amount',
+     'cashback_rate', 'cashback_commission_type', "Cashback"),
+    ('other_external', 'external', 'other_external_partner_id', 'other_external_amount',
+     'other_external_rate', 'other_external_commission_type', "Other External Commission"),
+    ('agent1', 'internal', 'agent1_partner_id', 'agent1_amount',
+     'agent1_rate', 'agent1_commission_type', "Agent 1 Commission"),
+    ('agent2', 'internal', 'agent2_partner_id', 'agent2_amount',
+     'agent2_rate', 'agent2_commission_type', "Agent 2 Commission"),
+    ('manager', 'internal', 'manager_partner_id', 'manager_amount',
+     'manager_rate', 'manager_commission_type', "Manager Commission"),
+    ('director', 'internal', 'director_partner_id', 'director_amount',
+     'director_rate', 'director_commission_type', "Director Commission"),
+]
+
+# Key of the sale orders whose ledger must be synchronized before commit
+LEDGER_PENDING_KEY = 'commission_ax.ledger_pending_orders'
+# Sale orders synchronized together
+LEDGER_SYNC_BATCH = 1000
+# Fields copied from the sale order on the ledger rows
+LEDGER_SYNC_FIELDS = ['partner_id', 'date', 'company_id', 'currency_id', 'basis',
+                      'base_amount', 'rate', 'amount', 'state', 'sequence', 'category']
+
+
+class CommissionLedger(models.Model):
+    """Normalized commissions: one row per sale order and commission role.
+
+    Rows are maintained from the commission fields of the sale orders, so
+    that totals per partner, role or period are grouped queries instead of
+    scans of the sale orders."""
+    _name = 'commission.ledger'
+    _description = 'Commission Ledger'
+    _order = 'date desc, sale_order_id, sequence'
+    _rec_name = 'sale_order_id'
+
+    sale_order_id = fields.Many2one('sale.order', string="Sale Order", required=True,
+                                    readonly=True, index=True, ondelete='cascade')
+    sequence = fields.Integer(string="Sequence", readonly=True)
+    role = fields.Selection([
+        ('broker', 'Broker'),
+        ('referrer', 'Referrer'),
+        ('cashback', 'Cashback Partner'),
+        ('other_external', 'Other External'),
+        ('agent1', 'Agent 1'),
+        ('agent2', 'Agent 2'),
+        ('manager', 'Manager'),
+        ('director', 'Director'),
+        ('consultant', 'Consultant'),
+        ('manager_legacy', 'Manager (Legacy)'),
+        ('director_legacy', 'Director (Legacy)'),
+        ('second_agent', 'Second Agent'),
+    ], string="Role", required=True, readonly=True, index=True)
+    category = fields.Selection([
+        ('external', 'External Commission'),
+        ('internal', 'Internal Commission'),
+        ('legacy', 'Legacy Commission'),
+    ], string="Category", readonly=True)
+    partner_id = fields.Many2one('res.partner', string="Partner", required=True,
+                                 readonly=True, index=True)
+    date = fields.Date(string="Order Date", readonly=True)
+    company_id = fields.Many2one('res.company', string="Company", readonly=True, index=True)
+    currency_id = fields.Many2one('res.currency', string="Currency", readonly=True)
+    basis = fields.Selection([
+        ('fixed', 'Fixed'),
+        ('percent_unit_price', 'Percentage of Unit Price'),
+        ('percent_untaxed_total', 'Percentage of Untaxed Total'),
+        ('percent_total', 'Percentage of Total'),
+    ], string="Basis", readonly=True)
+    base_amount = fields.Monetary(string="Calculation Base", readonly=True)
+    rate = fields.Float(string="Rate", readonly=True)
+    amount = fields.Monetary(string="Commission Amount", readonly=True)
+    state = fields.Selection([
+        ('draft', 'Draft'),
+        ('calculated', 'Calculated'),
+        ('confirmed', 'Confirmed'),
+        ('cancel', 'Cancelled'),
+    ], string="Status", readonly=True, index=True)
+
+    _sql_constraints = [
+        ('sale_order_role_unique', 'unique(sale_order_id, role)',
+         'A sale order has only one ledger row per commission role.'),
+    ]
+
+    def init(self):
+        # Agent statements and rankings filter on partner and period
+        create_index(self._cr, 'commission_ledger_partner_date_index',
+                     self._table, ['partner_id', 'date'])
+
+    # Synchronization
+    @api.model
+    def _mark_orders(self, order_ids):
+        """Remember sale orders whose commissions changed in this transaction.
+        Their rows are synchronized right before commit, or before the ledger
+        is read, so that editing an order costs no extra query."""
+        if not order_ids:
+            return
+        pending = self.env.cr.precommit.data.setdefault(LEDGER_PENDING_KEY, set())
+        if not pending:
+            self.env.cr.precommit.add(self._flush_pending)
+        pending.update(order_ids)
+
+    @api.model
+    def _flush_pending(self):
+        # Pending computations may mark more orders
+        self.env['sale.order'].flush_model()
+        order_ids = self.env.cr.precommit.data.pop(LEDGER_PENDING_KEY, set())
+        if order_ids:
+            self._sync_orders(self.env['sale.order'].browse(order_ids).exists())
+            self.flush_model()
+
+    @api.model
+    def _sync_orders(self, orders):
+        """Create, update or delete the ledger rows of the given sale orders"""
+        ledger = self.sudo()
+        for order_ids in tools.split_every(LEDGER_SYNC_BATCH, orders.ids):
+            batch = orders.browse(order_ids)
+            existing = {
+                (row.sale_order_id.id, row.role): row
+                for row in ledger.search([('sale_order_id', 'in', batch.ids)])
+            }
+            to_create = []
+            for vals in batch._get_commission_ledger_values():
+                row = existing.pop((vals['sale_order_id'], vals['role']), None)
+                if not row:
+                    to_create.append(vals)
+                    continue
+                changes = {}
+                for name in LEDGER_SYNC_FIELDS:
+                    value = row[name]
+                    if isinstance(value, models.BaseModel):
+                        value = value.id
+                    if value != vals[name]:
+                        changes[name] = vals[name]
+                if changes:
+                    row.write(changes)
+            ledger.create(to_create)
+            ledger.browse([row.id for row in existing.values()]).unlink()
+
+    @api.model
+    def _rebuild(self):
+        """Synchronize the ledger of all sale orders (installation, repair)"""
+        orders = self.env['sale.order'].sudo().with_context(active_test=False).search([])
+        self._sync_orders(orders)
+        _logger.info("Commission ledger rebuilt for %s sale orders", len(orders))
+
+    # Aggregation
+    @api.model
+    def get_commission_totals(self, groupby, domain=None, states=None):
+        """Commission totals grouped by ledger fields, in one query.
+
+        :param groupby: ledger fields, e.g. ['partner_id', 'date:month', 'role']
+        :param domain: additional ledger domain (period, company, roles...)
+        :param states: ledger states to include, all but cancelled ones by default
+        :return: list of dicts with the group values, 'amount', 'base_amount'
+                 and 'count'
+        """
+        self._flush_pending()
+        domain = list(domain or []) + (
+            [('state', 'in', list(states))] if states else [('state', '!=', 'cancel')])
+        groups = self.read_group(domain, ['amount:sum', 'base_amount:sum'],
+                                 list(groupby), lazy=False)
+        for group in groups:
+            group['count'] = group.pop('__count')
+            group.pop('__domain', None)
+        return groups
+
+    @api.model
+    def get_partner_ranking(self, date_from=None, date_to=None, roles=None, limit=10):
+        """Partners ranked by commission amount over a period"""
+        domain = []
+        if date_from:
+            domain.append(('date', '>=', date_from))
+        if date_to:
+            domain.append(('date', '<=', date_to))
+        if roles:
+            domain.append(('role', 'in', list(roles)))
+        self._flush_pending()
+        return self.read_group(
+            domain + [('state', '!=', 'cancel')], ['amount:sum'], ['partner_id'],
+            orderby='amount desc', limit=limit, lazy=False)
@@ -0,0 +1,318 @@
+from odoo import models, fields, api
+from odoo.exceptions import UserError
+from io import BytesIO
+import logging
+
+from .commission_report import REPORTLAB_AVAILABLE, _get_report_templates
+
+try:
+    from odoo.tools.misc import xlsxwriter
+except ImportError:
+    import xlsxwriter
+
+if REPORTLAB_AVAILABLE:
+    from reportlab.lib import colors
+    from reportlab.lib.pagesizes import A4
+    from reportlab.lib.units import mm
+    from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer
+
+_logger = logging.getLogger(__name__)
+
+# Amount columns of a statement line, in output order
+STATEMENT_AMOUNTS = [
+    ('earned', "Earned"),
+    ('invoiced', "Invoiced Basis"),
+    ('paid', "Paid"),
+    ('outstanding', "Outstanding"),
+]
+
+# One row per sale order of the partner in the period. Commissions come from
+# the ledger, the invoiced basis prorates them with the posted customer
+# invoices of the order and the paid amount comes from the vendor bills of
+# the commission purchase orders of the partner (origin_so_id).
+STATEMENT_QUERY = """
+    WITH earned AS (
+        SELECT ledger.sale_order_id,
+               MIN(ledger.date) AS date,
+               ARRAY_AGG(ledger.role ORDER BY ledger.sequence) AS roles,
+               SUM(ledger.amount) AS earned
+          FROM commission_ledger ledger
+         WHERE ledger.partner_id = %(partner_id)s
+           AND ledger.state != 'cancel'
+           AND ledger.sale_order_id = ANY(%(order_ids)s::int[])
+      GROUP BY ledger.sale_order_id
+    ),
+    invoiced AS (
+        SELECT sol.order_id AS sale_order_id,
+               SUM(CASE WHEN move.move_type = 'out_refund' THEN -aml.price_subtotal
+                        ELSE aml.price_subtotal END) AS amount
+          FROM sale_order_line sol
+          JOIN sale_order_line_invoice_rel rel ON rel.order_line_id = sol.id
+          JOIN account_move_line aml ON aml.id = rel.invoice_line_id
+          JOIN account_move move ON move.id = aml.move_id
+         WHERE sol.order_id IN (SELECT sale_order_id FROM earned)
+           AND move.state = 'posted'
+           AND move.move_type IN ('out_invoice', 'out_refund')
+      GROUP BY sol.order_id
+    ),
+    bills AS (
+        SELECT DISTINCT po.origin_so_id AS sale_order_id, move.id,
+               move.amount_total - move.amount_residual AS paid
+          FROM purchase_order po
+          JOIN purchase_order_line pol ON pol.order_id = po.id
+          JOIN account_move_line aml ON aml.purchase_line_id = pol.id
+          JOIN account_move move ON move.id = aml.move_id
+         WHERE po.partner_id = %(partner_id)s
+           AND po.origin_so_id IN (SELECT sale_order_id FROM earned)
+           AND move.state = 'posted'
+           AND move.move_type = 'in_invoice'
+    ),
+    paid AS (
+        SELECT sale_order_id, SUM(paid) AS paid
+          FROM bills
+      GROUP BY sale_order_id
+    )
+    SELECT earned.sale_order_id,
+           so.name,
+           earned.date,
+           earned.roles,
+           currency.name AS currency,
+           earned.earned,
+           earned.earned * LEAST(COALESCE(invoiced.amount, 0) / NULLIF(so.amount_untaxed, 0), 1) AS invoiced,
+           COALESCE(paid.paid, 0) AS paid
+      FROM earned
+      JOIN sale_order so ON so.id = earned.sale_order_id
+ LEFT JOIN res_currency currency ON currency.id = so.currency_id
+ LEFT JOIN invoiced ON invoiced.sale_order_id = earned.sale_order_id
+ LEFT JOIN paid ON paid.sale_order_id = earned.sale_order_id
+  ORDER BY earned.date, so.name, earned.sale_order_id
+"""
+
+
+class CommissionStatement(models.AbstractModel):
+    """Commission statement of a partner over a period.
+
+    Lines are computed with one query whatever the number of deals of the
+    partner, and are rendered as JSON, PDF or XLSX."""
+    _name = 'commission.statement'
+    _description = 'Commission Statement'
+
+    @api.model
+    def get_statement(self, partner_id, date_from=None, date_to=None, company_ids=None):
+        """Commission statement of a partner.
+
+        :param partner_id: agent or partner receiving the commissions
+        :param date_from: first order date of the period, included
+        :param date_to: last order date of the period, included
+        :param company_ids: companies of the orders, among the companies of the
+                            user, the active companies by default
+        :return: JSON serializable dict with the partner, the period, one line
+                 per sale order and the totals
+
+        Only the confirmed sale orders and the ledger rows readable by the
+        user are included: quotations earn no commission yet.
+        """
+        partner = self.env['res.partner'].browse(int(partner_id)).exists()
+        if not partner:
+            raise UserError("Partner not found")
+        partner.check_access_rights('read')
+        partner.check_access_rule('read')
+        ledger = self.env['commission.ledger']
+        ledger.check_access_rights('read')
+        self.env['sale.order'].check_access_rights('read')
+        date_from = date_from and fields.Date.to_date(date_from)
+        date_to = date_to and fields.Date.to_date(date_to)
+        allowed_company_ids = self.env.user.company_ids.ids
+        company_ids = [cid for cid in company_ids or self.env.companies.ids if cid in allowed_company_ids]
+
+        # Confirmed orders of the statement, through the record rules of the user
+        ledger._flush_pending()
+        domain = [
+            ('partner_id', '=', partner.id),
+            ('state', '!=', 'cancel'),
+            ('company_id', 'in', company_ids),
+        ]
+        if date_from:
+            domain.append(('date', '>=', date_from))
+        if date_to:
+            domain.append(('date', '<=', date_to))
+        orders = self.env['sale.order'].search([
+            ('id', 'in', ledger.search(domain).sale_order_id.ids),
+            ('state', 'in', ['sale', 'done']),
+        ])
+
+        self.env['sale.order'].flush_model(['amount_untaxed', 'currency_id', 'name'])
+        self.env['purchase.order'].flush_model(['partner_id', 'origin_so_id'])
+        self.env['account.move'].flush_model(['state', 'move_type', 'amount_total', 'amount_residual'])
+        self.env['account.move.line'].flush_model(['move_id', 'price_subtotal', 'purchase_line_id'])
+        self.env.cr.execute(STATEMENT_QUERY, {
+            'partner_id': partner.id,
+            'order_ids': orders.ids,
+        })
+
+        totals = dict.fromkeys([key for key, _label in STATEMENT_AMOUNTS], 0.0)
+        lines = []
+        for order_id, name, date, roles, currency, earned, invoiced, paid in self.env.cr.fetchall():
+            line = {
+                'sale_order_id': order_id,
+                'sale_order': name,
+                'date': fields.Date.to_string(date),
+                'roles': roles,
+                'currency': currency,
+                'earned': earned or 0.0,
+                'invoiced': invoiced or 0.0,
+                'paid': paid or 0.0,
+            }
+            line['outstanding'] = line['earned'] - line['paid']
+            for key in totals:
+                totals[key] += line[key]
+            lines.append(line)
+
+        return {
+            'partner_id': partner.id,
+            'partner': partner.display_name,
+            'date_from': fields.Date.to_string(date_from) if date_from else False,
+            'date_to': fields.Date.to_string(date_to) if date_to else False,
+            'lines': lines,
+            'totals': totals,
+        }
+
+    @api.model
+    def _get_role_labels(self):
+        return dict(self.env['commission.ledger']._fields['role']._description_selection(self.env))
+
+    @api.model
+    def _get_period_label(self, statement):
+        return f"{statement['date_from'] or '...'} - {statement['date_to'] or '...'}"
+
+    @api.model
+    def render_statement_xlsx(self, statement):
+        """XLSX file of a statement returned by ``get_statement``"""
+        role_labels = self._get_role_labels()
+        stream = BytesIO()
+        workbook = xlsxwriter.Workbook(stream, {'constant_memory': True})
+        sheet = workbook.add_worksheet("Commission Statement")
+        title = workbook.add_format({'bold': True, 'font_size': 14, 'font_color': '#800020'})
+        header = workbook.add_format({'bold': True, 'font_color': 'white', 'bg_color': '#800020', 'border': 1})
+        text = workbook.add_format({'border': 1})
+        amount = workbook.add_format({'border': 1, 'num_format': '#,##0.00'})
+        total = workbook.add_format({'bold': True, 'border': 1, 'num_format': '#,##0.00', 'bg_color': '#f1f3f4'})
+
+        sheet.set_column(0, 0, 18)
+        sheet.set_column(1, 1, 12)
+        sheet.set_column(2, 2, 30)
+        sheet.set_column(3, 3 + len(STATEMENT_AMOUNTS), 16)
+        sheet.write(0, 0, f"Commission Statement - {statement['partner']}", title)
+        sheet.write(1, 0, f"Period: {self._get_period_label(statement)}")
+        columns = ["Sale Order", "Date", "Roles", "Currency"] + [label for _key, label in STATEMENT_AMOUNTS]
+        for col, label in enumerate(columns):
+            sheet.write(3, col, label, header)
+
+        row = 4
+        for line in statement['lines']:
+            sheet.write(row, 0, line['sale_order'], text)
+            sheet.write(row, 1, line['date'] or '', text)
+            sheet.write(row, 2, ", ".join(role_labels.get(role, role) for role in line['roles']), text)
+            sheet.write(row, 3, line['currency'] or '', text)
+            for col, (key, _label) in enumerate(STATEMENT_AMOUNTS, start=4):
+                sheet.write_number(row, col, line[key], amount)
+            row += 1
+
+        sheet.write(row, 0, "Total", total)
+        for col in range(1, 4):
+            sheet.write_blank(row, col, None, total)
+        for col, (key, _label) in enumerate(STATEMENT_AMOUNTS, start=4):
+            sheet.write_number(row, col, statement['totals'][key], total)
+        workbook.close()
+        return stream.getvalue()
+
+    @api.model
+    def render_statement_pdf(self, statement):
+        """PDF file of a statement returned by ``get_statement``"""
+        if not REPORTLAB_AVAILABLE:
+            raise UserError("ReportLab library is not installed. Please install it with: pip install reportlab")
+        templates = _get_report_templates()
+        page_width = templates['page_width']
+        role_labels = self._get_role_labels()
+
+        story = [
+            Paragraph("Commission Statement", templates['title_style']),
+            Paragraph(
+                f"Partner: <b>{statement['partner']}</b> | Period: <b>{self._get_period_label(statement)}</b>",
+                templates['subtitle_style']
+            ),
+        ]
+        header_line = Table([[""]], colWidths=[page_width])
+        header_line.setStyle(templates['line_style'])
+        story.append(header_line)
+        story.append(Spacer(1, 10))
+
+        data = [["Sale Order", "Date", "Roles"] + [label for _key, label in STATEMENT_AMOUNTS]]
+        for line in statement['lines']:
+            data.append([
+                line['sale_order'],
+                line['date'] or '',
+                ", ".join(role_labels.get(role, role) for role in line['roles']),
+            ] + [f"{line[key]:,.2f}" for key, _label in STATEMENT_AMOUNTS])
+        data.append(["TOTAL", "", ""] + [f"{statement['totals'][key]:,.2f}" for key, _label in STATEMENT_AMOUNTS])
+
+        table = Table(data, repeatRows=1, colWidths=[
+            page_width * 0.14, page_width * 0.11, page_width * 0.23,
+        ] + [page_width * 0.13] * len(STATEMENT_AMOUNTS))
+        table.setStyle(TableStyle([
+            ('FONT', (0, 0), (-1, 0), 'Helvetica-Bold', 9),
+            ('TEXTCOLOR', (0, 0), (-1, 0), colors.white),
+            ('BACKGROUND', (0, 0), (-1, 0), templates['burgundy_color']),
+            ('FONT', (0, 1), (-1, -2), 'Helvetica', 8),
+            ('ALIGN', (3, 0), (-1, -1), 'RIGHT'),
+            ('FONT', (0, -1), (-1, -1), 'Helvetica-Bold', 9),
+            ('BACKGROUND', (0, -1), (-1, -1), colors.HexColor("#f1f3f4")),
+            ('SPAN', (0, -1), (2, -1)),
+            ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
+            ('GRID', (0, 0), (-1, -1), 0.5, templates['border_color']),
+        ]))
+        story.append(table)
+
+        buffer = BytesIO()
+        doc = SimpleDocTemplate(buffer, pagesize=A4, topMargin=15*mm, bottomMargin=15*mm,
+                                leftMargin=15*mm, rightMargin=15*mm)
+        doc.build(story)
+        return buffer.getvalue()
+
+
+class CommissionStatementWizard(models.TransientModel):
+    _name = 'commission.statement.wizard'
+    _description = 'Commission Statement Wizard'
+
+    partner_id = fields.Many2one('res.partner', string="Agent / Partner", required=True)
+    date_from = fields.Date(string="From", default=lambda self: fields.Date.context_today(self).replace(day=1))
+    date_to = fields.Date(string="To", default=fields.Date.context_today)
+    output = fields.Selection([
+        ('pdf', 'PDF'),
+        ('xlsx', 'Excel'),
+    ], string="Format", default='pdf', required=True)
+
+    def action_print_statement(self):
+        """Generate the statement file and download it"""
+        self.ensure_one()
+        engine = self.env['commission.statement']
+        statement = engine.get_statement(self.partner_id.id, self.date_from, self.date_to)
+        if self.output == 'xlsx':
+            content = engine.render_statement_xlsx(statement)
+            mimetype = 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+        else:
+            content = engine.render_statement_pdf(statement)
+            mimetype = 'application/pdf'
+        attachment = self.env['ir.attachment'].create({
+            'name': f"Commission Statement - {self.partner_id.name}.{self.output}",
+            'type': 'binary',
+            'raw': content,
+            'mimetype': mimetype,
+            'res_model': self._name,
+            'res_id': self.id,
+        })
+        return {
+            'type': 'ir.actions.act_url',
+            'url': f'/web/content/{attachment.id}?download=true',
+            'target': 'self',
+        }
@@ -23,6 +23,7 @@ class PurchaseOrder(models.Model):
     origin_so_id = fields.Many2one(
         'sale.order', 
         string="Origin Sale Order",
+        index='btree_not_null',
         help="The sale order that generated this commission purchase order"
     )
     commission_posted = fields.Boolean(
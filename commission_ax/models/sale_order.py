@@ -1,10 +1,17 @@
-from odoo import models, fields, api
+from collections import defaultdict
+from odoo import models, fields, api, tools
 from odoo.exceptions import ValidationError
 from odoo.exceptions import UserError, ValidationError
 import logging
+from .commission_ledger import COMMISSION_ROLES
 
 _logger = logging.getLogger(__name__)
 
+# Orders whose commission purchase orders are created (and committed) together by the cron
+COMMISSION_BATCH_SIZE = 100
+# Failed orders are retried by the cron until this number of attempts
+COMMISSION_MAX_ATTEMPTS = 3
+
 class SaleOrder(models.Model):
     _inherit = 'sale.order'
 
@@ -203,6 +210,12 @@ class SaleOrder(models.Model):
         ('calculated', 'Calculated'),
         ('confirmed', 'Confirmed')
     ], string="Commission Processing Status", default='draft')
+    commission_error = fields.Text(string="Commission Processing Error", readonly=True, copy=False,
+                                   help="Last error of the automatic commission processing")
+    commission_error_count = fields.Integer(string="Commission Processing Failures", readonly=True,
+                                            copy=False, default=0,
+                                            help="Failed automatic processing attempts, the order is "
+                                                 "retried until %s attempts" % COMMISSION_MAX_ATTEMPTS)
     
     # Commission lines count for compatibility
     commission_lines_count = fields.Integer(
@@ -232,6 +245,13 @@ class SaleOrder(models.Model):
         string="Commission Lines",
         help="Commission records associated with this sale order"
     )
+    commission_ledger_ids = fields.One2many(
+        'commission.ledger',
+        'sale_order_id',
+        string="Commission Ledger",
+        readonly=True,
+        help="One row per commission role of this order, maintained from the commission fields"
+    )
 
     @api.depends('purchase_order_ids', 'purchase_order_ids.amount_total')
     def _compute_purchase_order_count(self):
@@ -257,37 +277,14 @@ class SaleOrder(models.Model):
         'director_id', 'director_commission'
     )
     def _compute_commission_lines_count(self):
-        """Compute the number of active commission partners."""
+        """Compute the number of active commission partners.
+
+        Counted from the commission fields of the order, like its ledger rows:
+        one per role having a partner and a commission amount."""
         for order in self:
-            count = 0
-            # Count external commission partners
-            if order.broker_partner_id and order.broker_amount:
-                count += 1
-            if order.referrer_partner_id and order.referrer_amount:
-                count += 1
-            if order.cashback_partner_id and order.cashback_amount:
-                count += 1
-            if order.other_external_partner_id and order.other_external_amount:
-                count += 1
-            # Count internal commission partners
-            if order.agent1_partner_id and order.agent1_amount:
-                count += 1
-            if order.agent2_partner_id and order.agent2_amount:
-                count += 1
-            if order.manager_partner_id and order.manager_amount:
-                count += 1
-            if order.director_partner_id and order.director_amount:
-                count += 1
-            # Count legacy commission partners
-            if order.consultant_id and order.salesperson_commission:
-                count += 1
-            if order.manager_id and order.manager_commission:
-                count += 1
-            if order.second_agent_id and order.second_agent_commission:
-                count += 1
-            if order.director_id and order.director_commission:
-                count += 1
-            order.commission_lines_count = count
+            order.commission_lines_count = sum(
+                1 for dummy, dummy, partner_field, amount_field, *dummy in COMMISSION_ROLES
+                if order[partner_field] and order[amount_field])
     
     @api.depends('order_line.invoice_lines', 'order_line.product_uom_qty', 'order_line.qty_invoiced')
     def _compute_is_fully_invoiced(self):
@@ -405,64 +402,40 @@ class SaleOrder(models.Model):
     def _check_po_creation_constraints(self):
         """Check if new PO creation is allowed based on cancellation logic."""
         self.ensure_one()
-        
-        # Get all commission partners
-        commission_partners = []
-        
-        # External partners
-        if self.broker_partner_id:
-            commission_partners.append(self.broker_partner_id)
-        if self.referrer_partner_id:
-            commission_partners.append(self.referrer_partner_id)
-        if self.cashback_partner_id:
-            commission_partners.append(self.cashback_partner_id)
-        if self.other_external_partner_id:
-            commission_partners.append(self.other_external_partner_id)
-        
-        # Internal partners
-        if self.agent1_partner_id:
-            commission_partners.append(self.agent1_partner_id)
-        if self.agent2_partner_id:
-            commission_partners.append(self.agent2_partner_id)
-        if self.manager_partner_id:
-            commission_partners.append(self.manager_partner_id)
-        if self.director_partner_id:
-            commission_partners.append(self.director_partner_id)
-        
-        # Legacy partners
-        if self.consultant_id:
-            commission_partners.append(self.consultant_id)
-        if self.manager_id:
-            commission_partners.append(self.manager_id)
-        if self.director_id:
-            commission_partners.append(self.director_id)
-        if self.second_agent_id:
-            commission_partners.append(self.second_agent_id)
-        
-        # Check each partner for existing POs
-        for partner in commission_partners:
-            existing_pos = self.env['purchase.order'].search([
-                ('partner_id', '=', partner.id),
-                ('origin_so_id', '=', self.id),
-                ('state', 'not in', ['draft', 'cancel'])
-            ])
-            
-            if existing_pos and not self.commission_processed:
-                # Allow creation only if there are cancelled POs (indicating updates are allowed)
-                cancelled_pos = self.env['purchase.order'].search([
-                    ('partner_id', '=', partner.id),
-                    ('origin_so_id', '=', self.id),
-                    ('state', '=', 'cancel')
-                ])
-                
-                if not cancelled_pos:
-                    raise ValidationError(
-                        f"Cannot create new purchase orders for partner '{partner.name}' "
-                        f"because confirmed POs already exist: {', '.join(existing_pos.mapped('name'))}. "
+        error = self._get_po_creation_constraint_errors().get(self.id)
+        if error:
+            raise ValidationError(error)
+        return True
+
+    def _get_po_creation_constraint_errors(self):
+        """Check the PO creation constraints of all the orders with one query:
+        a commission partner having confirmed POs and no cancelled PO on an
+        unprocessed order blocks the creation of new POs.
+
+        :return: {order id: error message} of the blocked orders
+        """
+        existing = defaultdict(lambda: {'confirmed': [], 'cancelled': False})
+        for po in self.env['purchase.order'].search_read(
+                [('origin_so_id', 'in', self.ids), ('state', '!=', 'draft')],
+                ['origin_so_id', 'partner_id', 'state', 'name']):
+            pos = existing[(po['origin_so_id'][0], po['partner_id'][0])]
+            if po['state'] == 'cancel':
+                pos['cancelled'] = True
+            else:
+                pos['confirmed'].append(po['name'])
+        errors = {}
+        for order in self.filtered(lambda o: not o.commission_processed):
+            for partner_id in order._get_all_commission_partners():
+                pos = existing.get((order.id, partner_id))
+                if pos and pos['confirmed'] and not pos['cancelled']:
+                    errors[order.id] = (
+                        f"Cannot create new purchase orders for partner "
+                        f"'{self.env['res.partner'].browse(partner_id).name}' "
+                        f"because confirmed POs already exist: {', '.join(pos['confirmed'])}. "
                         f"To update commissions, first cancel the existing POs."
                     )
-        
-        return True
+                    break
+        return errors
 
     def _calculate_commission_amount(self, rate, commission_type, order):
         if commission_type == 'fixed':
@@ -542,6 +515,8 @@ class SaleOrder(models.Model):
             order.company_share = base_amount - order.total_commission_amount
             order.net_company_share = order.company_share
 
+        self.env['commission.ledger']._mark_orders(self._origin.ids)
+
     @api.depends('amount_total')
     def _compute_sales_value(self):
         for order in self:
@@ -628,39 +603,55 @@ class SaleOrder(models.Model):
     def _get_all_commission_partners(self):
         """Get all commission partner IDs from this sale order."""
         self.ensure_one()
-        partner_ids = []
-        
-        # Legacy commission partners
-        if self.consultant_id:
-            partner_ids.append(self.consultant_id.id)
-        if self.manager_id:
-            partner_ids.append(self.manager_id.id)
-        if self.director_id:
-            partner_ids.append(self.director_id.id)
-        if self.second_agent_id:
-            partner_ids.append(self.second_agent_id.id)
-        
-        # External commission partners
-        if self.broker_partner_id:
-            partner_ids.append(self.broker_partner_id.id)
-        if self.referrer_partner_id:
-            partner_ids.append(self.referrer_partner_id.id)
-        if self.cashback_partner_id:
-            partner_ids.append(self.cashback_partner_id.id)
-        if self.other_external_partner_id:
-            partner_ids.append(self.other_external_partner_id.id)
-        
-        # Internal commission partners
-        if self.agent1_partner_id:
-            partner_ids.append(self.agent1_partner_id.id)
-        if self.agent2_partner_id:
-            partner_ids.append(self.agent2_partner_id.id)
-        if self.manager_partner_id:
-            partner_ids.append(self.manager_partner_id.id)
-        if self.director_partner_id:
-            partner_ids.append(self.director_partner_id.id)
-        
-        return list(set(partner_ids))  # Remove duplicates
+        return list({
+            self[partner_field].id
+            for dummy, dummy, partner_field, *dummy in COMMISSION_ROLES
+            if self[partner_field]
+        })
+
+    def _get_commission_ledger_values(self):
+        """Commission ledger rows of the orders: one per role having a partner
+        and a commission amount."""
+        vals_list = []
+        for order in self:
+            bases = {
+                'fixed': 0.0,
+                'percent_unit_price': order.order_line[:1].price_unit,
+                'percent_untaxed_total': order.amount_untaxed,
+                'percent_total': order.amount_total,
+            }
+            state = 'cancel' if order.state == 'cancel' else order.commission_status or 'draft'
+            for sequence, (role, category, partner_field, amount_field, rate_field, type_field,
+                           dummy) in enumerate(COMMISSION_ROLES):
+                partner = order[partner_field]
+                amount = order[amount_field]
+                if not partner or not amount:
+                    continue
+                basis = order[type_field] if type_field else 'percent_total'
+                vals_list.append({
+                    'sale_order_id': order.id,
+                    'sequence': sequence,
+                    'role': role,
+                    'category': category,
+                    'partner_id': partner.id,
+                    'date': order.date_order.date() if order.date_order else False,
+                    'company_id': order.company_id.id,
+                    'currency_id': order.currency_id.id,
+                    'basis': basis,
+                    'base_amount': bases.get(basis, 0.0),
+                    'rate': order[rate_field],
+                    'amount': amount,
+                    'state': state,
+                })
+        return vals_list
+
+    def action_download_commission_reports(self):
+        """Download the commission reports of the selected orders.
+
+        One order gives its PDF, several orders a single merged PDF rendered
+        from one read of the orders."""
+        download = self.env['commission.report.download'].create({'sale_order_ids': [(6, 0, self.ids)]})
+        return download.action_download()
 
     def action_view_commission_pos(self):
         """Action to view commission purchase orders."""
@@ -686,96 +677,13 @@ class SaleOrder(models.Model):
     def _get_commission_entries(self):
         """Get all commission entries that need purchase orders."""
         self.ensure_one()
-        commissions = []
-
-        # Legacy commissions
-        if self.consultant_id and self.salesperson_commission > 0:
-            commissions.append({
-                'partner': self.consultant_id,
-                'amount': self.salesperson_commission,
-                'description': f"Consultant Commission for SO: {self.name}"
-            })
-
-        if self.manager_id and self.manager_commission > 0:
-            commissions.append({
-                'partner': self.manager_id,
-                'amount': self.manager_commission,
-                'description': f"Manager Commission for SO: {self.name}"
-            })
-
-        if self.second_agent_id and self.second_agent_commission > 0:
-            commissions.append({
-                'partner': self.second_agent_id,
-                'amount': self.second_agent_commission,
-                'description': f"Second Agent Commission for SO: {self.name}"
-            })
-
-        if self.director_id and self.director_commission > 0:
-            commissions.append({
-                'partner': self.director_id,
-                'amount': self.director_commission,
-                'description': f"Director Commission for SO: {self.name}"
-            })
-
-        # External commissions
-        if self.broker_partner_id and self.broker_amount > 0:
-            commissions.append({
-                'partner': self.broker_partner_id,
-                'amount': self.broker_amount,
-                'description': f"Broker Commission for SO: {self.name}"
-            })
-
-        if self.referrer_partner_id and self.referrer_amount > 0:
-            commissions.append({
-                'partner': self.referrer_partner_id,
-                'amount': self.referrer_amount,
-                'description': f"Referrer Commission for SO: {self.name}"
-            })
-
-        if self.cashback_partner_id and self.cashback_amount > 0:
-            commissions.append({
-                'partner': self.cashback_partner_id,
-                'amount': self.cashback_amount,
-                'description': f"Cashback for SO: {self.name}"
-            })
-
-        if self.other_external_partner_id and self.other_external_amount > 0:
-            commissions.append({
-                'partner': self.other_external_partner_id,
-                'amount': self.other_external_amount,
-                'description': f"Other External Commission for SO: {self.name}"
-            })
-
-        # Internal commissions
-        if self.agent1_partner_id and self.agent1_amount > 0:
-            commissions.append({
-                'partner': self.agent1_partner_id,
-                'amount': self.agent1_amount,
-                'description': f"Agent 1 Commission for SO: {self.name}"
-            })
-
-        if self.agent2_partner_id and self.agent2_amount > 0:
-            commissions.append({
-                'partner': self.agent2_partner_id,
-                'amount': self.agent2_amount,
-                'description': f"Agent 2 Commission for SO: {self.name}"
-            })
-
-        if self.manager_partner_id and self.manager_amount > 0:
-            commissions.append({
-                'partner': self.manager_partner_id,
-                'amount': self.manager_amount,
-                'description': f"Manager Commission for SO: {self.name}"
-            })
-
-        if self.director_partner_id and self.director_amount > 0:
-            commissions.append({
-                'partner': self.director_partner_id,
-                'amount': self.director_amount,
-                'description': f"Director Commission for SO: {self.name}"
-            })
-
-        return commissions
+        self.env['commission.ledger']._flush_pending()
+        labels = {role: label for role, *dummy, label in COMMISSION_ROLES}
+        return [{
+            'partner': line.partner_id,
+            'amount': line.amount,
+            'description': f"{labels[line.role]} for SO: {self.name}"
+        } for line in self.commission_ledger_ids.sorted('sequence') if line.amount > 0]
 
     def _create_commission_purchase_orders(self):
         """Create purchase orders for all applicable commissions."""
@@ -789,54 +697,108 @@ class SaleOrder(models.Model):
         
         # Check PO creation constraints (cancellation logic)
         self._check_po_creation_constraints()
-        
-        # Update status
-        self.commission_status = 'calculated'
-        
+
         try:
-            # Get commission product
-            commission_product = self._get_or_create_commission_product()
-            created_pos = []
+            created_pos, errors = self._process_commissions_batch()
+        except Exception as e:
+            _logger.error(f"Error creating commission purchase orders: {str(e)}")
+            raise UserError(f"Failed to process commissions: {str(e)}")
+        if errors:
+            raise UserError(errors[self.id])
+
+        message = f"Successfully created {len(created_pos)} commission purchase orders with total amount {sum(created_pos.mapped('amount_total'))}"
+        return {
+            'type': 'ir.actions.client',
+            'tag': 'display_notification',
+            'params': {
+                'title': 'Success',
+                'message': message,
+                'type': 'success',
+                'sticky': False,
+            }
+        }
+
+    def _process_commissions_batch(self):
+        """Create the commission purchase orders of all the orders with one
+        create, then mark the orders processed with one write.
 
-            # Get all commission entries
-            commissions = self._get_commission_entries()
+        Orders that cannot be processed are skipped and reported.
 
-            # Create purchase orders
-            for commission in commissions:
-                po_vals = self._prepare_purchase_order_vals(
+        :return: (created purchase orders, {order id: error message})
+        """
+        errors = self._get_po_creation_constraint_errors()
+        commission_product = self._get_or_create_commission_product()
+        po_vals_list = []
+        processed = self.browse()
+        for order in self:
+            if order.id in errors:
+                continue
+            if order.commission_processed:
+                errors[order.id] = "Commissions have already been processed for this order."
+                continue
+            if order.amount_total <= 0:
+                errors[order.id] = "Cannot process commissions for orders with zero or negative amounts."
+                continue
+            commissions = order._get_commission_entries()
+            if not commissions:
+                errors[order.id] = "No commissions were created. Please check commission settings."
+                continue
+            po_vals_list += [
+                order._prepare_purchase_order_vals(
                     partner=commission['partner'],
                     product=commission_product,
                     amount=commission['amount'],
-                    description=commission['description']
-                )
-                po = self.env['purchase.order'].create(po_vals)
-                created_pos.append(po)
-                _logger.info(f"Created commission PO: {po.name}")
+                    description=commission['description'])
+                for commission in commissions
+            ]
+            processed |= order
+
+        created_pos = self.env['purchase.order'].create(po_vals_list)
+        if processed:
+            processed.write({
+                'commission_processed': True,
+                'commission_status': 'calculated',
+                'commission_error': False,
+                'commission_error_count': 0,
+            })
+            pos_by_order = defaultdict(lambda: self.env['purchase.order'])
+            for po in created_pos:
+                pos_by_order[po.origin_so_id.id] |= po
+            processed._message_log_batch(bodies={
+                order.id: f"Successfully created {len(pos_by_order[order.id])} commission purchase "
+                          f"orders with total amount {sum(pos_by_order[order.id].mapped('amount_total'))}"
+                for order in processed
+            })
+            _logger.info("Created %s commission POs for %s orders", len(created_pos), len(processed))
+        return created_pos, errors
 
-            # Mark as processed
-            self.commission_processed = True
-            
-            if created_pos:
-                message = f"Successfully created {len(created_pos)} commission purchase orders with total amount {sum(po.amount_total for po in created_pos)}"
-                self.message_post(body=message)
-                return {
-                    'type': 'ir.actions.client',
-                    'tag': 'display_notification',
-                    'params': {
-                        'title': 'Success',
-                        'message': message,
-                        'type': 'success',
-                        'sticky': False,
-                    }
-                }
-            else:
-                self.commission_status = 'draft'
-                raise UserError("No commissions were created. Please check commission settings.")
-                
+    def _process_commissions_safely(self):
+        """Process the commissions of the orders in a savepoint. When the batch
+        fails, its orders are processed one by one so that only the failing
+        orders are left out.
+
+        :return: {order id: error message} of the orders left out
+        """
+        try:
+            with self.env.cr.savepoint():
+                return self._process_commissions_batch()[1]
         except Exception as e:
-            self.commission_status = 'draft'
-            _logger.error(f"Error creating commission purchase orders: {str(e)}")
-            raise UserError(f"Failed to process commissions: {str(e)}")
+            self.env.invalidate_all()
+            if len(self) == 1:
+                _logger.exception("Commission processing failed for %s", self.name)
+                return {self.id: str(e)}
+        errors = {}
+        for order in self:
+            errors.update(order._process_commissions_safely())
+        return errors
+
+    def _record_commission_errors(self, errors):
+        """Keep the processing error of the orders for the next cron attempts"""
+        for order in self:
+            order.write({
+                'commission_error': errors[order.id],
+                'commission_error_count': order.commission_error_count + 1,
+            })
 
     def action_process_commissions(self):
         """Manual action to process commissions."""
@@ -874,6 +836,8 @@ class SaleOrder(models.Model):
             
             order.commission_status = 'draft'
             order.commission_processed = False
+            order.commission_error = False
+            order.commission_error_count = 0
             order.message_post(body="Commission status reset to draft. Purchase orders deleted.")
         return True
 
@@ -921,12 +885,10 @@ class SaleOrder(models.Model):
         )
         
         if auto_process and auto_process.lower() == 'true':
-            for order in self:
-                if not order.commission_processed:
-                    try:
-                        order._create_commission_purchase_orders()
-                    except Exception as e:
-                        _logger.warning(f"Auto commission processing failed for {order.name}: {str(e)}")
+            orders = self.filtered(lambda o: not o.commission_processed)
+            errors = orders._process_commissions_safely() if orders else {}
+            for order in orders.browse(list(errors)):
+                _logger.warning(f"Auto commission processing failed for {order.name}: {errors[order.id]}")
         
         return result
 
@@ -954,6 +916,11 @@ class SaleOrder(models.Model):
                             order._check_partner_po_cancellation_required(old_partner)
         
         result = super(SaleOrder, self).write(vals)
+
+        # Ledger rows follow partners, status and dates; amounts follow _compute_commissions
+        if any(field in vals for field in commission_partner_fields + [
+                'commission_status', 'state', 'date_order', 'company_id', 'currency_id']):
+            self.env['commission.ledger']._mark_orders(self.ids)
         
         # Reset commission processing if commission-related fields are changed
         commission_fields = [
@@ -986,22 +953,36 @@ class SaleOrder(models.Model):
         return result
 
     @api.model
-    def _cron_auto_process_commissions(self):
-        """Scheduled action to auto-process commissions for invoiced orders."""
-        orders = self.search([
+    def _get_commission_processing_domain(self):
+        """Invoiced orders with a posted invoice whose commissions are not processed"""
+        return [
             ('state', 'in', ['sale', 'done']),
             ('commission_processed', '=', False),
-            ('invoice_status', '=', 'invoiced')
-        ])
-        
-        for order in orders:
-            posted_invoices = order.invoice_ids.filtered(lambda inv: inv.state == 'posted')
-            if posted_invoices:
-                try:
-                    order._create_commission_purchase_orders()
-                    _logger.info(f"Auto-processed commissions for order {order.name}")
-                except Exception as e:
-                    _logger.error(f"Failed to auto-process commissions for {order.name}: {str(e)}")
+            ('invoice_status', '=', 'invoiced'),
+            ('order_line.invoice_lines.parent_state', '=', 'posted'),
+            ('commission_error_count', '<', COMMISSION_MAX_ATTEMPTS),
+        ]
+
+    @api.model
+    def _cron_auto_process_commissions(self, batch_size=COMMISSION_BATCH_SIZE):
+        """Scheduled action to auto-process commissions for invoiced orders.
+
+        Orders are processed by batches; outside tests each batch is committed
+        so that a failing batch does not roll back the others. Failing orders
+        keep their error and are retried by the next runs."""
+        orders = self.search(self._get_commission_processing_domain(), order='id')
+        auto_commit = not tools.config['test_enable']
+        processed = failed = 0
+        for order_ids in tools.split_every(batch_size, orders.ids):
+            batch = self.browse(order_ids)
+            errors = batch._process_commissions_safely()
+            if errors:
+                batch.browse(list(errors))._record_commission_errors(errors)
+            processed += len(batch) - len(errors)
+            failed += len(errors)
+            if auto_commit:
+                self.env.cr.commit()
+        _logger.info("Commission processing: %s orders processed, %s failed", processed, failed)
 
     def unlink(self):
         """Override unlink to handle related purchase orders."""
@@ -0,0 +1,4 @@
+# -*- coding: utf-8 -*-
+
+from . import test_commission_ledger
+from . import test_commission_processing
@@ -0,0 +1,43 @@
+# -*- coding: utf-8 -*-
+
+from odoo.tests.common import TransactionCase, tagged
+
+
+@tagged('post_install', '-at_install')
+class CommissionCase(TransactionCase):
+    """Sale orders with a fixed broker commission and a percentage agent commission"""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.SaleOrder = cls.env['sale.order']
+        cls.Ledger = cls.env['commission.ledger']
+        cls.customer = cls.env['res.partner'].create({'name': 'Commission Customer'})
+        cls.broker = cls.env['res.partner'].create({'name': 'Commission Broker'})
+        cls.agent = cls.env['res.partner'].create({'name': 'Commission Agent'})
+        cls.product = cls.env['product.product'].create({
+            'name': 'Commission Test Unit',
+            'type': 'service',
+            'invoice_policy': 'order',
+            'list_price': 1000.0,
+        })
+
+    @classmethod
+    def _create_order(cls, **vals):
+        """Order of 1000 with a broker commission of 500 and an agent commission of 10%"""
+        return cls.SaleOrder.create(dict({
+            'partner_id': cls.customer.id,
+            'date_order': '2031-01-15 10:00:00',
+            'order_line': [(0, 0, {
+                'product_id': cls.product.id,
+                'product_uom_qty': 1.0,
+                'price_unit': 1000.0,
+                'tax_id': [(5, 0, 0)],
+            })],
+            'broker_partner_id': cls.broker.id,
+            'broker_commission_type': 'fixed',
+            'broker_rate': 500.0,
+            'agent1_partner_id': cls.agent.id,
+            'agent1_commission_type': 'percent_untaxed_total',
+            'agent1_rate': 10.0,
+        }, **vals))
@@ -0,0 +1,87 @@
+# -*- coding: utf-8 -*-
+
+from odoo.addons.commission_ax.models.commission_ledger import LEDGER_PENDING_KEY
+
+from .common import CommissionCase
+
+
+class TestCommissionLedger(CommissionCase):
+    """Test the synchronization and the totals of the commission ledger"""
+
+    def _get_rows(self, order):
+        self.Ledger._flush_pending()
+        return self.Ledger.search([('sale_order_id', '=', order.id)])
+
+    def test_ledger_sync(self):
+        """Test that ledger rows follow the commission fields of the order"""
+        order = self._create_order()
+        order.flush_recordset()
+        self.assertIn(order.id, self.env.cr.precommit.data.get(LEDGER_PENDING_KEY, set()))
+
+        rows = self._get_rows(order)
+        self.assertFalse(self.env.cr.precommit.data.get(LEDGER_PENDING_KEY))
+        self.assertEqual(rows.mapped('role'), ['broker', 'agent1'])
+        broker_row, agent_row = rows
+        self.assertEqual(broker_row.partner_id, self.broker)
+        self.assertEqual((broker_row.basis, broker_row.base_amount, broker_row.amount), ('fixed', 0, 500))
+        self.assertEqual(agent_row.partner_id, self.agent)
+        self.assertEqual((agent_row.basis, agent_row.base_amount, agent_row.amount),
+                         ('percent_untaxed_total', 1000, 100))
+        self.assertEqual(set(rows.mapped('state')), {'draft'})
+        self.assertEqual(str(broker_row.date), '2031-01-15')
+        self.assertEqual(order.commission_lines_count, 2)
+
+        # Changed amount and status update the rows
+        order.agent1_rate = 20.0
+        order.commission_status = 'calculated'
+        rows = self._get_rows(order)
+        self.assertEqual(rows, broker_row | agent_row)
+        self.assertEqual(agent_row.amount, 200)
+        self.assertEqual(set(rows.mapped('state')), {'calculated'})
+
+        # A cleared commission removes its row
+        order.broker_rate = 0.0
+        self.assertEqual(self._get_rows(order), agent_row)
+        self.assertFalse(broker_row.exists())
+        self.assertEqual(order.commission_lines_count, 1)
+
+        # A cancelled order keeps cancelled rows
+        order._action_cancel()
+        self.assertEqual(self._get_rows(order).state, 'cancel')
+
+    def test_rebuild(self):
+        """Test that the ledger is filled again from the sale orders"""
+        order = self._create_order()
+        self._get_rows(order).unlink()
+        self.assertFalse(self._get_rows(order))
+
+        self.Ledger._rebuild()
+        rows = self.Ledger.search([('sale_order_id', '=', order.id)])
+        self.assertEqual(rows.mapped('role'), ['broker', 'agent1'])
+        self.assertEqual(rows.mapped('amount'), [500, 100])
+
+    def test_commission_totals(self):
+        """Test the grouped totals and the partner ranking"""
+        orders = self._create_order() | self._create_order(agent1_rate=5.0)
+        cancelled = self._create_order()
+        cancelled._action_cancel()
+        domain = [('sale_order_id', 'in', (orders | cancelled).ids)]
+
+        totals = {
+            group['partner_id'][0]: group
+            for group in self.Ledger.get_commission_totals(['partner_id'], domain)
+        }
+        self.assertEqual(set(totals), {self.broker.id, self.agent.id})
+        self.assertEqual((totals[self.broker.id]['amount'], totals[self.broker.id]['count']), (1000, 2))
+        self.assertEqual((totals[self.agent.id]['amount'], totals[self.agent.id]['count']), (150, 2))
+        self.assertEqual(totals[self.agent.id]['base_amount'], 2000)
+
+        cancelled_totals = self.Ledger.get_commission_totals(['role'], domain, states=['cancel'])
+        self.assertEqual(sorted((group['role'], group['amount']) for group in cancelled_totals),
+                         [('agent1', 100), ('broker', 500)])
+
+        ranking = self.Ledger.get_partner_ranking('2031-01-01', '2031-01-31')
+        self.assertEqual([group['partner_id'][0] for group in ranking], [self.broker.id, self.agent.id])
+        self.assertEqual([group['amount'] for group in ranking], [1000, 150])
+        ranking = self.Ledger.get_partner_ranking('2031-01-01', '2031-01-31', roles=['agent1'])
+        self.assertEqual([group['partner_id'][0] for group in ranking], [self.agent.id])
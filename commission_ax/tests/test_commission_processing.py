@@ -0,0 +1,91 @@
+# -*- coding: utf-8 -*-
+
+from unittest.mock import patch
+
+from odoo.exceptions import UserError
+
+from odoo.addons.commission_ax.models.sale_order import COMMISSION_MAX_ATTEMPTS
+
+from .common import CommissionCase
+
+
+class TestCommissionProcessing(CommissionCase):
+    """Test the batched creation of the commission purchase orders"""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.env['ir.config_parameter'].sudo().set_param('commission_ax.auto_process_on_confirm', 'False')
+
+    def _create_confirmed_orders(self, count):
+        orders = self.SaleOrder.concat(*[self._create_order() for dummy in range(count)])
+        orders.action_confirm()
+        return orders
+
+    def _fail_purchase_order_vals(self, failing):
+        """Patch making the purchase order values of the given order raise"""
+        prepare = type(self.SaleOrder)._prepare_purchase_order_vals
+
+        def prepare_purchase_order_vals(order, *args, **kwargs):
+            if order == failing:
+                raise UserError("Vendor is blocked")
+            return prepare(order, *args, **kwargs)
+
+        return patch.object(type(self.SaleOrder), '_prepare_purchase_order_vals', prepare_purchase_order_vals)
+
+    def test_failed_batch_split(self):
+        """Test that a failing order of a batch does not prevent the others"""
+        orders = self._create_confirmed_orders(3)
+        failing = orders[1]
+
+        with self._fail_purchase_order_vals(failing):
+            errors = orders._process_commissions_safely()
+
+        self.assertEqual(list(errors), [failing.id])
+        self.assertIn("Vendor is blocked", errors[failing.id])
+        self.assertFalse(failing.commission_processed)
+        self.assertFalse(failing.purchase_order_ids)
+        for order in orders - failing:
+            self.assertTrue(order.commission_processed)
+            self.assertEqual(order.commission_status, 'calculated')
+            self.assertEqual(order.purchase_order_ids.partner_id, self.broker | self.agent)
+            self.assertEqual(sorted(order.purchase_order_ids.mapped('amount_untaxed')), [100, 500])
+
+    def test_batch_constraint_check(self):
+        """Test that an order with confirmed purchase orders is left out of its batch"""
+        orders = self._create_confirmed_orders(2)
+        blocked = orders[0]
+        purchase_order = self.env['purchase.order'].create(blocked._prepare_purchase_order_vals(
+            self.broker, self.product, 500.0, "Previous broker commission"))
+        purchase_order.button_confirm()
+
+        errors = orders._process_commissions_batch()[1]
+
+        self.assertEqual(list(errors), [blocked.id])
+        self.assertIn(purchase_order.name, errors[blocked.id])
+        self.assertEqual(blocked.purchase_order_ids, purchase_order)
+        self.assertFalse(blocked.commission_processed)
+        self.assertTrue(orders[1].commission_processed)
+
+    def test_cron_retries(self):
+        """Test that the cron keeps the error of failing orders and stops retrying them"""
+        orders = self._create_confirmed_orders(2)
+        orders._create_invoices().action_post()
+        failing, succeeding = orders
+        self.assertEqual(self.SaleOrder.search(
+            [('id', 'in', orders.ids)] + self.SaleOrder._get_commission_processing_domain()), orders)
+
+        with self._fail_purchase_order_vals(failing):
+            self.SaleOrder._cron_auto_process_commissions(batch_size=10)
+            self.assertTrue(succeeding.commission_processed)
+            self.assertFalse(failing.commission_processed)
+            self.assertEqual(failing.commission_error_count, 1)
+            self.assertIn("Vendor is blocked", failing.commission_error)
+
+            for dummy in range(COMMISSION_MAX_ATTEMPTS):
+                self.SaleOrder._cron_auto_process_commissions(batch_size=10)
+
+        self.assertEqual(failing.commission_error_count, COMMISSION_MAX_ATTEMPTS)
+        self.assertFalse(self.SaleOrder.search(
+            [('id', 'in', orders.ids)] + self.SaleOrder._get_commission_processing_domain()))
+        self.assertEqual(len(succeeding.purchase_order_ids), 2)
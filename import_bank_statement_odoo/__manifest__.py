@@ -21,7 +21,7 @@
 ###############################################################################
 {
     'name': 'Import Bank Statement Odoo17',
-    'version': '17.0.1.0.0',
+    'version': '17.0.1.0.2',
     'category': 'Accounting',
     'summary': 'Odoo 17 Account Bank Statement Import, Import Bank Statement,CSV, XLSX, OFX, QIF Statements Import, Odoo 17 Accounting, Odoo17, Bank Statements, Import Statement Files',
     'description': """Odoo 17 Account Bank Statement Import, CSV, XLSX, OFX, QIF Statements Import, Odoo 17 Accounting, Odoo17, Bank Statements""",
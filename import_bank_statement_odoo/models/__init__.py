@@ -20,3 +20,4 @@
 #
 ###############################################################################
 from . import account_journal
+from . import account_bank_statement_line
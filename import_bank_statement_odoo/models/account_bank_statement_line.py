@@ -0,0 +1,38 @@
+# -*- coding: utf-8 -*-
+###############################################################################
+#
+#    Cybrosys Technologies Pvt. Ltd.
+#
+#    Copyright (C) 2024-TODAY Cybrosys Technologies(<https://www.cybrosys.com>)
+#    Author: Akhil Ashok (odoo@cybrosys.com)
+#
+#    You can modify it under the terms of the GNU LESSER
+#    GENERAL PUBLIC LICENSE (LGPL v3), Version 3.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU LESSER GENERAL PUBLIC LICENSE (LGPL v3) for more details.
+#
+#    You should have received a copy of the GNU LESSER GENERAL PUBLIC LICENSE
+#    (LGPL v3) along with this program.
+#    If not, see <http://www.gnu.org/licenses/>.
+#
+###############################################################################
+from odoo import fields, models
+
+
+class AccountBankStatementLine(models.Model):
+    """ To remember which file transactions were already imported """
+    _inherit = "account.bank.statement.line"
+
+    import_fingerprint = fields.Char(
+        string="Import Fingerprint", copy=False, readonly=True,
+        help="Hash of the journal, date, amount, reference and bank "
+             "transaction id of an imported transaction, used to skip "
+             "transactions already imported from an overlapping file")
+
+    _sql_constraints = [
+        ('import_fingerprint_unique', 'unique(import_fingerprint)',
+         'This transaction has already been imported.'),
+    ]
@@ -20,16 +20,20 @@
 #
 ###############################################################################
 import base64
-import codecs
+import csv
+import hashlib
+import io
 import openpyxl
 import os
 from datetime import datetime
-from io import BytesIO
 from odoo import fields, models, _
 from odoo.exceptions import ValidationError
 from ofxparse import OfxParser
 from qifparse.parser import QifParser
 
+# Number of parsed rows handled per partner lookup / create round trip
+IMPORT_BATCH_SIZE = 1000
+
 
 class ImportBankStatement(models.TransientModel):
     """ A class to import files as bank statement """
@@ -45,281 +49,281 @@ class ImportBankStatement(models.TransientModel):
 
     def action_statement_import(self):
         """Function to import csv, xlsx, ofx and qif file format"""
-        split_tup = os.path.splitext(self.file_name)
-        if split_tup[1] == '.csv' or split_tup[1] == '.xlsx' or split_tup[
-            1] == '.ofx' or split_tup[1] == '.qif':
-            if split_tup[1] == '.csv':
-                # Reading csv file
-                try:
-                    file = base64.b64decode(self.attachment)
-                    file_string = file.decode('utf-8')
-                    file_string = file_string.split('\n')
-                except:
-                    raise ValidationError(_("Choose correct file"))
-                # Skipping the first line
-                firstline = True
-                for file_item in file_string:
-                    if firstline:
-                        firstline = False
-                        continue
-                    # Reading the content from csv file
-                    split_item = file_item.split(',')
-                    if split_item != ['']:
-                        if len(split_item) > 4 and split_item[0] and split_item[1] and split_item[4]:
-                            date_obj = str(fields.date.today()) if len(split_item) <= 3 or not split_item[3] else split_item[3]
-                            transaction_date = datetime.strptime(date_obj, "%Y-%m-%d")
-                            partner = self.env['res.partner'].search([
-                                ('name', '=', split_item[4])])
-                            # Creating a record in account.bank.statement model
-                            if partner:
-                                statement = self.env[
-                                    'account.bank.statement'].create({
-                                     'name': split_item[0],
-                                     'line_ids': [
-                                        (0, 0, {
-                                            'date': transaction_date,
-                                            'payment_ref': 'csv file',
-                                            'partner_id': partner.id,
-                                            'journal_id': self.journal_id.id,
-                                            'amount': split_item[1],
-                                            'amount_currency': split_item[2] if len(split_item) > 2 else 0.0,
-                                        }),
-                                    ],
-                                })
-                            else:
-                                raise ValidationError(_("Partner not exist"))
-                        else:
-                            if len(split_item) == 0 or not split_item[0]:
-                                raise ValidationError(
-                                    _("Account name is not set"))
-                            elif len(split_item) <= 1 or not split_item[1]:
-                                raise ValidationError(
-                                    _("Amount is not set"))
-                            elif len(split_item) <= 4 or not split_item[4]:
-                                date_obj = str(fields.date.today()) if len(split_item) <= 3 or not split_item[3] else split_item[3]
-                                transaction_date = datetime.strptime(date_obj, "%Y-%m-%d")
-                                # Creating a record in account.bank.statement model
-                                statement = self.env[
-                                    'account.bank.statement'].create({
-                                    'name': split_item[0],
-                                    'line_ids': [
-                                        (0, 0, {
-                                            'date': transaction_date,
-                                            'payment_ref': 'csv file',
-                                            'journal_id': self.journal_id.id,
-                                            'amount': split_item[1] if len(split_item) > 1 else 0.0,
-                                            'amount_currency': split_item[2] if len(split_item) > 2 else 0.0,
-                                        }),
-                                    ],
-                                })
-                return {
-                    'type': 'ir.actions.act_window',
-                    'name': 'Statements',
-                    'view_mode': 'tree',
-                    'res_model': 'account.bank.statement',
-                    'res_id': statement.id,
-                }
-            elif split_tup[1] == '.xlsx':
-                # Reading xlsx file
-                try:
-                    order = openpyxl.load_workbook(
-                        filename=BytesIO(base64.b64decode(self.attachment)))
-                    xl_order = order.active
-                except:
-                    raise ValidationError(_("Choose correct file"))
-                for record in xl_order.iter_rows(min_row=2, max_row=None,
-                                                 min_col=None,
-                                                 max_col=None,
-                                                 values_only=True):
-                    line = list(record)
-                    # Reading the content from file
-                    if line[0] and line[1] and line[3]:
-                        partner = self.env['res.partner'].search(
-                            [('name', '=', line[3])])
-                        date_obj = fields.date.today() if not line[2] else \
-                            line[2].date()
-                        # Creating record
-                        if partner:
-                            statement = self.env[
-                                'account.bank.statement'].create({
-                                 'name': line[0],
-                                 'line_ids': [
-                                    (0, 0, {
-                                        'date': date_obj,
-                                        'payment_ref': 'xlsx file',
-                                        'partner_id': partner.id,
-                                        'journal_id': self.journal_id.id,
-                                        'amount': line[1],
-                                    }),
-                                 ],
-                                })
-                        else:
-                            raise ValidationError(_("Partner not exist"))
-                    else:
-                        if not line[0]:
-                            raise ValidationError(
-                                _("Account name is not set"))
-                        elif not line[1]:
-                            raise ValidationError(
-                                _("Amount is not set"))
-                        elif not line[3]:
-                            date_obj = fields.date.today() if not line[2] else \
-                                line[2].date()
-                            # Creating record
-                            statement = self.env[
-                                'account.bank.statement'].create({
-                                'name': line[0],
-                                'line_ids': [
-                                    (0, 0, {
-                                        'date': date_obj,
-                                        'payment_ref': 'xlsx file',
-                                        'journal_id': self.journal_id.id,
-                                        'amount': line[1],
-                                    }),
-                                ],
-                            })
+        extension = os.path.splitext(self.file_name or '')[1]
+        readers = {
+            '.csv': self._read_csv_rows,
+            '.xlsx': self._read_xlsx_rows,
+            '.ofx': self._read_ofx_rows,
+            '.qif': self._read_qif_rows,
+        }
+        if extension not in readers:
+            raise ValidationError(_("Choose correct file"))
+        statements, skipped = self._import_rows(readers[extension]())
+        if not statements:
+            if skipped:
                 return {
-                    'type': 'ir.actions.act_window',
-                    'name': 'Statements',
-                    'view_mode': 'tree',
-                    'res_model': 'account.bank.statement',
-                    'res_id': statement.id,
+                    'type': 'ir.actions.client',
+                    'tag': 'display_notification',
+                    'params': {
+                        'type': 'info',
+                        'message': _("All %s transactions of this file were "
+                                     "already imported.", skipped),
+                    },
                 }
-            elif split_tup[1] == '.ofx':
-                # Searching the path of the file
-                file_attachment = self.env["ir.attachment"].search(
-                    ['|', ('res_field', '!=', False),
-                     ('res_field', '=', False),
-                     ('res_id', '=', self.id),
-                     ('res_model', '=', 'import.bank.statement')],
-                    limit=1)
-                file_path = file_attachment._full_path(
-                    file_attachment.store_fname)
-                # Parsing the file
-                try:
-                    with codecs.open(file_path) as fileobj:
-                        ofx_file = OfxParser.parse(fileobj)
-                except:
-                    raise ValidationError(_("Wrong file format"))
-                if not ofx_file.account:
-                    raise ValidationError(
-                        _("No account information found in OFX file."))
-                if not ofx_file.account.statement:
-                    raise ValidationError(
-                        _("No statement information found in OFX file."))
-                statement_list = []
-                # Reading the content from file
-                for transaction in ofx_file.account.statement.transactions:
-                    if transaction.type == "debit" and transaction.amount != 0:
-                        payee = transaction.payee
-                        amount = transaction.amount
-                        date = transaction.date
-                        if not date:
-                            date = fields.date.today()
-                        partner = self.env['res.partner'].search(
-                            [('name', '=', payee)])
-                        if partner:
-                            statement_list.append([partner.id, amount, date])
-                        else:
-                            raise ValidationError(_("Partner not exist"))
-                    if transaction.type == "credit" and transaction.amount != 0:
-                        payee = transaction.payee
-                        amount = transaction.amount
-                        date = transaction.date
-                        if not date:
-                            date = fields.date.today()
-                        partner = self.env['res.partner'].search(
-                            [('name', '=', payee)])
-                        if partner:
-                            statement_list.append([partner.id, amount, date])
-                        else:
-                            raise ValidationError(_("Partner not exist"))
-                # Creating record
-                if statement_list:
-                    for item in statement_list:
-                        statement = self.env['account.bank.statement'].create({
-                            'name': ofx_file.account.routing_number,
-                            'line_ids': [
-                                (0, 0, {
-                                    'date': item[2],
-                                    'payment_ref': 'ofx file',
-                                    'partner_id': item[0],
-                                    'journal_id': self.journal_id.id,
-                                    'amount': item[1],
-                                }),
-                            ],
-                        })
-                    return {
-                        'type': 'ir.actions.act_window',
-                        'name': 'Statements',
-                        'view_mode': 'tree',
-                        'res_model': 'account.bank.statement',
-                        'res_id': statement.id,
-                    }
-                else:
-                    raise ValidationError(_("There is no data to import"))
-            elif split_tup[1] == '.qif':
-                # Searching the path of qif file
-                file_attachment = self.env["ir.attachment"].search(
-                    ['|', ('res_field', '!=', False),
-                     ('res_field', '=', False),
-                     ('res_id', '=', self.id),
-                     ('res_model', '=', 'import.bank.statement')],
-                    limit=1)
-                file_path = file_attachment._full_path(
-                    file_attachment.store_fname)
-                # Parsing the qif file
-                try:
-                    parser = QifParser()
-                    with open(file_path, 'r') as qiffile:
-                        qif = parser.parse(qiffile)
-                except:
-                    raise ValidationError(_("Wrong file format"))
-                file_string = str(qif)
-                file_item = file_string.split('^')
-                file_item[-1] = file_item[-1].rstrip('\n')
-                if file_item[-1] == '':
-                    file_item.pop()
-                statement_list = []
-                for item in file_item:
-                    if not item.startswith('!Type:Bank'):
-                        item = '!Type:Bank' + item
-                    data = item.split('\n')
-                    # Reading the file content
-                    date_entry = data[1][1:]
-                    amount = float(data[2][1:])
-                    payee = data[3][1:]
-                    if amount and payee:
-                        if not date_entry:
-                            date_entry = str(fields.date.today())
-                        date_object = datetime.strptime(date_entry, '%d/%m/%Y')
-                        date = date_object.strftime('%Y-%m-%d')
-                        statement_list.append([payee, amount, date])
-                    else:
-                        if not amount:
-                            raise ValidationError(_("Amount is not set"))
-                        elif not payee:
-                            raise ValidationError(_("Payee is not set"))
-                # Creating record
-                if statement_list:
-                    for item in statement_list:
-                        statement = self.env['account.bank.statement'].create({
-                            'name': item[0],
-                            'line_ids': [
-                                (0, 0, {
-                                    'date': item[2],
-                                    'payment_ref': 'qif file',
-                                    'journal_id': self.journal_id.id,
-                                    'amount': item[1],
-                                }),
-                            ],
-                        })
-                    return {
-                        'type': 'ir.actions.act_window',
-                        'name': 'Statements',
-                        'view_mode': 'tree',
-                        'res_model': 'account.bank.statement',
-                        'res_id': statement.id,
-                    }
-        else:
+            raise ValidationError(_("There is no data to import"))
+        return {
+            'type': 'ir.actions.act_window',
+            'name': 'Statements',
+            'view_mode': 'tree',
+            'res_model': 'account.bank.statement',
+            'res_id': statements[-1].id,
+            'domain': [('id', 'in', statements.ids)],
+        }
+
+    def _read_file_bytes(self):
+        """Return the uploaded file as a binary stream"""
+        try:
+            return io.BytesIO(base64.b64decode(self.attachment))
+        except Exception:
+            raise ValidationError(_("Choose correct file"))
+
+    def _read_csv_rows(self):
+        """Yield statement rows from a csv file, one row at a time.
+        Columns: account name, amount, amount currency, date, partner"""
+        reader = csv.reader(self._decode_csv_lines(self._read_file_bytes()))
+        # Skipping the header line
+        next(reader, None)
+        for split_item in reader:
+            if not split_item or split_item == ['']:
+                continue
+            if not split_item[0]:
+                raise ValidationError(_("Account name is not set"))
+            if len(split_item) <= 1 or not split_item[1]:
+                raise ValidationError(_("Amount is not set"))
+            date_obj = split_item[3] if len(split_item) > 3 and split_item[
+                3] else str(fields.date.today())
+            yield {
+                'name': split_item[0],
+                'date': datetime.strptime(date_obj, "%Y-%m-%d"),
+                'amount': split_item[1],
+                'amount_currency': split_item[2] if len(
+                    split_item) > 2 and split_item[2] else 0.0,
+                'partner_name': split_item[4] if len(
+                    split_item) > 4 else False,
+                'payment_ref': 'csv file',
+            }
+
+    def _decode_csv_lines(self, stream):
+        """Yield the lines of a binary stream decoded as utf-8, naming the
+        first line that cannot be decoded"""
+        for line_number, line in enumerate(stream, 1):
+            try:
+                yield line.decode('utf-8')
+            except UnicodeDecodeError:
+                raise ValidationError(
+                    _("Line %s of the file is not valid UTF-8 text")
+                    % line_number)
+
+    def _read_xlsx_rows(self):
+        """Yield statement rows from the active sheet of a xlsx file.
+        The workbook is opened in read-only mode so rows are streamed
+        instead of loading the whole sheet in memory.
+        Columns: account name, amount, date, partner"""
+        try:
+            workbook = openpyxl.load_workbook(
+                filename=self._read_file_bytes(), read_only=True,
+                data_only=True)
+            xl_order = workbook.active
+        except Exception:
             raise ValidationError(_("Choose correct file"))
+        try:
+            for record in xl_order.iter_rows(min_row=2, values_only=True):
+                line = list(record) + [None] * (4 - len(record))
+                if not any(line):
+                    continue
+                if not line[0]:
+                    raise ValidationError(_("Account name is not set"))
+                if not line[1]:
+                    raise ValidationError(_("Amount is not set"))
+                yield {
+                    'name': line[0],
+                    'date': line[2].date() if line[2] else
+                    fields.date.today(),
+                    'amount': line[1],
+                    'partner_name': line[3] or False,
+                    'payment_ref': 'xlsx file',
+                }
+        finally:
+            workbook.close()
+
+    def _read_ofx_rows(self):
+        """Yield statement rows from the transactions of an ofx file"""
+        try:
+            ofx_file = OfxParser.parse(self._read_file_bytes())
+        except Exception:
+            raise ValidationError(_("Wrong file format"))
+        if not ofx_file.account:
+            raise ValidationError(
+                _("No account information found in OFX file."))
+        if not ofx_file.account.statement:
+            raise ValidationError(
+                _("No statement information found in OFX file."))
+        for transaction in ofx_file.account.statement.transactions:
+            if transaction.type not in ('debit', 'credit') or \
+                    not transaction.amount:
+                continue
+            yield {
+                'name': ofx_file.account.routing_number,
+                'date': transaction.date or fields.date.today(),
+                'amount': transaction.amount,
+                'ref': transaction.memo or transaction.payee,
+                'fitid': transaction.id,
+                'partner_name': transaction.payee,
+                'partner_required': True,
+                'payment_ref': 'ofx file',
+            }
+
+    def _read_qif_rows(self):
+        """Yield statement rows from the entries of a qif file"""
+        try:
+            stream = io.TextIOWrapper(self._read_file_bytes(),
+                                      encoding='utf-8')
+            qif = QifParser().parse(stream)
+        except Exception:
+            raise ValidationError(_("Wrong file format"))
+        file_item = str(qif).split('^')
+        file_item[-1] = file_item[-1].rstrip('\n')
+        if file_item[-1] == '':
+            file_item.pop()
+        for item in file_item:
+            if not item.startswith('!Type:Bank'):
+                item = '!Type:Bank' + item
+            data = item.split('\n')
+            # Reading the file content
+            date_entry = data[1][1:]
+            amount = float(data[2][1:])
+            payee = data[3][1:]
+            if not amount:
+                raise ValidationError(_("Amount is not set"))
+            if not payee:
+                raise ValidationError(_("Payee is not set"))
+            date = datetime.strptime(date_entry, '%d/%m/%Y').strftime(
+                '%Y-%m-%d') if date_entry else str(fields.date.today())
+            yield {
+                'name': payee,
+                'date': date,
+                'amount': amount,
+                'payment_ref': 'qif file',
+            }
+
+    def _import_rows(self, rows):
+        """Create the statements for the parsed rows.
+        Rows are consumed in batches: the partners of a batch are resolved
+        with a single search and all its lines are created in one call.
+        One statement is created per account name found in the file.
+        Returns the created statements and the number of rows skipped
+        because they were already imported."""
+        statements = self.env['account.bank.statement']
+        statement_map = {}
+        partner_map = {}
+        occurrences = {}
+        skipped = 0
+        batch = []
+        for row in rows:
+            row['fingerprint'] = self._get_row_fingerprint(row, occurrences)
+            batch.append(row)
+            if len(batch) >= IMPORT_BATCH_SIZE:
+                skipped += self._skip_imported_rows(batch)
+                statements |= self._import_batch(batch, statement_map,
+                                                 partner_map)
+                batch = []
+        if batch:
+            skipped += self._skip_imported_rows(batch)
+            statements |= self._import_batch(batch, statement_map,
+                                             partner_map)
+        return statements, skipped
+
+    def _get_row_fingerprint(self, row, occurrences):
+        """Fingerprint of a parsed row built from the journal, date,
+        amount, reference and the bank transaction id (FITID) when the
+        format provides one. Identical rows within one file are told apart
+        by their rank so genuine repeated transactions are kept, while
+        importing the same rows again gives the same fingerprints."""
+        date = row['date']
+        if hasattr(date, 'date'):
+            date = date.date()
+        key = '|'.join(str(value) for value in (
+            self.journal_id.id,
+            fields.Date.to_string(fields.Date.to_date(date)),
+            '%.6f' % float(row['amount']),
+            row.get('ref') or row.get('partner_name') or row['name'],
+            row.get('fitid') or '',
+        ))
+        rank = occurrences.get(key, 0)
+        occurrences[key] = rank + 1
+        return hashlib.sha256(('%s|%s' % (key, rank)).encode()).hexdigest()
+
+    def _skip_imported_rows(self, batch):
+        """Remove from batch, in place, the rows whose fingerprint already
+        exists, checking the whole batch with one query. Returns the number
+        of removed rows."""
+        self.env['account.bank.statement.line'].flush_model(
+            ['import_fingerprint'])
+        self.env.cr.execute(
+            """SELECT import_fingerprint FROM account_bank_statement_line
+               WHERE import_fingerprint = ANY(%s)""",
+            [[row['fingerprint'] for row in batch]])
+        existing = {fingerprint for fingerprint, in self.env.cr.fetchall()}
+        if not existing:
+            return 0
+        size = len(batch)
+        batch[:] = [row for row in batch
+                    if row['fingerprint'] not in existing]
+        return size - len(batch)
+
+    def _import_batch(self, batch, statement_map, partner_map):
+        """Create the statement lines of one batch of parsed rows"""
+        statements = self.env['account.bank.statement']
+        if not batch:
+            return statements
+        self._prefetch_partners(batch, partner_map)
+        new_names = {str(row['name']) for row in batch} - set(statement_map)
+        if new_names:
+            new_names = sorted(new_names)
+            created = self.env['account.bank.statement'].create(
+                [{'name': name} for name in new_names])
+            statement_map.update(zip(new_names, created.ids))
+            statements |= created
+        line_vals_list = []
+        for row in batch:
+            line_vals = {
+                'statement_id': statement_map[str(row['name'])],
+                'date': row['date'],
+                'payment_ref': row['payment_ref'],
+                'journal_id': self.journal_id.id,
+                'amount': row['amount'],
+                'import_fingerprint': row['fingerprint'],
+            }
+            if row.get('amount_currency'):
+                line_vals['amount_currency'] = row['amount_currency']
+            if row.get('partner_name'):
+                partner_id = partner_map.get(row['partner_name'])
+                if not partner_id:
+                    raise ValidationError(_("Partner not exist"))
+                line_vals['partner_id'] = partner_id
+            elif row.get('partner_required'):
+                raise ValidationError(_("Partner not exist"))
+            line_vals_list.append(line_vals)
+        self.env['account.bank.statement.line'].create(line_vals_list)
+        return statements
+
+    def _prefetch_partners(self, batch, partner_map):
+        """Resolve the partner names of a batch not yet known in
+        partner_map with one search"""
+        names = {row['partner_name'] for row in batch
+                 if row.get('partner_name')} - set(partner_map)
+        if not names:
+            return
+        for partner in self.env['res.partner'].search_read(
+                [('name', 'in', list(names))], ['name'], order='id'):
+            partner_map.setdefault(partner['name'], partner['id'])
@@ -1,7 +1,7 @@
 # -*- coding: utf-8 -*-
 {
     'name': 'LLM Lead Scoring',
-    'version': '17.0.1.0.0',
+    'version': '17.0.1.1.0',
     'category': 'CRM',
     'summary': 'AI-Powered Lead Scoring with Multi-LLM Support',
     'description': """
@@ -45,6 +45,7 @@ The module leverages LLM reasoning capabilities to help sales teams:
         'wizards/lead_enrichment_wizard_views.xml',
         'wizards/google_search_setup_wizard_views.xml',
         'views/llm_provider_views.xml',
+        'views/llm_enrichment_job_views.xml',
         'views/res_config_settings_views.xml',
         'views/crm_lead_views.xml',
     ],
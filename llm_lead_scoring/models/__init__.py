@@ -2,6 +2,10 @@
 
 from . import llm_provider
 from . import llm_service
+from . import llm_response_cache
+from . import llm_enrichment_job
+from . import web_research_cache
+from . import web_research_quota
 from . import web_research_service
 from . import crm_lead
 from . import res_config_settings
@@ -2,11 +2,18 @@
 
 import json
 import logging
-from odoo import models, fields, api, _
+from concurrent.futures import ThreadPoolExecutor
+
+from odoo import models, fields, api, tools, _
 from odoo.exceptions import UserError
 
+from .llm_service import BATCH_SCORING_SIZE
+
 _logger = logging.getLogger(__name__)
 
+# Seconds during which a run of the enrichment cron leases new jobs, by default
+ENRICHMENT_CRON_TIME_LIMIT = 60
+
 
 class CrmLead(models.Model):
     _inherit = 'crm.lead'
@@ -72,6 +79,12 @@ class CrmLead(models.Model):
         help='Complete HTML enrichment report with scores and analysis',
     )
 
+    ai_enrichment_job_ids = fields.One2many(
+        'llm.enrichment.job', 'lead_id',
+        string='Enrichment Jobs',
+        readonly=True,
+    )
+
     # Configuration
     auto_enrich = fields.Boolean(
         string='Auto Enrich',
@@ -115,101 +128,20 @@ class CrmLead(models.Model):
             self.write({'ai_enrichment_status': 'processing'})
             # Let Odoo handle transaction management
 
-            llm_service = self.env['llm.service']
-            web_research_service = self.env['web.research.service']
-            config = self.env['ir.config_parameter'].sudo()
-
-            # 1. Calculate AI Probability Score (now includes enhanced scoring)
-            _logger.info("Calculating AI score for lead: %s", self.name)
-            scoring_result = llm_service.calculate_ai_probability_score(self)
-
-            # 2. Research Customer (if enabled in settings)
-            research_result = ""
-            enable_research = llm_service._get_config_bool('llm_lead_scoring.enable_customer_research', 'True')
+            # 1. Calculate AI Probability Score and research the customer
+            _logger.info("Enriching lead: %s", self.name)
+            scoring_result, task_results = self._run_enrichment_tasks(self._get_enrichment_tasks())
+            research_result = task_results.get('research', "")
 
-            if enable_research:
-                _logger.info("Researching customer for lead: %s", self.name)
-                research_result = llm_service.research_customer(self)
-
-            # 3. Enhanced Research: Google Maps, Tech Stack, Digital Presence
-            enhanced_research = {}
-            
-            # Google Maps lookup
-            enable_maps = config.get_param('llm_lead_scoring.enable_maps_research', 'False') == 'True'
-            if enable_maps and (self.partner_name or self.contact_name):
-                _logger.info("Looking up Google Maps for lead: %s", self.name)
-                company_name = self.partner_name or self.contact_name
-                location = None
-                if self.city or self.country_id:
-                    location = f"{self.city or ''}, {self.country_id.name if self.country_id else ''}".strip(', ')
-                maps_result = web_research_service.search_google_maps(company_name, location)
-                if maps_result.get('success'):
-                    enhanced_research['google_maps'] = maps_result['data']
-            
-            # Tech stack analysis
-            enable_tech = config.get_param('llm_lead_scoring.enable_tech_analysis', 'True') == 'True'
-            if enable_tech and self.website:
-                _logger.info("Analyzing tech stack for lead: %s", self.name)
-                tech_result = web_research_service.analyze_website_technology(self.website)
-                if tech_result.get('success'):
-                    enhanced_research['tech_stack'] = tech_result['data']
-            
-            # Digital presence check
-            enable_presence = config.get_param('llm_lead_scoring.enable_digital_presence', 'True') == 'True'
-            if enable_presence and (self.partner_name or self.contact_name):
-                _logger.info("Checking digital presence for lead: %s", self.name)
-                email_domain = self.email_from.split('@')[1] if self.email_from and '@' in self.email_from else ''
-                presence_result = web_research_service.analyze_digital_presence(
-                    self.partner_name or self.contact_name,
-                    self.website,
-                    email_domain
-                )
-                if presence_result.get('success'):
-                    enhanced_research['digital_presence'] = presence_result['data']
-
-            # 4. Prepare enrichment data
-            enrichment_data = {
-                'timestamp': fields.Datetime.now().isoformat(),
-                'scores': {
-                    'overall': scoring_result['calculated_score'],
-                    'completeness': scoring_result['completeness_score'],
-                    'clarity': scoring_result['clarity_score'],
-                    'engagement': scoring_result['engagement_score'],
-                    'email_quality': scoring_result.get('email_quality_score', 0),
-                    'budget': scoring_result.get('budget_score', 0),
-                    'urgency': scoring_result.get('urgency_score', 0),
-                    'contact_quality': scoring_result.get('contact_quality_score', 0),
-                },
-                'analysis': {
-                    'completeness': scoring_result['completeness_analysis'],
-                    'clarity': scoring_result['clarity_analysis'],
-                    'engagement': scoring_result['engagement_analysis'],
-                    'llm_final': scoring_result['llm_analysis'],
-                },
-                'enhanced_analysis': {
-                    'is_decision_maker': scoring_result.get('is_decision_maker', False),
-                    'urgency_level': scoring_result.get('urgency_level', 'normal'),
-                    'is_corporate_email': scoring_result.get('is_corporate_email', False),
-                },
-                'enhanced_research': enhanced_research,
-                'research': research_result,
+            # 2. Enhanced Research: Google Maps, Tech Stack, Digital Presence
+            enhanced_research = {
+                key: task_results[key]['data']
+                for key in ('google_maps', 'tech_stack', 'digital_presence')
+                if key in task_results and task_results[key].get('success')
             }
 
-            # 5. Format plain text enrichment report
-            plain_text_report = self._format_plain_text_report(enrichment_data)
-
-            # 6. Update lead fields
-            self.write({
-                'ai_probability_score': scoring_result['calculated_score'],
-                'ai_completeness_score': scoring_result['completeness_score'],
-                'ai_clarity_score': scoring_result['clarity_score'],
-                'ai_engagement_score': scoring_result['engagement_score'],
-                'ai_enrichment_data': json.dumps(enrichment_data, indent=2),
-                'ai_last_enrichment_date': fields.Datetime.now(),
-                'ai_enrichment_status': 'completed',
-                'ai_analysis_summary': scoring_result['llm_analysis'],
-                'ai_enrichment_report': plain_text_report,
-            })
+            # 3. Store enrichment data, scores and report
+            self._write_enrichment(scoring_result, research_result, enhanced_research)
 
             _logger.info("Successfully enriched lead %s with AI score: %.2f",
                         self.name, scoring_result['calculated_score'])
@@ -243,6 +175,180 @@ class CrmLead(models.Model):
                 }
             }
 
+    def _write_enrichment(self, scoring_result, research_result, enhanced_research):
+        """Store the enrichment data, scores and HTML report of the lead"""
+        self.ensure_one()
+
+        # Prepare enrichment data
+        enrichment_data = {
+            'timestamp': fields.Datetime.now().isoformat(),
+            'scores': {
+                'overall': scoring_result['calculated_score'],
+                'completeness': scoring_result['completeness_score'],
+                'clarity': scoring_result['clarity_score'],
+                'engagement': scoring_result['engagement_score'],
+                'email_quality': scoring_result.get('email_quality_score', 0),
+                'budget': scoring_result.get('budget_score', 0),
+                'urgency': scoring_result.get('urgency_score', 0),
+                'contact_quality': scoring_result.get('contact_quality_score', 0),
+            },
+            'analysis': {
+                'completeness': scoring_result['completeness_analysis'],
+                'clarity': scoring_result['clarity_analysis'],
+                'engagement': scoring_result['engagement_analysis'],
+                'llm_final': scoring_result['llm_analysis'],
+            },
+            'enhanced_analysis': {
+                'is_decision_maker': scoring_result.get('is_decision_maker', False),
+                'urgency_level': scoring_result.get('urgency_level', 'normal'),
+                'is_corporate_email': scoring_result.get('is_corporate_email', False),
+            },
+            'enhanced_research': enhanced_research,
+            'research': research_result,
+        }
+
+        # Format plain text enrichment report
+        plain_text_report = self._format_plain_text_report(enrichment_data)
+
+        # Update lead fields
+        self.write({
+            'ai_probability_score': scoring_result['calculated_score'],
+            'ai_completeness_score': scoring_result['completeness_score'],
+            'ai_clarity_score': scoring_result['clarity_score'],
+            'ai_engagement_score': scoring_result['engagement_score'],
+            'ai_enrichment_data': json.dumps(enrichment_data, indent=2),
+            'ai_last_enrichment_date': fields.Datetime.now(),
+            'ai_enrichment_status': 'completed',
+            'ai_analysis_summary': scoring_result['llm_analysis'],
+            'ai_enrichment_report': plain_text_report,
+        })
+
+    def _rescore_with_ai(self, batch_size=BATCH_SCORING_SIZE):
+        """Score the leads again without new research, assessing them by batches
+
+        The research of the last enrichment, if any, is kept in the report.
+        Leads whose analysis or final assessment failed are marked as failed.
+
+        Returns:
+            tuple: (number of leads scored, number of leads failed)
+        """
+        scoring_results = self.env['llm.service'].calculate_ai_probability_scores(self, batch_size=batch_size)
+
+        failed = self.browse()
+        for lead in self:
+            scoring_result = scoring_results.get(lead.id)
+            if not scoring_result or not scoring_result['analysis_success']:
+                failed |= lead
+                continue
+            try:
+                previous_data = json.loads(lead.ai_enrichment_data or '{}')
+            except json.JSONDecodeError:
+                previous_data = {}
+            try:
+                with self.env.cr.savepoint():
+                    lead._write_enrichment(
+                        scoring_result,
+                        previous_data.get('research', ''),
+                        previous_data.get('enhanced_research', {}),
+                    )
+            except Exception:
+                _logger.exception("Error storing the rescoring of lead %s", lead.id)
+                failed |= lead
+
+        failed.write({
+            'ai_enrichment_status': 'failed',
+            'ai_analysis_summary': 'Rescoring failed: AI assessment unavailable',
+        })
+        _logger.info("Rescored %d leads with batched AI assessments, %d failed",
+                     len(self) - len(failed), len(failed))
+        return len(self) - len(failed), len(failed)
+
+    def _get_enrichment_tasks(self):
+        """Independent network-bound calls of the enrichment of this lead
+
+        Returns:
+            dict: {key: (service model, method name, arguments)}
+        """
+        self.ensure_one()
+        llm_service = self.env['llm.service']
+        config = self.env['ir.config_parameter'].sudo()
+        company_name = self.partner_name or self.contact_name
+
+        # Requirement clarity is the only analyzer calling the LLM
+        tasks = {'clarity': ('llm.service', 'analyze_requirement_clarity', (self,))}
+
+        # Research Customer (if enabled in settings)
+        if llm_service._get_config_bool('llm_lead_scoring.enable_customer_research', 'True'):
+            tasks['research'] = ('llm.service', 'research_customer', (self,))
+
+        # Google Maps lookup
+        enable_maps = config.get_param('llm_lead_scoring.enable_maps_research', 'False') == 'True'
+        if enable_maps and company_name:
+            location = None
+            if self.city or self.country_id:
+                location = f"{self.city or ''}, {self.country_id.name if self.country_id else ''}".strip(', ')
+            tasks['google_maps'] = ('web.research.service', 'search_google_maps', (company_name, location))
+
+        # Tech stack analysis
+        enable_tech = config.get_param('llm_lead_scoring.enable_tech_analysis', 'True') == 'True'
+        if enable_tech and self.website:
+            tasks['tech_stack'] = ('web.research.service', 'analyze_website_technology', (self.website,))
+
+        # Digital presence check
+        enable_presence = config.get_param('llm_lead_scoring.enable_digital_presence', 'True') == 'True'
+        if enable_presence and company_name:
+            email_domain = self.email_from.split('@')[1] if self.email_from and '@' in self.email_from else ''
+            tasks['digital_presence'] = ('web.research.service', 'analyze_digital_presence',
+                                         (company_name, self.website, email_domain))
+
+        return tasks
+
+    def _run_enrichment_tasks(self, tasks):
+        """Run the enrichment calls of this lead and score it
+
+        With concurrent enrichment enabled, the calls run in a bounded thread
+        pool while the local analyzers run in the main thread, and the final
+        assessment only waits for the clarity analysis. The caller writes the
+        results in the main cursor.
+
+        Args:
+            tasks: dict returned by _get_enrichment_tasks
+
+        Returns:
+            tuple: (scoring result, {task key: task result})
+        """
+        self.ensure_one()
+        llm_service = self.env['llm.service']
+        workers = llm_service._get_enrichment_workers()
+
+        if workers < 2:
+            results = {}
+            for key, (model_name, method_name, args) in tasks.items():
+                _logger.info("Running %s for lead: %s", method_name, self.name)
+                results[key] = getattr(self.env[model_name], method_name)(*args)
+            analyses = llm_service._run_lead_analyzers(self, skip=('clarity',))
+            analyses['clarity'] = results.pop('clarity')
+            return llm_service._score_lead_analyses(analyses), results
+
+        usage_log = []
+        try:
+            with ThreadPoolExecutor(max_workers=min(workers, len(tasks)),
+                                    thread_name_prefix='llm_enrichment') as executor:
+                futures = {
+                    key: executor.submit(llm_service._run_task_in_worker,
+                                         model_name, method_name, args, usage_log)
+                    for key, (model_name, method_name, args) in tasks.items()
+                }
+                analyses = llm_service._run_lead_analyzers(self, skip=('clarity',))
+                analyses['clarity'] = futures.pop('clarity').result()
+                scoring_result = llm_service._score_lead_analyses(analyses)
+                results = {key: future.result() for key, future in futures.items()}
+        finally:
+            llm_service._apply_provider_usage(usage_log)
+
+        _logger.info("Enriched lead %s with %d concurrent calls", self.name, len(tasks))
+        return scoring_result, results
+
     def _format_plain_text_report(self, data):
         """Format enrichment data as professional HTML report for Odoo display.
         
@@ -633,7 +739,11 @@ class CrmLead(models.Model):
 
     @api.model
     def _cron_enrich_leads(self):
-        """Scheduled action to enrich leads automatically"""
+        """Scheduled action to enrich leads automatically
+
+        Queues the pending leads, then runs the enrichment queue for about a
+        minute. Duplicating the scheduled action adds parallel workers.
+        """
         llm_service = self.env['llm.service']
         auto_enrich_enabled = llm_service._get_config_bool('llm_lead_scoring.auto_enrich_enabled', 'False')
 
@@ -641,23 +751,38 @@ class CrmLead(models.Model):
             _logger.info("Auto-enrichment is disabled in settings")
             return
 
-        # Find leads that need enrichment
-        leads_to_enrich = self.search([
-            ('auto_enrich', '=', True),
-            ('ai_enrichment_status', 'in', ['pending', 'failed']),
-            ('type', '=', 'opportunity'),  # Only enrich opportunities
-            ('active', '=', True),
-        ], limit=50)  # Limit to avoid overload
-
+        jobs = self.env['llm.enrichment.job']
+        leads_to_enrich = jobs._enqueue_pending_leads()
         _logger.info("Found %d leads to enrich", len(leads_to_enrich))
 
-        for lead in leads_to_enrich:
-            try:
-                lead._enrich_lead()
-                # Let Odoo handle transaction management
-            except Exception as e:
-                _logger.error("Failed to enrich lead %s: %s", lead.id, str(e))
-                continue
+        jobs.process_jobs(time_limit=self._get_enrichment_cron_time_limit())
+
+        # Continue right after this run when the time limit stopped the queue
+        if jobs._has_due_jobs():
+            cron = self.env.ref('llm_lead_scoring.ir_cron_enrich_leads', raise_if_not_found=False)
+            if cron:
+                cron._trigger()
+
+    @api.model
+    def _get_enrichment_cron_time_limit(self):
+        """Seconds during which the enrichment cron leases new jobs
+
+        The lead being enriched when the limit is reached still has to finish
+        before the server kills the cron worker (limit_time_real_cron, or
+        limit_time_real when unset), so at most half of that limit is used.
+        """
+        config = self.env['ir.config_parameter'].sudo()
+        try:
+            time_limit = int(config.get_param('llm_lead_scoring.enrichment_cron_time_limit',
+                                              ENRICHMENT_CRON_TIME_LIMIT))
+        except ValueError:
+            time_limit = ENRICHMENT_CRON_TIME_LIMIT
+        real_limit = tools.config.get('limit_time_real_cron') or 0
+        if real_limit < 0:
+            real_limit = tools.config.get('limit_time_real') or 0
+        if real_limit > 0:
+            time_limit = min(time_limit, real_limit // 2)
+        return max(1, time_limit)
 
     @api.model_create_multi
     def create(self, vals_list):
@@ -668,11 +793,11 @@ class CrmLead(models.Model):
         auto_enrich_new = llm_service._get_config_bool('llm_lead_scoring.auto_enrich_new_leads', 'False')
 
         if auto_enrich_new:
-            for lead in leads:
-                if lead.auto_enrich and lead.type == 'opportunity':
-                    # Mark as pending for cron to process
-                    # This avoids blocking lead creation and doesn't require queue_job
-                    lead.write({'ai_enrichment_status': 'pending'})
+            to_enrich = leads.filtered(lambda lead: lead.auto_enrich and lead.type == 'opportunity')
+            # Mark as pending and queue for the cron workers
+            # This avoids blocking lead creation and doesn't require queue_job
+            to_enrich.write({'ai_enrichment_status': 'pending'})
+            self.env['llm.enrichment.job']._enqueue(to_enrich)
 
         return leads
 
@@ -691,10 +816,10 @@ class CrmLead(models.Model):
             auto_enrich_update = llm_service._get_config_bool('llm_lead_scoring.auto_enrich_on_update', 'False')
 
             if auto_enrich_update:
-                for lead in self:
-                    if lead.auto_enrich and lead.type == 'opportunity':
-                        # Mark as pending for next cron run
-                        lead.write({'ai_enrichment_status': 'pending'})
+                to_enrich = self.filtered(lambda lead: lead.auto_enrich and lead.type == 'opportunity')
+                # Mark as pending and queue for the next cron run
+                to_enrich.write({'ai_enrichment_status': 'pending'})
+                self.env['llm.enrichment.job']._enqueue(to_enrich)
 
         return result
 
@@ -0,0 +1,274 @@
+# -*- coding: utf-8 -*-
+
+import logging
+import os
+import socket
+import time
+from datetime import timedelta
+
+from odoo import models, fields, api, tools
+from odoo.tools.sql import create_index, index_exists
+
+_logger = logging.getLogger(__name__)
+
+# Visibility timeout: a leased job whose worker died is leased again after this delay
+LEASE_DURATION_MINUTES = 15
+# Enrichment attempts of a lead before its job fails
+MAX_ATTEMPTS = 5
+# Delay before the first retry, doubled at each attempt
+RETRY_BASE_DELAY_MINUTES = 5
+# Done and failed jobs kept for monitoring
+JOB_RETENTION_DAYS = 30
+# Lease order of the due jobs, by default and when the web research quota is low
+LEASE_ORDER = "job.next_attempt_date NULLS FIRST, job.id"
+LEASE_ORDER_BY_VALUE = ("lead.priority DESC NULLS LAST, lead.prorated_revenue DESC NULLS LAST, "
+                        "lead.expected_revenue DESC NULLS LAST, " + LEASE_ORDER)
+
+
+class LLMEnrichmentJob(models.Model):
+    _name = 'llm.enrichment.job'
+    _description = 'Lead Enrichment Job'
+    _order = 'id desc'
+    _rec_name = 'lead_id'
+
+    lead_id = fields.Many2one('crm.lead', string='Lead', required=True, readonly=True,
+                              index=True, ondelete='cascade')
+    state = fields.Selection([
+        ('pending', 'Pending'),
+        ('leased', 'Running'),
+        ('done', 'Done'),
+        ('failed', 'Failed'),
+    ], string='Status', default='pending', required=True, readonly=True)
+    attempts = fields.Integer(string='Attempts', readonly=True, default=0)
+    next_attempt_date = fields.Datetime(string='Next Attempt', readonly=True)
+    lease_expires_at = fields.Datetime(string='Lease Expires At', readonly=True)
+    worker = fields.Char(string='Worker', readonly=True,
+                         help='Host and process of the worker holding or last holding the lease')
+    last_error = fields.Text(string='Last Error', readonly=True)
+
+    def init(self):
+        # Leasing scans pending jobs by due date
+        create_index(self._cr, 'llm_enrichment_job_state_next_attempt_index',
+                     self._table, ['state', 'next_attempt_date'])
+        # A lead is queued at most once, even by concurrent transactions
+        if not index_exists(self._cr, 'llm_enrichment_job_pending_lead_uniq'):
+            self._cr.execute("""
+                CREATE UNIQUE INDEX llm_enrichment_job_pending_lead_uniq
+                    ON llm_enrichment_job (lead_id) WHERE state = 'pending'
+            """)
+
+    # Queueing
+    @api.model
+    def _enqueue(self, leads):
+        """Queue the enrichment of leads, unless already queued"""
+        if not leads:
+            return
+        self.flush_model()
+        self.env.cr.execute("""
+            INSERT INTO llm_enrichment_job (lead_id, state, attempts, create_uid, create_date, write_uid, write_date)
+            SELECT lead_id, 'pending', 0, %(uid)s, (now() at time zone 'UTC'), %(uid)s, (now() at time zone 'UTC')
+              FROM unnest(%(lead_ids)s::int[]) AS lead_id
+                ON CONFLICT (lead_id) WHERE state = 'pending' DO NOTHING
+        """, {'lead_ids': leads.ids, 'uid': self.env.uid})
+        self.invalidate_model()
+        leads.invalidate_recordset(['ai_enrichment_job_ids'])
+
+    @api.model
+    def _enqueue_pending_leads(self):
+        """Queue the pending leads, and the failed ones never queued (e.g. before
+        the queue existed)"""
+        leads = self.env['crm.lead'].search([
+            ('auto_enrich', '=', True),
+            ('type', '=', 'opportunity'),
+            ('active', '=', True),
+            '|',
+            ('ai_enrichment_status', '=', 'pending'),
+            '&', ('ai_enrichment_status', '=', 'failed'), ('ai_enrichment_job_ids', '=', False),
+        ])
+        self._enqueue(leads)
+        return leads
+
+    # Leasing
+    @api.model
+    def _lease(self, worker, by_value=False):
+        """
+        Lease the next due job, skipping the jobs leased by concurrent workers
+
+        Pending jobs of a lead already being enriched wait for the running job.
+
+        Args:
+            worker: Name of the leasing worker
+            by_value: Lease the leads of highest priority and expected revenue
+                first, instead of the oldest due job
+
+        Returns:
+            llm.enrichment.job: The leased job, empty when none is due
+        """
+        self.flush_model()
+        if by_value:
+            self.env['crm.lead'].flush_model(['priority', 'prorated_revenue', 'expected_revenue'])
+        self.env.cr.execute("""
+            UPDATE llm_enrichment_job
+               SET state = 'leased',
+                   attempts = attempts + 1,
+                   worker = %(worker)s,
+                   lease_expires_at = (now() at time zone 'UTC') + %(lease)s * interval '1 minute',
+                   write_uid = %(uid)s,
+                   write_date = (now() at time zone 'UTC')
+             WHERE id = (
+                SELECT job.id
+                  FROM llm_enrichment_job job
+                  JOIN crm_lead lead ON lead.id = job.lead_id
+                 WHERE job.state = 'pending'
+                   AND (job.next_attempt_date IS NULL OR job.next_attempt_date <= (now() at time zone 'UTC'))
+                   AND NOT EXISTS (
+                        SELECT 1 FROM llm_enrichment_job running
+                         WHERE running.lead_id = job.lead_id
+                           AND running.state = 'leased'
+                           AND running.lease_expires_at > (now() at time zone 'UTC'))
+                 ORDER BY {order}
+                 LIMIT 1
+                   FOR UPDATE OF job SKIP LOCKED)
+         RETURNING id
+        """.format(order=LEASE_ORDER_BY_VALUE if by_value else LEASE_ORDER),
+            {'worker': worker, 'lease': LEASE_DURATION_MINUTES, 'uid': self.env.uid})
+        job_ids = [row[0] for row in self.env.cr.fetchall()]
+        self.invalidate_model()
+        return self.browse(job_ids)
+
+    @api.model
+    def _release_expired_leases(self):
+        """Requeue the jobs whose worker died, or fail them and their lead after
+        the last attempt"""
+        self.flush_model()
+        self.env['crm.lead'].flush_model(['ai_enrichment_status'])
+        self.env.cr.execute("""
+            WITH released AS (
+                UPDATE llm_enrichment_job
+                   SET state = CASE WHEN attempts >= %(max_attempts)s THEN 'failed' ELSE 'pending' END,
+                       last_error = 'Lease expired: the worker stopped before finishing the enrichment',
+                       write_date = (now() at time zone 'UTC')
+                 WHERE state = 'leased'
+                   AND lease_expires_at <= (now() at time zone 'UTC')
+                   AND NOT EXISTS (
+                        SELECT 1 FROM llm_enrichment_job queued
+                         WHERE queued.lead_id = llm_enrichment_job.lead_id
+                           AND queued.state = 'pending')
+             RETURNING lead_id, state
+            ), failed_leads AS (
+                UPDATE crm_lead
+                   SET ai_enrichment_status = 'failed',
+                       write_date = (now() at time zone 'UTC')
+                 WHERE id IN (SELECT lead_id FROM released WHERE state = 'failed')
+             RETURNING id
+            )
+            SELECT (SELECT COUNT(*) FROM released), (SELECT COUNT(*) FROM failed_leads)
+        """, {'max_attempts': MAX_ATTEMPTS})
+        released, failed = self.env.cr.fetchone()
+        if failed:
+            self.env['crm.lead'].invalidate_model(['ai_enrichment_status'])
+            _logger.warning("Enrichment of %d leads failed: their worker stopped at the last attempt", failed)
+        # A lead queued again meanwhile keeps its pending job
+        self.env.cr.execute("""
+            UPDATE llm_enrichment_job
+               SET state = 'failed',
+                   last_error = 'Lease expired: the lead was queued again',
+                   write_date = (now() at time zone 'UTC')
+             WHERE state = 'leased'
+               AND lease_expires_at <= (now() at time zone 'UTC')
+        """)
+        self.invalidate_model()
+        return released + self.env.cr.rowcount
+
+    # Processing
+    def _run(self):
+        """Enrich the lead of a leased job, then mark the job done or schedule a retry"""
+        self.ensure_one()
+        lead = self.lead_id
+        if not lead.active or not lead.auto_enrich:
+            self.write({'state': 'done', 'lease_expires_at': False})
+            return
+
+        error = None
+        try:
+            with self.env.cr.savepoint():
+                lead._enrich_lead()
+            if lead.ai_enrichment_status == 'failed':
+                error = lead.ai_analysis_summary or 'Enrichment failed'
+        except Exception as e:
+            _logger.error("Enrichment job %s failed for lead %s: %s", self.id, lead.id, str(e), exc_info=True)
+            error = str(e)
+
+        if not error:
+            self.write({'state': 'done', 'lease_expires_at': False, 'last_error': False})
+        elif self.attempts >= MAX_ATTEMPTS:
+            self.write({'state': 'failed', 'lease_expires_at': False, 'last_error': error})
+            lead.write({'ai_enrichment_status': 'failed'})
+            _logger.warning("Enrichment of lead %s failed after %d attempts", lead.id, self.attempts)
+        else:
+            delay = RETRY_BASE_DELAY_MINUTES * (2 ** (self.attempts - 1))
+            self.write({
+                'state': 'pending',
+                'lease_expires_at': False,
+                'next_attempt_date': fields.Datetime.now() + timedelta(minutes=delay),
+                'last_error': error,
+            })
+            lead.write({'ai_enrichment_status': 'pending'})
+            _logger.info("Enrichment of lead %s will be retried in %d minutes (attempt %d/%d)",
+                         lead.id, delay, self.attempts, MAX_ATTEMPTS)
+
+    @api.model
+    def process_jobs(self, time_limit=None, worker=None):
+        """
+        Lease and run due jobs one at a time, committing after each lead
+
+        Several cron workers or standalone processes (e.g. odoo-bin shell) can
+        call this method concurrently: a job is leased by a single worker, and
+        leased again only when its worker did not finish before the lease
+        expired. When the daily web research quota runs low, the remaining
+        searches go to the leads of highest priority and expected revenue.
+
+        Args:
+            time_limit: Seconds after which no new job is leased (no limit if None)
+            worker: Name of the worker, host and process id by default
+
+        Returns:
+            int: Number of jobs run
+        """
+        worker = worker or '%s:%s' % (socket.gethostname(), os.getpid())
+        deadline = time.monotonic() + time_limit if time_limit else None
+        self._release_expired_leases()
+        self._commit()
+
+        quota = self.env['web.research.quota']
+        processed = 0
+        while deadline is None or time.monotonic() < deadline:
+            job = self._lease(worker, by_value=quota._is_low('google_search'))
+            # Make the lease visible to the other workers
+            self._commit()
+            if not job:
+                break
+            job._run()
+            self._commit()
+            processed += 1
+
+        _logger.info("Enrichment worker %s ran %d jobs", worker, processed)
+        return processed
+
+    @api.model
+    def _has_due_jobs(self):
+        return bool(self.search_count([
+            ('state', '=', 'pending'),
+            '|', ('next_attempt_date', '=', False), ('next_attempt_date', '<=', fields.Datetime.now()),
+        ], limit=1))
+
+    @api.model
+    def _commit(self):
+        if not tools.config['test_enable']:
+            self.env.cr.commit()
+
+    @api.autovacuum
+    def _gc_finished_jobs(self):
+        """Delete the done and failed jobs older than the retention period"""
+        limit_date = fields.Datetime.now() - timedelta(days=JOB_RETENTION_DAYS)
+        self.search([('state', 'in', ['done', 'failed']), ('write_date', '<', limit_date)]).unlink()
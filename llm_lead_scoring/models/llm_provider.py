@@ -36,16 +36,29 @@ class LLMProvider(models.Model):
     max_tokens = fields.Integer(string='Max Tokens', default=2000,
                                 help='Maximum tokens in response')
     timeout = fields.Integer(string='Timeout (seconds)', default=30)
+    max_concurrency = fields.Integer(string='Max Concurrent Requests', default=4,
+                                     help='Maximum simultaneous requests sent to this provider by '
+                                          'concurrent lead enrichment (0 for no limit)')
 
     # Usage tracking
     total_requests = fields.Integer(string='Total Requests', readonly=True, default=0)
     failed_requests = fields.Integer(string='Failed Requests', readonly=True, default=0)
     last_used = fields.Datetime(string='Last Used', readonly=True)
+    cache_hits = fields.Integer(string='Cache Hits', readonly=True, default=0)
+    cache_misses = fields.Integer(string='Cache Misses', readonly=True, default=0)
+    cache_hit_rate = fields.Float(string='Cache Hit Rate (%)', compute='_compute_cache_hit_rate',
+                                  digits=(16, 1))
 
     # Configuration
     company_id = fields.Many2one('res.company', string='Company',
                                  default=lambda self: self.env.company)
 
+    @api.depends('cache_hits', 'cache_misses')
+    def _compute_cache_hit_rate(self):
+        for record in self:
+            lookups = record.cache_hits + record.cache_misses
+            record.cache_hit_rate = 100.0 * record.cache_hits / lookups if lookups else 0.0
+
     @api.constrains('is_default')
     def _check_default_provider(self):
         """Ensure only one default provider exists"""
@@ -84,6 +97,13 @@ class LLMProvider(models.Model):
             if record.timeout > 300:
                 raise ValidationError(_('Timeout cannot exceed 300 seconds (5 minutes)'))
 
+    @api.constrains('max_concurrency')
+    def _check_max_concurrency(self):
+        """Validate the concurrent requests limit"""
+        for record in self:
+            if record.max_concurrency < 0:
+                raise ValidationError(_('Max concurrent requests cannot be negative'))
+
     @api.model
     def get_default_provider(self):
         """Get the default LLM provider"""
@@ -267,12 +287,16 @@ class LLMProvider(models.Model):
 
     def increment_usage(self, success=True):
         """Increment usage statistics"""
+        self._add_usage(total_requests=1, failed_requests=0 if success else 1)
+
+    def _add_usage(self, **counts):
+        """Add to the usage counters (total_requests, failed_requests, cache_hits, cache_misses)"""
         self.ensure_one()
-        self.write({
-            'total_requests': self.total_requests + 1,
-            'failed_requests': self.failed_requests + (0 if success else 1),
-            'last_used': fields.Datetime.now(),
-        })
+        vals = {name: self[name] + count for name, count in counts.items() if count}
+        if counts.get('total_requests'):
+            vals['last_used'] = fields.Datetime.now()
+        if vals:
+            self.write(vals)
 
     def get_provider_signup_url(self):
         """Get the signup/API key URL for the provider"""
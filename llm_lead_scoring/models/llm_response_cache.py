@@ -0,0 +1,157 @@
+# -*- coding: utf-8 -*-
+
+import hashlib
+import json
+import logging
+
+import psycopg2
+
+from odoo import models, fields, api
+
+from .llm_service import independent_cursor
+
+_logger = logging.getLogger(__name__)
+
+
+class LLMResponseCache(models.Model):
+    _name = 'llm.response.cache'
+    _description = 'LLM Response Cache'
+    _order = 'last_hit_date desc, id desc'
+    _rec_name = 'key'
+
+    key = fields.Char(string='Prompt Fingerprint', required=True, readonly=True,
+                      help='SHA-256 of the provider, model, parameters, system prompt and messages')
+    provider_id = fields.Many2one('llm.provider', string='Provider', required=True,
+                                  readonly=True, index=True, ondelete='cascade')
+    model_name = fields.Char(string='Model Name', readonly=True)
+    content = fields.Text(string='Response', readonly=True)
+    hit_count = fields.Integer(string='Hits', readonly=True, default=0)
+    last_hit_date = fields.Datetime(string='Last Used', readonly=True, index=True)
+    expire_date = fields.Datetime(string='Expires On', readonly=True, index=True)
+
+    _sql_constraints = [
+        ('key_unique', 'unique(key)', 'A prompt fingerprint is cached only once.'),
+    ]
+
+    @api.model
+    def _get_key(self, provider, messages, system_prompt=None):
+        """
+        Fingerprint of an LLM request: identical requests get identical responses
+
+        Args:
+            provider: llm.provider record
+            messages: List of message dicts with 'role' and 'content'
+            system_prompt: Optional system prompt
+
+        Returns:
+            str: SHA-256 hex digest
+        """
+        request = [
+            provider.id, provider.provider_type, provider.model_name,
+            provider.temperature, provider.max_tokens, system_prompt or '', messages,
+        ]
+        return hashlib.sha256(json.dumps(request, sort_keys=True).encode()).hexdigest()
+
+    @api.model
+    def _get_ttl_hours(self):
+        """Hours a cached response is served, 0 when the cache is disabled"""
+        if not self.env['llm.service']._get_config_bool('llm_lead_scoring.llm_cache_enabled', 'True'):
+            return 0
+        config = self.env['ir.config_parameter'].sudo()
+        try:
+            return max(0, int(config.get_param('llm_lead_scoring.llm_cache_ttl_hours', '24')))
+        except ValueError:
+            return 0
+
+    @api.model
+    def _lookup(self, key):
+        """
+        Get a cached response and mark it as used
+
+        The hit is counted in its own short transaction, so the row is locked
+        only for that statement; a row locked by a concurrent lookup is
+        treated as a miss rather than waited for.
+
+        Returns:
+            str: Cached response, None on a miss
+        """
+        with independent_cursor(self.env) as cr:
+            cr.execute("""
+                UPDATE llm_response_cache
+                   SET hit_count = hit_count + 1,
+                       last_hit_date = (now() at time zone 'UTC')
+                 WHERE id = (
+                    SELECT id FROM llm_response_cache
+                     WHERE key = %s AND expire_date > (now() at time zone 'UTC')
+                       FOR UPDATE SKIP LOCKED)
+             RETURNING content
+            """, [key])
+            row = cr.fetchone()
+        return row[0] if row else None
+
+    @api.model
+    def _store(self, key, provider, content, ttl_hours):
+        """Cache the response of a request, replacing an expired one
+
+        The response is committed at once in its own short transaction, so
+        that concurrent workers reuse it and never wait for its row. A
+        provider not committed yet cannot be referenced from that
+        transaction: its responses are simply not cached."""
+        try:
+            self._insert(key, provider, content, ttl_hours)
+        except psycopg2.Error as e:
+            _logger.warning("LLM response not cached for provider %s: %s", provider.id, e)
+
+    @api.model
+    def _insert(self, key, provider, content, ttl_hours):
+        with independent_cursor(self.env) as cr:
+            cr.execute("""
+                INSERT INTO llm_response_cache
+                       (key, provider_id, model_name, content, hit_count, last_hit_date, expire_date,
+                        create_uid, create_date, write_uid, write_date)
+                VALUES (%(key)s, %(provider_id)s, %(model_name)s, %(content)s, 0,
+                        (now() at time zone 'UTC'),
+                        (now() at time zone 'UTC') + %(ttl_hours)s * interval '1 hour',
+                        %(uid)s, (now() at time zone 'UTC'), %(uid)s, (now() at time zone 'UTC'))
+                ON CONFLICT (key) DO UPDATE
+                   SET content = EXCLUDED.content,
+                       last_hit_date = EXCLUDED.last_hit_date,
+                       expire_date = EXCLUDED.expire_date,
+                       write_date = EXCLUDED.write_date
+            """, {
+                'key': key,
+                'provider_id': provider.id,
+                'model_name': provider.model_name,
+                'content': content,
+                'ttl_hours': ttl_hours,
+                'uid': self.env.uid,
+            })
+
+    @api.model
+    def _cron_evict(self):
+        """Scheduled action: drop expired responses, then the least recently used
+        ones beyond the configured maximum number of entries"""
+        self.flush_model()
+        cr = self.env.cr
+        cr.execute("DELETE FROM llm_response_cache WHERE expire_date <= (now() at time zone 'UTC')")
+        expired = cr.rowcount
+
+        config = self.env['ir.config_parameter'].sudo()
+        try:
+            max_entries = int(config.get_param('llm_lead_scoring.llm_cache_max_entries', '10000') or 0)
+        except ValueError:
+            max_entries = 0
+        evicted = 0
+        if max_entries > 0:
+            cr.execute("""
+                DELETE FROM llm_response_cache
+                 WHERE id IN (
+                    SELECT id FROM llm_response_cache
+                     ORDER BY last_hit_date DESC NULLS LAST, id DESC
+                    OFFSET %s)
+            """, [max_entries])
+            evicted = cr.rowcount
+        self.invalidate_model()
+
+        _logger.info("LLM response cache: %d expired and %d least recently used entries removed",
+                     expired, evicted)
@@ -4,7 +4,10 @@ import json
 import logging
 import re
 import requests
+import threading
 import time
+from collections import Counter, defaultdict
+from contextlib import contextmanager
 from datetime import datetime
 
 from odoo import models, api, tools, _
@@ -35,6 +38,74 @@ DECISION_MAKER_TITLES = [
     'founder', 'co-founder', 'partner', 'principal', 'executive'
 ]
 
+# Analyzers combined by calculate_ai_probability_score, by result key
+LEAD_ANALYZERS = [
+    ('completeness', 'analyze_lead_completeness'),
+    ('clarity', 'analyze_requirement_clarity'),
+    ('engagement', 'analyze_activity_engagement'),
+    ('email_quality', 'analyze_email_quality'),
+    ('budget', 'analyze_budget_qualification'),
+    ('urgency', 'analyze_urgency'),
+    ('contact', 'analyze_contact_quality'),
+]
+
+# Leads assessed by one final assessment prompt in batch scoring
+BATCH_SCORING_SIZE = 10
+BATCH_SCORING_SYSTEM_PROMPT = """You are a sales expert assessing the conversion probability of CRM leads.
+Each lead comes with its initial score and 7 scoring dimensions: completeness, requirement clarity,
+engagement, email quality, budget qualification, urgency and contact quality.
+
+Respond ONLY with a JSON array holding one object per lead, in the order given:
+[{"lead_id": <lead number>, "final_score": <0-100>, "justification": "<one sentence>",
+  "priority": "HIGH|MEDIUM|LOW", "strengths": ["<strength>", ...], "concerns": ["<risk>", ...],
+  "next_actions": ["<action>", ...]}]
+Give at most 3 strengths, 3 concerns and 3 next actions per lead, as short phrases."""
+
+# Concurrent request slots per remote service, shared by the threads of the process
+_request_semaphores = {}
+_request_semaphores_lock = threading.Lock()
+# State of the enrichment worker threads (deferred provider usage)
+_worker_state = threading.local()
+
+
+@contextmanager
+def request_slot(service, limit):
+    """
+    Wait for one of the `limit` concurrent request slots of a remote service
+
+    Args:
+        service: hashable key of the service (LLM provider, Google API...)
+        limit: maximum concurrent requests, no limit if 0
+    """
+    if not limit or limit < 1:
+        yield
+        return
+    with _request_semaphores_lock:
+        semaphore = _request_semaphores.get((service, limit))
+        if semaphore is None:
+            semaphore = _request_semaphores[(service, limit)] = threading.BoundedSemaphore(limit)
+    with semaphore:
+        yield
+
+
+@contextmanager
+def independent_cursor(env):
+    """
+    Cursor of a short transaction, committed on exit
+
+    Shared counters and caches written this way are visible to the other
+    workers at once, and their rows are never locked until the end of a long
+    enrichment transaction. Tests use the test cursor instead.
+
+    Args:
+        env: Environment whose registry opens the cursor
+    """
+    if tools.config['test_enable']:
+        yield env.cr
+        return
+    with env.registry.cursor() as cr:
+        yield cr
+
 
 class LLMService(models.AbstractModel):
     _name = 'llm.service'
@@ -72,6 +143,81 @@ class LLMService(models.AbstractModel):
         config = self.env['ir.config_parameter'].sudo()
         return config.get_param(param_name, default) == 'True'
 
+    @api.model
+    def _get_enrichment_workers(self):
+        """
+        Get the number of threads enriching one lead concurrently
+
+        Worker threads use their own cursors, which do not see the data of a
+        test transaction: enrichment stays sequential when testing.
+
+        Returns:
+            int: Maximum worker threads, 0 for sequential enrichment
+        """
+        if tools.config['test_enable'] or not self._get_config_bool('llm_lead_scoring.concurrent_enrichment'):
+            return 0
+        config = self.env['ir.config_parameter'].sudo()
+        try:
+            return max(0, int(config.get_param('llm_lead_scoring.enrichment_max_workers', '5')))
+        except ValueError:
+            return 0
+
+    @api.model
+    def _run_task_in_worker(self, model_name, method_name, args, usage_log):
+        """
+        Call a service method from a worker thread, in its own cursor
+
+        Record arguments are browsed again in the worker environment, which
+        only sees committed data. Provider usage is appended to `usage_log`
+        instead of being written, so that workers never wait for rows locked
+        by the main transaction.
+
+        Args:
+            model_name: Service model, e.g. 'web.research.service'
+            method_name: Method to call
+            args: Method arguments
+            usage_log: List collecting (provider id, success) of the LLM calls
+
+        Returns:
+            Result of the method
+        """
+        with self.pool.cursor() as cr:
+            env = api.Environment(cr, self.env.uid, self.env.context, su=self.env.su)
+            args = [arg.with_env(env) if isinstance(arg, models.BaseModel) else arg for arg in args]
+            _worker_state.usage_log = usage_log
+            try:
+                return getattr(env[model_name], method_name)(*args)
+            finally:
+                _worker_state.usage_log = None
+
+    @api.model
+    def _log_provider_usage(self, provider, success=True):
+        """Count a provider call"""
+        self._log_usage(provider, total_requests=1, failed_requests=0 if success else 1)
+
+    @api.model
+    def _log_cache_usage(self, provider, hit):
+        """Count a response cache lookup"""
+        self._log_usage(provider, cache_hits=1 if hit else 0, cache_misses=0 if hit else 1)
+
+    @api.model
+    def _log_usage(self, provider, **counts):
+        """Add to the usage counters of a provider, deferred to the main cursor in worker threads"""
+        usage_log = getattr(_worker_state, 'usage_log', None)
+        if usage_log is not None:
+            usage_log.append((provider.id, counts))
+        else:
+            provider._add_usage(**counts)
+
+    @api.model
+    def _apply_provider_usage(self, usage_log):
+        """Write the provider usage deferred by worker threads"""
+        counts = defaultdict(Counter)
+        for provider_id, provider_counts in usage_log:
+            counts[provider_id].update(provider_counts)
+        for provider in self.env['llm.provider'].browse(list(counts)).exists():
+            provider._add_usage(**counts[provider.id])
+
     @api.model
     def call_llm(self, messages, provider=None, system_prompt=None, max_retries=3):
         """
@@ -97,6 +243,22 @@ class LLMService(models.AbstractModel):
                 'retries': 0
             }
 
+        # Serve identical requests from the response cache
+        response_cache = self.env['llm.response.cache']
+        cache_ttl = response_cache._get_ttl_hours()
+        cache_key = response_cache._get_key(provider, messages, system_prompt) if cache_ttl else None
+        if cache_key:
+            content = response_cache._lookup(cache_key)
+            self._log_cache_usage(provider, hit=content is not None)
+            if content is not None:
+                _logger.info("LLM response served from cache: %s", provider.name)
+                return {
+                    'success': True,
+                    'content': content,
+                    'error': '',
+                    'retries': 0
+                }
+
         # Retry configuration
         retry_count = 0
         base_delay = 1.0  # Start with 1 second
@@ -113,18 +275,22 @@ class LLMService(models.AbstractModel):
                 else:
                     _logger.info("Calling LLM API: %s (%s)", provider.name, provider.provider_type)
 
-                response = requests.post(
-                    url,
-                    headers=headers,
-                    json=payload,
-                    timeout=provider.timeout
-                )
+                with request_slot(('llm.provider', self.env.cr.dbname, provider.id),
+                                  provider.max_concurrency):
+                    response = requests.post(
+                        url,
+                        headers=headers,
+                        json=payload,
+                        timeout=provider.timeout
+                    )
 
                 # Success case
                 if response.status_code == 200:
                     response_json = response.json()
                     content = provider.parse_response(response_json)
-                    provider.increment_usage(success=True)
+                    self._log_provider_usage(provider, success=True)
+                    if cache_key:
+                        response_cache._store(cache_key, provider, content, cache_ttl)
 
                     if retry_count > 0:
                         _logger.info("LLM API call succeeded after %d retries", retry_count)
@@ -154,7 +320,7 @@ class LLMService(models.AbstractModel):
                             response.status_code, retry_count, response.text[:200]
                         )
                         _logger.error(error_msg)
-                        provider.increment_usage(success=False)
+                        self._log_provider_usage(provider, success=False)
                         return {
                             'success': False,
                             'content': '',
@@ -180,7 +346,7 @@ class LLMService(models.AbstractModel):
                         error_msg = "API Error %s: %s" % (response.status_code, error_detail)
                     
                     _logger.error("%s - Provider: %s, Model: %s", error_msg, provider.name, provider.model_name)
-                    provider.increment_usage(success=False)
+                    self._log_provider_usage(provider, success=False)
                     return {
                         'success': False,
                         'content': '',
@@ -201,7 +367,7 @@ class LLMService(models.AbstractModel):
                 else:
                     error_msg = "Request timeout after %d retries" % retry_count
                     _logger.error(error_msg)
-                    provider.increment_usage(success=False)
+                    self._log_provider_usage(provider, success=False)
                     return {
                         'success': False,
                         'content': '',
@@ -222,7 +388,7 @@ class LLMService(models.AbstractModel):
                 else:
                     error_msg = "Connection error after %d retries: %s" % (retry_count, str(e)[:100])
                     _logger.error(error_msg)
-                    provider.increment_usage(success=False)
+                    self._log_provider_usage(provider, success=False)
                     return {
                         'success': False,
                         'content': '',
@@ -234,7 +400,7 @@ class LLMService(models.AbstractModel):
                 # Unexpected errors - don't retry
                 error_msg = "LLM API Error: %s" % str(e)
                 _logger.error(error_msg, exc_info=True)
-                provider.increment_usage(success=False)
+                self._log_provider_usage(provider, success=False)
                 return {
                     'success': False,
                     'content': '',
@@ -430,14 +596,7 @@ Provide your response in the following JSON format:
         if result['success']:
             try:
                 # Try to parse JSON response
-                content = result['content']
-                # Extract JSON from markdown code blocks if present
-                if '```json' in content:
-                    content = content.split('```json')[1].split('```')[0].strip()
-                elif '```' in content:
-                    content = content.split('```')[1].split('```')[0].strip()
-
-                parsed = json.loads(content)
+                parsed = json.loads(self._extract_json(result['content']))
                 return {
                     'score': float(parsed.get('score', 50)),
                     'analysis': parsed.get('analysis', ''),
@@ -834,6 +993,24 @@ Provide your response in the following JSON format:
             'has_phone': phone_count > 0
         }
 
+    @api.model
+    def _run_lead_analyzers(self, lead, skip=()):
+        """
+        Run the scoring analyzers of a lead
+
+        Args:
+            lead: crm.lead record
+            skip: Keys of LEAD_ANALYZERS computed elsewhere (e.g. concurrently)
+
+        Returns:
+            dict: Analysis result per LEAD_ANALYZERS key
+        """
+        return {
+            key: getattr(self, method_name)(lead)
+            for key, method_name in LEAD_ANALYZERS
+            if key not in skip
+        }
+
     @api.model
     def calculate_ai_probability_score(self, lead):
         """
@@ -851,16 +1028,46 @@ Provide your response in the following JSON format:
         Returns:
             dict: Complete scoring analysis
         """
-        # Get individual scores - Core factors
-        completeness = self.analyze_lead_completeness(lead)
-        clarity = self.analyze_requirement_clarity(lead)
-        engagement = self.analyze_activity_engagement(lead)
-        
-        # Get individual scores - New enhanced factors
-        email_quality = self.analyze_email_quality(lead)
-        budget = self.analyze_budget_qualification(lead)
-        urgency = self.analyze_urgency(lead)
-        contact = self.analyze_contact_quality(lead)
+        return self._score_lead_analyses(self._run_lead_analyzers(lead))
+
+    @api.model
+    def _score_lead_analyses(self, analyses):
+        """
+        Combine the analyzer results into the weighted score and the LLM final assessment
+
+        Args:
+            analyses: dict of analysis result per LEAD_ANALYZERS key
+
+        Returns:
+            dict: Complete scoring analysis
+        """
+        weighted_score = self._compute_weighted_score(analyses)
+
+        # Use LLM for final analysis and adjustment
+        messages = [{'role': 'user', 'content': self._get_final_assessment_prompt(analyses, weighted_score)}]
+        llm_result = self.call_llm(messages)
+
+        return self._get_scoring_result(
+            analyses, weighted_score,
+            llm_result['content'] if llm_result['success'] else 'Analysis unavailable',
+            llm_result['success'],
+        )
+
+    @api.model
+    def _compute_weighted_score(self, analyses):
+        """
+        Weighted score of the analyzer results, with the special bonuses
+
+        Returns:
+            float: Score between 0 and 100
+        """
+        completeness = analyses['completeness']
+        clarity = analyses['clarity']
+        engagement = analyses['engagement']
+        email_quality = analyses['email_quality']
+        budget = analyses['budget']
+        urgency = analyses['urgency']
+        contact = analyses['contact']
 
         # Get configured weights (cached for performance)
         weights = self._get_scoring_weights()
@@ -890,8 +1097,20 @@ Provide your response in the following JSON format:
         if urgency.get('urgency_level') == 'high':
             weighted_score = min(100, weighted_score + 5)  # High urgency bonus
 
-        # Use LLM for final analysis and adjustment
-        final_analysis_prompt = f"""As a sales expert, provide a final assessment of this lead's conversion probability.
+        return weighted_score
+
+    @api.model
+    def _get_final_assessment_prompt(self, analyses, weighted_score):
+        """Prompt of the LLM final assessment of one lead"""
+        completeness = analyses['completeness']
+        clarity = analyses['clarity']
+        engagement = analyses['engagement']
+        email_quality = analyses['email_quality']
+        budget = analyses['budget']
+        urgency = analyses['urgency']
+        contact = analyses['contact']
+
+        return f"""As a sales expert, provide a final assessment of this lead's conversion probability.
 
 === CORE METRICS ===
 📋 Completeness Score: {completeness['score']}/100
@@ -929,8 +1148,16 @@ Based on ALL these factors, provide:
 Be concise and actionable. Consider all 7 scoring dimensions.
 """
 
-        messages = [{'role': 'user', 'content': final_analysis_prompt}]
-        llm_result = self.call_llm(messages)
+    @api.model
+    def _get_scoring_result(self, analyses, weighted_score, llm_analysis, analysis_success):
+        """Scoring result of a lead from its analyses and final assessment"""
+        completeness = analyses['completeness']
+        clarity = analyses['clarity']
+        engagement = analyses['engagement']
+        email_quality = analyses['email_quality']
+        budget = analyses['budget']
+        urgency = analyses['urgency']
+        contact = analyses['contact']
 
         return {
             'calculated_score': round(weighted_score, 2),
@@ -957,6 +1184,141 @@ Be concise and actionable. Consider all 7 scoring dimensions.
             'email_type': email_quality.get('email_type', 'unknown'),
             'budget_mentioned': budget.get('budget_mentioned', False),
             # LLM analysis
-            'llm_analysis': llm_result['content'] if llm_result['success'] else 'Analysis unavailable',
-            'analysis_success': llm_result['success'],
+            'llm_analysis': llm_analysis,
+            'analysis_success': analysis_success,
         }
+
+    # =========================================================================
+    # BATCH SCORING: one final assessment prompt for several leads
+    # =========================================================================
+
+    @api.model
+    def calculate_ai_probability_scores(self, leads, batch_size=BATCH_SCORING_SIZE):
+        """
+        Calculate the AI probability score of several leads
+
+        The final assessments of up to `batch_size` leads are requested in one
+        LLM call, answered as a JSON array. Leads missing from the answer, or
+        whole batches whose answer cannot be parsed, are assessed one by one.
+
+        Args:
+            leads: crm.lead recordset
+            batch_size: Leads per final assessment prompt, 1 to disable batching
+
+        Returns:
+            dict: Scoring analysis per lead id, as calculate_ai_probability_score,
+                  without the leads whose analyzers failed
+        """
+        analyses = {}
+        for lead in leads:
+            try:
+                analyses[lead.id] = self._run_lead_analyzers(lead)
+            except Exception:
+                _logger.exception("Scoring analysis of lead %s failed", lead.id)
+        weighted_scores = {
+            lead_id: self._compute_weighted_score(lead_analyses)
+            for lead_id, lead_analyses in analyses.items()
+        }
+
+        results = {}
+        for lead_ids in tools.split_every(max(1, batch_size), list(analyses)):
+            assessments = self._assess_lead_batch(
+                {lead_id: (analyses[lead_id], weighted_scores[lead_id]) for lead_id in lead_ids}
+            ) if len(lead_ids) > 1 else {}
+            for lead_id in lead_ids:
+                if lead_id in assessments:
+                    results[lead_id] = self._get_scoring_result(
+                        analyses[lead_id], weighted_scores[lead_id], assessments[lead_id], True)
+                else:
+                    results[lead_id] = self._score_lead_analyses(analyses[lead_id])
+        return results
+
+    @api.model
+    def _get_lead_metrics_summary(self, lead_id, analyses, weighted_score):
+        """Compact metrics of a lead for the batch assessment prompt"""
+        email_quality = analyses['email_quality']
+        budget = analyses['budget']
+        urgency = analyses['urgency']
+        contact = analyses['contact']
+        return "\n".join([
+            f"### Lead {lead_id} - initial score {weighted_score:.1f}/100",
+            f"- Completeness {analyses['completeness']['score']}: {analyses['completeness']['analysis']}",
+            f"- Clarity {analyses['clarity']['score']}: {analyses['clarity'].get('analysis', 'N/A')}",
+            f"- Engagement {analyses['engagement']['score']}: {analyses['engagement']['analysis']}",
+            f"- Email quality {email_quality['score']} ({email_quality.get('email_type', 'unknown')}): "
+            f"{email_quality['analysis']}",
+            f"- Budget {budget['score']} (revenue {budget.get('expected_revenue', 0):,.2f}): {budget['analysis']}",
+            f"- Urgency {urgency['score']} ({urgency.get('urgency_level', 'normal')}): {urgency['analysis']}",
+            f"- Contact quality {contact['score']} "
+            f"(decision maker: {'yes' if contact.get('is_decision_maker') else 'no'}): {contact['analysis']}",
+        ])
+
+    @api.model
+    def _assess_lead_batch(self, batch):
+        """
+        Request the final assessments of several leads in one LLM call
+
+        Args:
+            batch: dict {lead id: (analyses, weighted score)}
+
+        Returns:
+            dict: Final assessment text per lead id, for the leads correctly answered
+        """
+        summaries = "\n\n".join(
+            self._get_lead_metrics_summary(lead_id, analyses, weighted_score)
+            for lead_id, (analyses, weighted_score) in batch.items()
+        )
+        messages = [{'role': 'user', 'content': f"Assess these {len(batch)} leads:\n\n{summaries}"}]
+        result = self.call_llm(messages, system_prompt=BATCH_SCORING_SYSTEM_PROMPT)
+        if not result['success']:
+            _logger.warning("Batch assessment of %d leads failed: %s", len(batch), result['error'])
+            return {}
+
+        try:
+            items = json.loads(self._extract_json(result['content']))
+        except ValueError:
+            _logger.warning("Batch assessment of %d leads is not valid JSON, assessing them one by one",
+                            len(batch))
+            return {}
+        if not isinstance(items, list):
+            return {}
+
+        assessments = {}
+        for item in items:
+            if not isinstance(item, dict):
+                continue
+            try:
+                lead_id = int(item.get('lead_id'))
+            except (TypeError, ValueError):
+                continue
+            if lead_id in batch and lead_id not in assessments:
+                assessments[lead_id] = self._format_batch_assessment(item)
+
+        if len(assessments) < len(batch):
+            _logger.info("Batch assessment answered %d of %d leads", len(assessments), len(batch))
+        return assessments
+
+    @api.model
+    def _format_batch_assessment(self, item):
+        """Final assessment text of one lead of a batch answer"""
+        def bullets(values):
+            if not isinstance(values, list):
+                values = [values] if values else []
+            return "\n".join(f"- {value}" for value in values) or "- N/A"
+
+        return (
+            f"**Final Probability Score**: {item.get('final_score', 'N/A')}/100 - {item.get('justification', '')}\n\n"
+            f"**Top Strengths**\n{bullets(item.get('strengths'))}\n\n"
+            f"**Top Concerns/Risks**\n{bullets(item.get('concerns'))}\n\n"
+            f"**Priority Level**: {item.get('priority', 'N/A')}\n\n"
+            f"**Recommended Next Actions**\n{bullets(item.get('next_actions'))}"
+        )
+
+    @api.model
+    def _extract_json(self, content):
+        """Extract JSON from markdown code blocks if present"""
+        if '```json' in content:
+            return content.split('```json')[1].split('```')[0].strip()
+        if '```' in content:
+            return content.split('```')[1].split('```')[0].strip()
+        return content.strip()
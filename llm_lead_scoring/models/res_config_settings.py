@@ -89,6 +89,66 @@ class ResConfigSettings(models.TransientModel):
         help='Check company presence on LinkedIn, Facebook, and other platforms',
     )
 
+    # Performance Settings
+    concurrent_enrichment = fields.Boolean(
+        string='Concurrent Enrichment',
+        config_parameter='llm_lead_scoring.concurrent_enrichment',
+        default=False,
+        help='Run the LLM and web research calls of a lead in parallel threads',
+    )
+
+    enrichment_max_workers = fields.Integer(
+        string='Parallel Calls per Lead',
+        config_parameter='llm_lead_scoring.enrichment_max_workers',
+        default=5,
+        help='Maximum LLM and web research calls running at the same time for one lead',
+    )
+
+    llm_cache_enabled = fields.Boolean(
+        string='Cache LLM Responses',
+        config_parameter='llm_lead_scoring.llm_cache_enabled',
+        default=True,
+        help='Reuse the response of an identical LLM request instead of calling the provider again',
+    )
+
+    llm_cache_ttl_hours = fields.Integer(
+        string='Cache Lifetime (hours)',
+        config_parameter='llm_lead_scoring.llm_cache_ttl_hours',
+        default=24,
+        help='Hours during which a cached LLM response is reused',
+    )
+
+    llm_cache_max_entries = fields.Integer(
+        string='Cache Size',
+        config_parameter='llm_lead_scoring.llm_cache_max_entries',
+        default=10000,
+        help='Maximum cached LLM responses; the least recently used ones are removed hourly',
+    )
+
+    web_research_cache_ttl_days = fields.Integer(
+        string='Research Cache Lifetime (days)',
+        config_parameter='llm_lead_scoring.web_research_cache_ttl_days',
+        default=7,
+        help='Days during which Google searches, Maps businesses and website analyses are reused '
+             'by the leads of the same company (0 disables the cache)',
+    )
+
+    google_search_daily_limit = fields.Integer(
+        string='Google Search Daily Limit',
+        config_parameter='llm_lead_scoring.google_search_daily_limit',
+        default=0,
+        help='Google Custom Search queries sent per day, no search is sent once reached '
+             '(0 for no limit, e.g. 100 for the free tier). '
+             'Below 20% remaining, the enrichment queue serves high-value leads first',
+    )
+
+    google_maps_daily_limit = fields.Integer(
+        string='Google Maps Daily Limit',
+        config_parameter='llm_lead_scoring.google_maps_daily_limit',
+        default=0,
+        help='Google Maps requests sent per day (0 for no limit)',
+    )
+
     # Scoring Weights
     weight_completeness = fields.Float(
         string='Completeness Weight (%)',
@@ -0,0 +1,160 @@
+# -*- coding: utf-8 -*-
+
+import hashlib
+import json
+import logging
+from urllib.parse import urlparse
+
+from odoo import models, fields, api
+
+from .llm_service import independent_cursor
+
+_logger = logging.getLogger(__name__)
+
+
+def normalize_domain(value):
+    """Host of a website URL or email domain, lowercase and without 'www.'"""
+    value = (value or '').strip().lower()
+    if not value:
+        return ''
+    if '@' in value:
+        value = value.rsplit('@', 1)[1]
+    host = urlparse(value if '://' in value else f'//{value}').hostname or ''
+    return host[4:] if host.startswith('www.') else host
+
+
+class WebResearchCache(models.Model):
+    _name = 'web.research.cache'
+    _description = 'Web Research Cache'
+    _order = 'last_hit_date desc, id desc'
+    _rec_name = 'subject'
+
+    key = fields.Char(string='Request Fingerprint', required=True, readonly=True,
+                      help='SHA-256 of the research source and its normalized arguments')
+    source = fields.Selection([
+        ('google_search', 'Google Custom Search'),
+        ('google_maps', 'Google Maps'),
+        ('tech_stack', 'Tech Stack Analysis'),
+        ('digital_presence', 'Digital Presence'),
+    ], string='Source', required=True, readonly=True, index=True)
+    subject = fields.Char(string='Company / Domain', readonly=True, index=True)
+    result = fields.Text(string='Result', readonly=True, help='JSON result of the research call')
+    hit_count = fields.Integer(string='Hits', readonly=True, default=0)
+    last_hit_date = fields.Datetime(string='Last Used', readonly=True)
+    expire_date = fields.Datetime(string='Expires On', readonly=True, index=True)
+
+    _sql_constraints = [
+        ('key_unique', 'unique(key)', 'A research request is cached only once.'),
+    ]
+
+    @api.model
+    def _get_key(self, source, *args):
+        """
+        Fingerprint of a research call, identical for the leads of a same company
+
+        Text arguments are compared case-insensitively, whitespace collapsed.
+
+        Returns:
+            str: SHA-256 hex digest
+        """
+        request = [source] + [' '.join(arg.casefold().split()) if isinstance(arg, str) else arg
+                              for arg in args]
+        return hashlib.sha256(json.dumps(request, sort_keys=True).encode()).hexdigest()
+
+    @api.model
+    def _get_ttl_days(self):
+        """Days a research result is reused, 0 when the cache is disabled"""
+        config = self.env['ir.config_parameter'].sudo()
+        try:
+            return max(0, int(config.get_param('llm_lead_scoring.web_research_cache_ttl_days', '7')))
+        except ValueError:
+            return 0
+
+    @api.model
+    def _lookup(self, key):
+        """
+        Get a cached research result and mark it as used
+
+        Returns:
+            dict: Cached result, None on a miss
+        """
+        with independent_cursor(self.env) as cr:
+            cr.execute("""
+                UPDATE web_research_cache
+                   SET hit_count = hit_count + 1,
+                       last_hit_date = (now() at time zone 'UTC')
+                 WHERE id = (
+                    SELECT id FROM web_research_cache
+                     WHERE key = %s AND expire_date > (now() at time zone 'UTC')
+                       FOR UPDATE SKIP LOCKED)
+             RETURNING result
+            """, [key])
+            row = cr.fetchone()
+        return json.loads(row[0]) if row else None
+
+    @api.model
+    def _store(self, key, source, subject, result, ttl_days):
+        """Cache a research result, replacing an expired one
+
+        The result is committed at once, so that concurrent workers enriching
+        leads of the same company reuse it."""
+        with independent_cursor(self.env) as cr:
+            cr.execute("""
+                INSERT INTO web_research_cache
+                       (key, source, subject, result, hit_count, last_hit_date, expire_date,
+                        create_uid, create_date, write_uid, write_date)
+                VALUES (%(key)s, %(source)s, %(subject)s, %(result)s, 0,
+                        (now() at time zone 'UTC'),
+                        (now() at time zone 'UTC') + %(ttl_days)s * interval '1 day',
+                        %(uid)s, (now() at time zone 'UTC'), %(uid)s, (now() at time zone 'UTC'))
+                ON CONFLICT (key) DO UPDATE
+                   SET result = EXCLUDED.result,
+                       last_hit_date = EXCLUDED.last_hit_date,
+                       expire_date = EXCLUDED.expire_date,
+                       write_date = EXCLUDED.write_date
+            """, {
+                'key': key,
+                'source': source,
+                'subject': subject,
+                'result': json.dumps(result),
+                'ttl_days': ttl_days,
+                'uid': self.env.uid,
+            })
+
+    @api.model
+    def _cached_call(self, source, subject, key_args, compute):
+        """
+        Serve a research call from the cache, or compute and cache it
+
+        Only successful results are cached: errors (missing configuration,
+        exhausted quota, timeouts) are retried by the next lead.
+
+        Args:
+            source: Research source, see the source field
+            subject: Company name or domain the result is about
+            key_args: Arguments identifying the call
+            compute: Callable returning the result dict when not cached
+
+        Returns:
+            dict: Research result
+        """
+        ttl_days = self._get_ttl_days()
+        if not ttl_days:
+            return compute()
+        key = self._get_key(source, *key_args)
+        result = self._lookup(key)
+        if result is not None:
+            _logger.info("Web research served from cache: %s %s", source, subject)
+            return result
+        result = compute()
+        if result.get('success'):
+            self._store(key, source, subject, result, ttl_days)
+        return result
+
+    @api.autovacuum
+    def _gc_expired(self):
+        """Delete the expired research results"""
+        self.flush_model()
+        self.env.cr.execute("DELETE FROM web_research_cache WHERE expire_date <= (now() at time zone 'UTC')")
+        _logger.info("Web research cache: %d expired entries removed", self.env.cr.rowcount)
+        self.invalidate_model()
@@ -0,0 +1,140 @@
+# -*- coding: utf-8 -*-
+
+import logging
+from datetime import datetime, timedelta
+
+import pytz
+
+from odoo import models, fields, api
+
+from .llm_service import independent_cursor
+
+_logger = logging.getLogger(__name__)
+
+# Google daily quotas reset at midnight Pacific Time
+QUOTA_TIMEZONE = 'America/Los_Angeles'
+# Daily limit parameter and default per API, no limit if 0
+QUOTA_LIMITS = {
+    'google_search': ('llm_lead_scoring.google_search_daily_limit', 0),
+    'google_maps': ('llm_lead_scoring.google_maps_daily_limit', 0),
+}
+# Share of the daily limit below which the enrichment queue favors high-value leads
+LOW_QUOTA_RATIO = 0.2
+# Warning threshold of the daily usage
+QUOTA_WARNING_RATIO = 0.9
+# Daily counters kept for monitoring
+QUOTA_RETENTION_DAYS = 90
+
+
+class WebResearchQuota(models.Model):
+    _name = 'web.research.quota'
+    _description = 'Web Research API Daily Quota'
+    _order = 'date desc, api'
+    _rec_name = 'api'
+
+    api = fields.Selection([
+        ('google_search', 'Google Custom Search'),
+        ('google_maps', 'Google Maps'),
+    ], string='API', required=True, readonly=True)
+    date = fields.Date(string='Date', required=True, readonly=True,
+                       help='Quota day, in Pacific Time like the Google quotas')
+    used = fields.Integer(string='Requests', readonly=True, default=0)
+
+    _sql_constraints = [
+        ('api_date_unique', 'unique(api, date)', 'An API has one quota counter per day.'),
+    ]
+
+    @api.model
+    def _today(self):
+        return datetime.now(pytz.timezone(QUOTA_TIMEZONE)).date()
+
+    @api.model
+    def _get_daily_limit(self, api_name):
+        """Daily request limit of an API, 0 for no limit"""
+        param, default = QUOTA_LIMITS[api_name]
+        try:
+            return max(0, int(self.env['ir.config_parameter'].sudo().get_param(param, str(default))))
+        except ValueError:
+            return default
+
+    @api.model
+    def _consume(self, api_name, count=1):
+        """
+        Reserve requests on the daily quota of an API, before sending them
+
+        The counter is incremented atomically in its own short transaction:
+        concurrent workers never exceed the limit, and never wait for the
+        counter row until the end of an enrichment.
+
+        Returns:
+            bool: True if the requests may be sent, False if the quota is exhausted
+        """
+        limit = self._get_daily_limit(api_name)
+        with independent_cursor(self.env) as cr:
+            cr.execute("""
+                INSERT INTO web_research_quota (api, date, used, create_uid, create_date, write_uid, write_date)
+                SELECT %(api)s, %(date)s, %(count)s, %(uid)s, (now() at time zone 'UTC'),
+                       %(uid)s, (now() at time zone 'UTC')
+                 WHERE %(limit)s = 0 OR %(count)s <= %(limit)s
+                    ON CONFLICT (api, date) DO UPDATE
+                   SET used = web_research_quota.used + EXCLUDED.used,
+                       write_date = EXCLUDED.write_date
+                 WHERE %(limit)s = 0 OR web_research_quota.used + EXCLUDED.used <= %(limit)s
+             RETURNING used
+            """, {'api': api_name, 'date': self._today(), 'count': count, 'limit': limit, 'uid': self.env.uid})
+            row = cr.fetchone()
+        if not row:
+            _logger.warning("%s daily quota exhausted (%d requests)", api_name, limit)
+            return False
+        if limit and row[0] >= limit * QUOTA_WARNING_RATIO:
+            _logger.warning("%s quota at %d/%d today", api_name, row[0], limit)
+        return True
+
+    @api.model
+    def _exhaust(self, api_name):
+        """Mark today's quota of an API as used up, e.g. after a 429 response"""
+        limit = self._get_daily_limit(api_name)
+        if not limit:
+            return
+        with independent_cursor(self.env) as cr:
+            cr.execute("""
+                INSERT INTO web_research_quota (api, date, used, create_uid, create_date, write_uid, write_date)
+                VALUES (%(api)s, %(date)s, %(limit)s, %(uid)s, (now() at time zone 'UTC'),
+                        %(uid)s, (now() at time zone 'UTC'))
+                    ON CONFLICT (api, date) DO UPDATE
+                   SET used = GREATEST(web_research_quota.used, EXCLUDED.used),
+                       write_date = EXCLUDED.write_date
+            """, {'api': api_name, 'date': self._today(), 'limit': limit, 'uid': self.env.uid})
+
+    @api.model
+    def _get_usage(self, api_name):
+        """
+        Today's usage of an API
+
+        Returns:
+            dict: {'used': int, 'limit': int, 'remaining': int, 'date': str},
+                  remaining is None without limit
+        """
+        today = self._today()
+        limit = self._get_daily_limit(api_name)
+        with independent_cursor(self.env) as cr:
+            cr.execute("SELECT used FROM web_research_quota WHERE api = %s AND date = %s", [api_name, today])
+            row = cr.fetchone()
+        used = row[0] if row else 0
+        return {
+            'used': used,
+            'limit': limit,
+            'remaining': max(0, limit - used) if limit else None,
+            'date': today.isoformat(),
+        }
+
+    @api.model
+    def _is_low(self, api_name='google_search'):
+        """Whether less than LOW_QUOTA_RATIO of today's quota of an API remains"""
+        usage = self._get_usage(api_name)
+        return bool(usage['limit']) and usage['remaining'] < usage['limit'] * LOW_QUOTA_RATIO
+
+    @api.autovacuum
+    def _gc_old_counters(self):
+        """Delete the daily counters older than the retention period"""
+        self.search([('date', '<', self._today() - timedelta(days=QUOTA_RETENTION_DAYS))]).unlink()
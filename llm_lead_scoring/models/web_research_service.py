@@ -7,9 +7,12 @@ import requests
 from datetime import datetime
 from urllib.parse import urlparse, quote_plus
 
-from odoo import models, fields, api, tools, _
+from odoo import models, api, tools, _
 from odoo.exceptions import UserError
 
+from .llm_service import request_slot
+from .web_research_cache import normalize_domain
+
 _logger = logging.getLogger(__name__)
 
 # Technology detection patterns
@@ -51,6 +54,9 @@ TECH_PATTERNS = {
     }
 }
 
+# Concurrent requests per Google API sent by concurrent lead enrichment
+GOOGLE_API_CONCURRENCY = 4
+
 # Social media platforms to check
 SOCIAL_PLATFORMS = {
     'linkedin': 'linkedin.com/company/',
@@ -66,16 +72,20 @@ class WebResearchService(models.AbstractModel):
     _description = 'Web Research Service with Google Custom Search'
 
     @api.model
-    def search_google_custom(self, query, num_results=5):
+    def search_google_custom(self, query, num_results=5, use_cache=True):
         """
         Search using Google Custom Search API
         
         Free Tier: 100 queries/day
         Paid: $5 per 1000 queries after free tier
         
+        Results are cached and shared by the leads of a same company; queries
+        sent to Google are counted on the daily quota.
+        
         Args:
             query: Search query string
             num_results: Number of results (1-10, default 5)
+            use_cache: Serve the query from the research cache (default True)
             
         Returns:
             dict: {'success': bool, 'results': list, 'error': str}
@@ -107,6 +117,24 @@ class WebResearchService(models.AbstractModel):
                 'results': []
             }
         
+        if not use_cache:
+            return self._fetch_google_custom(api_key, search_engine_id, query, num_results)
+        return self.env['web.research.cache']._cached_call(
+            'google_search', query.strip(), (search_engine_id, query, min(num_results, 10)),
+            lambda: self._fetch_google_custom(api_key, search_engine_id, query, num_results))
+
+    @api.model
+    def _fetch_google_custom(self, api_key, search_engine_id, query, num_results):
+        """Send a Google Custom Search request, reserved on the daily quota"""
+        quota = self.env['web.research.quota']
+        if not quota._consume('google_search'):
+            return {
+                'success': False,
+                'error': f"Google Custom Search daily quota reached ({quota._get_daily_limit('google_search')} queries). Searches resume tomorrow.",
+                'results': [],
+                'quota_exceeded': True,
+            }
+        
         url = 'https://www.googleapis.com/customsearch/v1'
         params = {
             'key': api_key,
@@ -117,7 +145,8 @@ class WebResearchService(models.AbstractModel):
         
         try:
             _logger.info("Google Custom Search: %s", query)
-            response = requests.get(url, params=params, timeout=10)
+            with request_slot('google_custom_search', GOOGLE_API_CONCURRENCY):
+                response = requests.get(url, params=params, timeout=10)
             
             if response.status_code == 200:
                 data = response.json()
@@ -147,6 +176,7 @@ class WebResearchService(models.AbstractModel):
                 }
             
             elif response.status_code == 429:
+                quota._exhaust('google_search')
                 return {
                     'success': False,
                     'error': 'Google Custom Search API quota exceeded. Free tier: 100 queries/day.',
@@ -347,48 +377,26 @@ TOP SOURCES:
     @api.model
     def get_daily_quota_usage(self):
         """
-        Estimate daily quota usage (approximation)
+        Daily Google Custom Search quota usage
         Google doesn't provide real-time quota API, so we track in Odoo
         
         Returns:
-            dict: {'used': int, 'limit': int, 'remaining': int}
+            dict: {'used': int, 'limit': int, 'remaining': int, 'date': str}
         """
-        config = self.env['ir.config_parameter'].sudo()
-        
-        # Get today's usage count (stored as config parameter)
-        today = fields.Date.today().isoformat()
-        usage_key = f'llm_lead_scoring.google_search_usage_{today}'
-        used_today = int(config.get_param(usage_key, '0'))
-        
-        # Free tier limit
-        daily_limit = 100
-        
-        return {
-            'used': used_today,
-            'limit': daily_limit,
-            'remaining': max(0, daily_limit - used_today),
-            'date': today
-        }
+        return self.env['web.research.quota']._get_usage('google_search')
 
     @api.model
     def increment_quota_usage(self, count=1):
         """
-        Increment daily quota usage counter
+        Count queries sent outside of search_google_custom on the daily quota
         
         Args:
             count: Number of queries to add (default 1)
+            
+        Returns:
+            bool: False if the queries exceed the daily limit
         """
-        config = self.env['ir.config_parameter'].sudo()
-        today = fields.Date.today().isoformat()
-        usage_key = f'llm_lead_scoring.google_search_usage_{today}'
-        
-        current = int(config.get_param(usage_key, '0'))
-        new_value = current + count
-        
-        config.set_param(usage_key, str(new_value))
-        
-        if new_value >= 90:  # Warning at 90% usage
-            _logger.warning("Google Custom Search quota at %d/100 today", new_value)
+        return self.env['web.research.quota']._consume('google_search', count)
 
     # =========================================================================
     # ENHANCED RESEARCH: Google Maps, Digital Presence, Tech Infrastructure
@@ -408,6 +416,8 @@ TOP SOURCES:
         - Business category
         - Photos count
         
+        Businesses found are cached and shared by the leads of a same company.
+        
         Args:
             company_name: Company name to search
             location: Optional location hint (city, country)
@@ -425,6 +435,21 @@ TOP SOURCES:
                 'data': None
             }
         
+        return self.env['web.research.cache']._cached_call(
+            'google_maps', company_name, (company_name, location or ''),
+            lambda: self._fetch_google_maps(maps_api_key, company_name, location))
+
+    @api.model
+    def _fetch_google_maps(self, maps_api_key, company_name, location=None):
+        """Send the Place search and details requests, reserved on the daily quota"""
+        quota = self.env['web.research.quota']
+        quota_error = {
+            'success': False,
+            'error': 'Google Maps daily quota reached',
+            'data': None,
+            'quota_exceeded': True,
+        }
+        
         # Build search query
         search_query = company_name
         if location:
@@ -440,7 +465,10 @@ TOP SOURCES:
                 'key': maps_api_key
             }
             
-            response = requests.get(find_url, params=find_params, timeout=10)
+            if not quota._consume('google_maps'):
+                return quota_error
+            with request_slot('google_maps', GOOGLE_API_CONCURRENCY):
+                response = requests.get(find_url, params=find_params, timeout=10)
             
             if response.status_code != 200:
                 return {
@@ -468,7 +496,10 @@ TOP SOURCES:
                 'key': maps_api_key
             }
             
-            details_response = requests.get(details_url, params=details_params, timeout=10)
+            if not quota._consume('google_maps'):
+                return quota_error
+            with request_slot('google_maps', GOOGLE_API_CONCURRENCY):
+                details_response = requests.get(details_url, params=details_params, timeout=10)
             
             if details_response.status_code != 200:
                 return {
@@ -568,6 +599,8 @@ TOP SOURCES:
         - E-commerce platforms
         - Infrastructure (Cloudflare, AWS, etc.)
         
+        Analyses are cached per domain and shared by the leads of a same company.
+        
         Args:
             website_url: Website URL to analyze
             
@@ -585,6 +618,14 @@ TOP SOURCES:
         if not website_url.startswith(('http://', 'https://')):
             website_url = f'https://{website_url}'
         
+        domain = normalize_domain(website_url)
+        return self.env['web.research.cache']._cached_call(
+            'tech_stack', domain, (domain,),
+            lambda: self._fetch_website_technology(website_url))
+
+    @api.model
+    def _fetch_website_technology(self, website_url):
+        """Download a website and detect its technology stack"""
         try:
             headers = {
                 'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
@@ -789,14 +830,12 @@ TOP SOURCES:
             else:
                 presence_data['platforms_not_found'].append(sq['platform'])
         
-        # Check website if provided
+        # Check website if provided (active domains are cached)
         if website:
-            try:
-                url = website if website.startswith('http') else f'https://{website}'
-                response = requests.head(url, timeout=5, allow_redirects=True)
-                presence_data['website_active'] = response.status_code == 200
-            except:
-                presence_data['website_active'] = False
+            domain = normalize_domain(website)
+            presence_data['website_active'] = self.env['web.research.cache']._cached_call(
+                'digital_presence', domain, (domain,),
+                lambda: {'success': self._is_website_active(website)})['success']
         
         # Calculate presence score
         score = 0
@@ -831,6 +870,16 @@ TOP SOURCES:
             'data': presence_data
         }
 
+    @api.model
+    def _is_website_active(self, website):
+        """Whether a website answers a HEAD request with status 200"""
+        try:
+            url = website if website.startswith('http') else f'https://{website}'
+            response = requests.head(url, timeout=5, allow_redirects=True)
+            return response.status_code == 200
+        except:
+            return False
+
     @api.model
     def get_enhanced_company_research(self, lead):
         """
@@ -3,3 +3,5 @@
 from . import test_llm_provider
 from . import test_llm_service
 from . import test_lead_scoring
+from . import test_enrichment_queue
+from . import test_web_research
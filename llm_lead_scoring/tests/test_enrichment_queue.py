@@ -0,0 +1,111 @@
+# -*- coding: utf-8 -*-
+
+from odoo import fields
+from odoo.tests.common import TransactionCase
+from unittest.mock import patch
+
+from odoo.addons.llm_lead_scoring.models.llm_enrichment_job import MAX_ATTEMPTS
+
+
+class TestEnrichmentQueue(TransactionCase):
+    """Test the leased lead enrichment queue"""
+
+    def setUp(self):
+        super(TestEnrichmentQueue, self).setUp()
+        self.Job = self.env['llm.enrichment.job']
+        self.lead = self.env['crm.lead'].create({
+            'name': 'Queued Lead',
+            'type': 'opportunity',
+        })
+        self.Lead = type(self.lead)
+
+    def test_enqueue_once(self):
+        """Test that a lead is queued only once while pending"""
+        self.Job._enqueue(self.lead)
+        self.Job._enqueue(self.lead)
+
+        jobs = self.Job.search([('lead_id', '=', self.lead.id)])
+        self.assertEqual(len(jobs), 1)
+        self.assertEqual(jobs.state, 'pending')
+
+    def test_lease_is_exclusive(self):
+        """Test that a leased job is not leased again before its lease expires"""
+        self.Job._enqueue(self.lead)
+
+        job = self.Job._lease('worker-1')
+        self.assertEqual(job.lead_id, self.lead)
+        self.assertEqual(job.state, 'leased')
+        self.assertEqual(job.attempts, 1)
+        self.assertEqual(job.worker, 'worker-1')
+        self.assertFalse(self.Job._lease('worker-2'))
+
+        # A lead queued again waits for its running job
+        self.Job._enqueue(self.lead)
+        self.assertFalse(self.Job._lease('worker-2'))
+
+    def test_expired_lease_is_released(self):
+        """Test that the job of a dead worker is queued again"""
+        self.Job._enqueue(self.lead)
+        job = self.Job._lease('worker-1')
+        job.write({'lease_expires_at': fields.Datetime.subtract(fields.Datetime.now(), hours=1)})
+
+        self.Job._release_expired_leases()
+
+        self.assertEqual(job.state, 'pending')
+        self.assertEqual(self.Job._lease('worker-2'), job)
+
+    def test_expired_last_attempt_fails_lead(self):
+        """Test that a lead whose worker dies at the last attempt fails and is not queued again"""
+        self.lead.write({'ai_enrichment_status': 'pending'})
+        self.Job._enqueue(self.lead)
+        job = self.Job._lease('worker-1')
+        job.write({
+            'attempts': MAX_ATTEMPTS,
+            'lease_expires_at': fields.Datetime.subtract(fields.Datetime.now(), hours=1),
+        })
+
+        self.Job._release_expired_leases()
+
+        self.assertEqual(job.state, 'failed')
+        self.assertEqual(self.lead.ai_enrichment_status, 'failed')
+        self.Job._enqueue_pending_leads()
+        self.assertEqual(self.lead.ai_enrichment_job_ids, job)
+
+    def test_process_jobs_success(self):
+        """Test that processed jobs are done"""
+        self.Job._enqueue(self.lead)
+
+        def enrich(lead):
+            lead.write({'ai_enrichment_status': 'completed'})
+
+        with patch.object(self.Lead, '_enrich_lead', enrich):
+            processed = self.Job.process_jobs()
+
+        job = self.lead.ai_enrichment_job_ids
+        self.assertEqual(processed, 1)
+        self.assertEqual(job.state, 'done')
+        self.assertEqual(self.lead.ai_enrichment_status, 'completed')
+
+    def test_process_jobs_retry_with_backoff(self):
+        """Test that failed enrichments are retried later, then failed"""
+        self.Job._enqueue(self.lead)
+
+        def enrich(lead):
+            lead.write({'ai_enrichment_status': 'failed', 'ai_analysis_summary': 'Enrichment failed: timeout'})
+
+        with patch.object(self.Lead, '_enrich_lead', enrich):
+            self.Job.process_jobs()
+            job = self.lead.ai_enrichment_job_ids
+            self.assertEqual(job.state, 'pending')
+            self.assertGreater(job.next_attempt_date, fields.Datetime.now())
+            self.assertEqual(job.last_error, 'Enrichment failed: timeout')
+            self.assertEqual(self.lead.ai_enrichment_status, 'pending')
+
+            # Not due yet
+            self.assertEqual(self.Job.process_jobs(), 0)
+
+            job.write({'attempts': MAX_ATTEMPTS - 1, 'next_attempt_date': False})
+            self.Job.process_jobs()
+
+        self.assertEqual(job.state, 'failed')
+        self.assertEqual(self.lead.ai_enrichment_status, 'failed')
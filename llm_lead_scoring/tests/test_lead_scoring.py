@@ -1,6 +1,9 @@
 # -*- coding: utf-8 -*-
 
+import json
+
 from odoo.tests.common import TransactionCase
+from unittest.mock import patch
 
 
 class TestLeadScoring(TransactionCase):
@@ -143,3 +146,108 @@ class TestLeadScoring(TransactionCase):
         # Can change to failed
         lead.write({'ai_enrichment_status': 'failed'})
         self.assertEqual(lead.ai_enrichment_status, 'failed')
+
+    def test_enrichment_tasks_follow_settings(self):
+        """Test that only the enabled research calls are scheduled"""
+        config = self.env['ir.config_parameter'].sudo()
+        config.set_param('llm_lead_scoring.enable_customer_research', 'False')
+        config.set_param('llm_lead_scoring.enable_maps_research', 'False')
+        config.set_param('llm_lead_scoring.enable_tech_analysis', 'True')
+        config.set_param('llm_lead_scoring.enable_digital_presence', 'True')
+
+        lead = self.Lead.create({
+            'name': 'Task Lead',
+            'type': 'opportunity',
+            'partner_name': 'Test Company',
+            'website': 'example.com',
+        })
+
+        tasks = lead._get_enrichment_tasks()
+        self.assertEqual(set(tasks), {'clarity', 'tech_stack', 'digital_presence'})
+
+    def test_run_enrichment_tasks_sequential(self):
+        """Test that the enrichment scores the lead from the task results"""
+        lead = self.Lead.create({
+            'name': 'Sequential Lead',
+            'type': 'opportunity',
+            'email_from': 'jane.doe@testcompany.com',
+            'description': 'Urgent: we need a CRM for 50 users, budget $20,000',
+        })
+        clarity = {'score': 80, 'analysis': 'Clear requirements'}
+        tasks = {
+            'clarity': ('llm.service', 'analyze_requirement_clarity', (lead,)),
+            'tech_stack': ('web.research.service', 'analyze_website_technology', ('',)),
+        }
+        llm_result = {'success': True, 'content': 'Final assessment', 'error': '', 'retries': 0}
+
+        LLMService = type(self.LLMService)
+        with patch.object(LLMService, 'analyze_requirement_clarity', return_value=clarity), \
+                patch.object(LLMService, 'call_llm', return_value=llm_result):
+            scoring_result, results = lead._run_enrichment_tasks(tasks)
+
+        self.assertEqual(scoring_result['clarity_score'], 80)
+        self.assertEqual(scoring_result['llm_analysis'], 'Final assessment')
+        self.assertEqual(set(results), {'tech_stack'})
+        self.assertFalse(results['tech_stack']['success'])
+
+    def test_batch_scoring_single_call(self):
+        """Test that a batch of leads is assessed by one LLM call"""
+        leads = self.Lead.create([
+            {'name': 'Batch Lead 1', 'type': 'opportunity', 'email_from': 'ceo@acme-industries.com'},
+            {'name': 'Batch Lead 2', 'type': 'opportunity', 'email_from': 'someone@gmail.com'},
+        ])
+        answer = json.dumps([
+            {'lead_id': lead.id, 'final_score': 60, 'justification': 'Test', 'priority': 'MEDIUM',
+             'strengths': ['Strength %d' % lead.id], 'concerns': [], 'next_actions': ['Call']}
+            for lead in leads
+        ])
+        llm_result = {'success': True, 'content': '```json\n%s\n```' % answer, 'error': '', 'retries': 0}
+
+        with patch.object(type(self.LLMService), 'call_llm', return_value=llm_result) as call_llm:
+            results = self.LLMService.calculate_ai_probability_scores(leads, batch_size=10)
+
+        self.assertEqual(call_llm.call_count, 1)
+        for lead in leads:
+            self.assertIn('Strength %d' % lead.id, results[lead.id]['llm_analysis'])
+            self.assertTrue(results[lead.id]['analysis_success'])
+
+    def test_batch_scoring_fallback(self):
+        """Test that leads are assessed one by one when the batch answer is invalid"""
+        leads = self.Lead.create([
+            {'name': 'Fallback Lead 1', 'type': 'opportunity'},
+            {'name': 'Fallback Lead 2', 'type': 'opportunity'},
+        ])
+        invalid = {'success': True, 'content': 'Sorry, here is my assessment...', 'error': '', 'retries': 0}
+        single = {'success': True, 'content': 'Single assessment', 'error': '', 'retries': 0}
+
+        with patch.object(type(self.LLMService), 'call_llm', side_effect=[invalid, single, single]) as call_llm:
+            results = self.LLMService.calculate_ai_probability_scores(leads, batch_size=10)
+
+        self.assertEqual(call_llm.call_count, 3)
+        self.assertEqual({result['llm_analysis'] for result in results.values()}, {'Single assessment'})
+
+    def test_batch_rescoring_failures(self):
+        """Test that leads whose analysis or assessment failed are counted and marked failed"""
+        leads = self.Lead.create([
+            {'name': 'Rescore Lead 1', 'type': 'opportunity'},
+            {'name': 'Rescore Lead 2', 'type': 'opportunity'},
+            {'name': 'Rescore Lead 3', 'type': 'opportunity'},
+        ])
+        LLMService = type(self.LLMService)
+        analyze_completeness = LLMService.analyze_lead_completeness
+
+        def completeness(service, lead):
+            if lead == leads[0]:
+                raise ValueError('Analyzer error')
+            return analyze_completeness(service, lead)
+
+        failed = {'success': False, 'content': '', 'error': 'Timeout', 'retries': 0}
+        single = {'success': True, 'content': 'Single assessment', 'error': '', 'retries': 0}
+
+        with patch.object(LLMService, 'analyze_lead_completeness', completeness), \
+                patch.object(LLMService, 'call_llm', side_effect=[failed, failed, single]):
+            scored, failed_count = leads._rescore_with_ai(batch_size=10)
+
+        self.assertEqual((scored, failed_count), (1, 2))
+        self.assertEqual(leads.mapped('ai_enrichment_status'), ['failed', 'failed', 'completed'])
+        self.assertEqual(leads[2].ai_analysis_summary, 'Single assessment')
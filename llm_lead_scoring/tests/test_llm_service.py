@@ -1,8 +1,13 @@
 # -*- coding: utf-8 -*-
 
+import threading
+import time
+
 from odoo.tests.common import TransactionCase
 from unittest.mock import patch, Mock
 
+from odoo.addons.llm_lead_scoring.models.llm_service import request_slot
+
 
 class TestLLMService(TransactionCase):
     """Test LLM Service integration logic"""
@@ -130,3 +135,96 @@ class TestLLMService(TransactionCase):
 
         self.assertFalse(result['success'])
         self.assertIn('No LLM provider configured', result['error'])
+
+    def test_request_slot_limits_concurrency(self):
+        """Test that request slots cap the concurrent calls to a service"""
+        lock = threading.Lock()
+        state = {'running': 0, 'peak': 0}
+
+        def call():
+            with request_slot('test_service', 2):
+                with lock:
+                    state['running'] += 1
+                    state['peak'] = max(state['peak'], state['running'])
+                time.sleep(0.05)
+                with lock:
+                    state['running'] -= 1
+
+        threads = [threading.Thread(target=call) for _i in range(6)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(state['peak'], 2)
+
+    def test_apply_provider_usage(self):
+        """Test that usage deferred by worker threads is written at once"""
+        self.LLMService._apply_provider_usage([
+            (self.provider.id, {'total_requests': 1, 'failed_requests': 0}),
+            (self.provider.id, {'total_requests': 1, 'failed_requests': 1}),
+            (self.provider.id, {'cache_hits': 1, 'cache_misses': 0}),
+        ])
+
+        self.assertEqual(self.provider.total_requests, 2)
+        self.assertEqual(self.provider.failed_requests, 1)
+        self.assertEqual(self.provider.cache_hits, 1)
+        self.assertTrue(self.provider.last_used)
+
+    @patch('requests.post')
+    def test_call_llm_served_from_cache(self, mock_post):
+        """Test that an identical request is answered from the response cache"""
+        mock_response = Mock()
+        mock_response.status_code = 200
+        mock_response.json.return_value = {
+            'choices': [{'message': {'content': 'Cached response'}}]
+        }
+        mock_post.return_value = mock_response
+
+        messages = [{'role': 'user', 'content': 'Same prompt'}]
+        first = self.LLMService.call_llm(list(messages), provider=self.provider)
+        second = self.LLMService.call_llm(list(messages), provider=self.provider)
+        other = self.LLMService.call_llm([{'role': 'user', 'content': 'Other prompt'}], provider=self.provider)
+
+        self.assertEqual(second['content'], first['content'])
+        self.assertTrue(other['success'])
+        self.assertEqual(mock_post.call_count, 2)
+        self.assertEqual(self.provider.total_requests, 2)
+        self.assertEqual(self.provider.cache_hits, 1)
+        self.assertEqual(self.provider.cache_misses, 2)
+        self.assertAlmostEqual(self.provider.cache_hit_rate, 100.0 / 3, places=1)
+
+    @patch('requests.post')
+    def test_call_llm_cache_disabled(self, mock_post):
+        """Test that the provider is always called when the cache is disabled"""
+        self.env['ir.config_parameter'].sudo().set_param('llm_lead_scoring.llm_cache_enabled', 'False')
+        mock_response = Mock()
+        mock_response.status_code = 200
+        mock_response.json.return_value = {
+            'choices': [{'message': {'content': 'Fresh response'}}]
+        }
+        mock_post.return_value = mock_response
+
+        messages = [{'role': 'user', 'content': 'Same prompt'}]
+        self.LLMService.call_llm(list(messages), provider=self.provider)
+        self.LLMService.call_llm(list(messages), provider=self.provider)
+
+        self.assertEqual(mock_post.call_count, 2)
+        self.assertEqual(self.provider.cache_hits + self.provider.cache_misses, 0)
+
+    def test_response_cache_eviction(self):
+        """Test that eviction drops expired and least recently used responses"""
+        Cache = self.env['llm.response.cache']
+        for index in range(3):
+            Cache._store('key-%d' % index, self.provider, 'Response %d' % index, 24)
+        Cache._store('key-expired', self.provider, 'Expired', 0)
+        self.assertEqual(Cache._lookup('key-0'), 'Response 0')
+        self.assertIsNone(Cache._lookup('key-expired'))
+
+        self.env['ir.config_parameter'].sudo().set_param('llm_lead_scoring.llm_cache_max_entries', '2')
+        self.env.cr.execute(
+            "UPDATE llm_response_cache SET last_hit_date = last_hit_date - interval '1 hour' WHERE key = 'key-1'")
+        Cache._cron_evict()
+
+        remaining = Cache.search([('provider_id', '=', self.provider.id)])
+        self.assertEqual(set(remaining.mapped('key')), {'key-0', 'key-2'})
@@ -0,0 +1,114 @@
+# -*- coding: utf-8 -*-
+
+from odoo.tests.common import TransactionCase
+from unittest.mock import patch, Mock
+
+from odoo.addons.llm_lead_scoring.models.web_research_cache import normalize_domain
+
+
+class TestWebResearch(TransactionCase):
+    """Test the web research cache and daily quotas"""
+
+    def setUp(self):
+        super(TestWebResearch, self).setUp()
+        self.WebResearch = self.env['web.research.service']
+        self.Quota = self.env['web.research.quota']
+        config = self.env['ir.config_parameter'].sudo()
+        config.set_param('llm_lead_scoring.google_search_api_key', 'test-api-key')
+        config.set_param('llm_lead_scoring.google_search_engine_id', 'test-engine-id')
+        config.set_param('llm_lead_scoring.google_search_daily_limit', '100')
+
+    def _search_response(self, status_code=200):
+        response = Mock()
+        response.status_code = status_code
+        response.text = 'error'
+        response.json.return_value = {'items': [{
+            'title': 'Acme Corp',
+            'snippet': 'Acme Corp makes everything',
+            'link': 'https://acme.com',
+            'displayLink': 'acme.com',
+        }]}
+        return response
+
+    def test_normalize_domain(self):
+        """Test that websites and emails of a company give the same domain"""
+        self.assertEqual(normalize_domain('https://www.Acme.com/contact'), 'acme.com')
+        self.assertEqual(normalize_domain('acme.com'), 'acme.com')
+        self.assertEqual(normalize_domain('john@acme.com'), 'acme.com')
+        self.assertEqual(normalize_domain(''), '')
+
+    @patch('requests.get')
+    def test_search_cache_shared(self, mock_get):
+        """Test that a company searched again is served from the cache"""
+        mock_get.return_value = self._search_response()
+
+        result1 = self.WebResearch.search_google_custom('"Acme Corp" company profile about', num_results=3)
+        result2 = self.WebResearch.search_google_custom('"ACME Corp"  company profile about', num_results=3)
+
+        self.assertTrue(result1['success'])
+        self.assertEqual(result1, result2)
+        self.assertEqual(mock_get.call_count, 1)
+        self.assertEqual(self.WebResearch.get_daily_quota_usage()['used'], 1)
+
+    @patch('requests.get')
+    def test_failed_search_not_cached(self, mock_get):
+        """Test that failed searches are sent again"""
+        mock_get.side_effect = [self._search_response(500), self._search_response()]
+
+        self.assertFalse(self.WebResearch.search_google_custom('"Acme Corp" news')['success'])
+        self.assertTrue(self.WebResearch.search_google_custom('"Acme Corp" news')['success'])
+        self.assertEqual(mock_get.call_count, 2)
+
+    @patch('requests.get')
+    def test_daily_quota_limit(self, mock_get):
+        """Test that no search is sent once the daily quota is used"""
+        self.env['ir.config_parameter'].sudo().set_param('llm_lead_scoring.google_search_daily_limit', '2')
+        mock_get.return_value = self._search_response()
+
+        self.assertTrue(self.WebResearch.search_google_custom('"Acme Corp" query one')['success'])
+        self.assertTrue(self.WebResearch.search_google_custom('"Acme Corp" query two')['success'])
+        result = self.WebResearch.search_google_custom('"Acme Corp" query three')
+
+        self.assertFalse(result['success'])
+        self.assertTrue(result['quota_exceeded'])
+        self.assertEqual(mock_get.call_count, 2)
+        usage = self.WebResearch.get_daily_quota_usage()
+        self.assertEqual(usage['used'], 2)
+        self.assertEqual(usage['remaining'], 0)
+        self.assertTrue(self.Quota._is_low('google_search'))
+
+    @patch('requests.get')
+    def test_rate_limit_exhausts_quota(self, mock_get):
+        """Test that a 429 response stops the searches of the day"""
+        mock_get.return_value = self._search_response(429)
+
+        self.WebResearch.search_google_custom('"Acme Corp" query one')
+        result = self.WebResearch.search_google_custom('"Acme Corp" query two')
+
+        self.assertTrue(result['quota_exceeded'])
+        self.assertEqual(mock_get.call_count, 1)
+
+    def test_lease_by_value_when_quota_low(self):
+        """Test that high-value leads are enriched first when the search quota runs low"""
+        Lead = self.env['crm.lead']
+        Job = self.env['llm.enrichment.job']
+        small_lead = Lead.create({'name': 'Small Deal', 'type': 'opportunity', 'priority': '0'})
+        big_lead = Lead.create({'name': 'Big Deal', 'type': 'opportunity', 'priority': '3',
+                                'expected_revenue': 100000})
+        Job._enqueue(small_lead | big_lead)
+
+        self.assertFalse(self.Quota._is_low('google_search'))
+        self.assertTrue(self.Quota._consume('google_search', 90))
+        self.assertTrue(self.Quota._is_low('google_search'))
+
+        leased = []
+
+        def enrich(lead):
+            leased.append(lead.id)
+            lead.write({'ai_enrichment_status': 'completed'})
+
+        with patch.object(type(Lead), '_enrich_lead', enrich):
+            Job.process_jobs()
+
+        leased = [lead_id for lead_id in leased if lead_id in (small_lead | big_lead).ids]
+        self.assertEqual(leased, [big_lead.id, small_lead.id])
@@ -86,7 +86,7 @@ class GoogleSearchSetupWizard(models.TransientModel):
         try:
             # Test search
             web_service = self.env['web.research.service']
-            result = web_service.search_google_custom(self.test_query, num_results=3)
+            result = web_service.search_google_custom(self.test_query, num_results=3, use_cache=False)
             
             if result['success']:
                 results = result['results']
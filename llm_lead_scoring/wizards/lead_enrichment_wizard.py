@@ -1,8 +1,14 @@
 # -*- coding: utf-8 -*-
 
+import logging
+
 from odoo import models, fields, api, _
 from odoo.exceptions import UserError
 
+from ..models.llm_service import BATCH_SCORING_SIZE
+
+_logger = logging.getLogger(__name__)
+
 
 class LeadEnrichmentWizard(models.TransientModel):
     _name = 'lead.enrichment.wizard'
@@ -26,6 +32,18 @@ class LeadEnrichmentWizard(models.TransientModel):
         help='Research customer even if disabled in settings',
     )
 
+    scoring_mode = fields.Selection([
+        ('full', 'Full Enrichment'),
+        ('batch', 'Batch Rescoring'),
+    ], string='Mode', default='full', required=True,
+        help='Batch rescoring scores several leads per LLM call, without new customer research')
+
+    batch_size = fields.Integer(
+        string='Leads per LLM Call',
+        default=BATCH_SCORING_SIZE,
+        help='Number of leads assessed together in batch rescoring',
+    )
+
     lead_count = fields.Integer(
         string='Number of Leads',
         compute='_compute_lead_count',
@@ -63,13 +81,19 @@ class LeadEnrichmentWizard(models.TransientModel):
         success_count = 0
         failed_count = 0
 
-        for lead in self.lead_ids:
-            try:
-                lead._enrich_lead()
-                success_count += 1
-            except Exception as e:
-                failed_count += 1
-                continue
+        if self.scoring_mode == 'batch':
+            success_count, failed_count = self.lead_ids._rescore_with_ai(batch_size=self.batch_size)
+        else:
+            for lead in self.lead_ids:
+                try:
+                    lead._enrich_lead()
+                except Exception:
+                    _logger.exception("Error enriching lead %s from the wizard", lead.id)
+                # _enrich_lead reports its own errors on the lead
+                if lead.ai_enrichment_status == 'completed':
+                    success_count += 1
+                else:
+                    failed_count += 1
 
         # Show result notification
         if failed_count == 0:
@@ -102,6 +102,7 @@
         "wizard/subproject_creation_view.xml",
         "wizard/unit_creation_view.xml",
         "wizard/agreement_preview_view.xml",
+        "wizard/property_schedule_wizard_view.xml",
         # Views
         "views/assets.xml",
         "views/payment_schedule_views.xml",
@@ -3,6 +3,7 @@
 # Part of TechKhedut. See LICENSE file for full copyright and licensing details.
 from . import file_validation_mixin
 from . import payment_schedule
+from . import property_dashboard
 from . import property_details
 from . import res_partner
 from . import rent_contract
@@ -1,9 +1,27 @@
 # -*- coding: utf-8 -*-
 # Copyright 2020-Today TechKhedut.
 # Part of TechKhedut. See LICENSE file for full copyright and licensing details.
+from datetime import timedelta
 from odoo import models, fields, api, _
 from odoo.exceptions import ValidationError
 
+# Days between two installments of a schedule line
+SCHEDULE_FREQUENCY_DAYS = {
+    'one_time': 0,
+    'monthly': 30,
+    'quarterly': 90,
+    'bi_annual': 180,
+    'annual': 365,
+}
+# Months of recurring services billed with each installment of a schedule line
+SCHEDULE_FREQUENCY_MONTHS = {
+    'one_time': 1,
+    'monthly': 1,
+    'quarterly': 3,
+    'bi_annual': 6,
+    'annual': 12,
+}
+
 
 class PaymentSchedule(models.Model):
     _name = 'payment.schedule'
@@ -42,6 +60,36 @@ class PaymentSchedule(models.Model):
                     'Total percentage must equal 100%%. Current total: %.2f%%'
                 ) % schedule.total_percentage)
 
+    def _expand_installments(self, start_date, total_amount, precision_digits=None):
+        """Installments of the schedule for a contract starting on ``start_date``,
+        computed in one pass over the lines ordered by days after contract.
+
+        :param total_amount: amount split between the lines by percentage
+        :param precision_digits: rounding of the installment amounts, if any
+        :return: list of dicts with the schedule line, the installment number,
+                 the installment count of the line, its date, its amount and
+                 the months of services it covers
+        """
+        self.ensure_one()
+        installments = []
+        for line in self.schedule_line_ids.sorted('days_after'):
+            count = max(line.number_of_installments, 1)
+            amount = total_amount * line.percentage / 100.0 / count
+            if precision_digits is not None:
+                amount = round(amount, precision_digits)
+            frequency_days = SCHEDULE_FREQUENCY_DAYS.get(line.installment_frequency, 0)
+            period_months = SCHEDULE_FREQUENCY_MONTHS.get(line.installment_frequency, 1)
+            for index in range(count):
+                installments.append({
+                    'line': line,
+                    'number': index + 1,
+                    'count': count,
+                    'date': start_date + timedelta(days=line.days_after + index * frequency_days),
+                    'amount': amount,
+                    'period_months': period_months,
+                })
+        return installments
+
 
 class PaymentScheduleLine(models.Model):
     _name = 'payment.schedule.line'
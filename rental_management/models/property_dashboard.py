@@ -0,0 +1,162 @@
+# -*- coding: utf-8 -*-
+# Copyright 2020-Today TechKhedut.
+# Part of TechKhedut. See LICENSE file for full copyright and licensing details.
+import logging
+from datetime import timedelta
+from odoo import api, fields, models
+
+_logger = logging.getLogger(__name__)
+
+# Dashboard widgets: snapshot section -> (property.details method, key in dashboard data)
+DASHBOARD_SECTIONS = {
+    'stats': ('_get_dashboard_stats', None),
+    'map': ('get_property_map_data', 'property_map_data'),
+    'due_paid': ('due_paid_amount', 'due_paid_amount'),
+    'top_broker': ('get_top_broker', 'tenancy_top_broker'),
+}
+# Sections older than this are refreshed even if no change was notified
+DASHBOARD_MAX_AGE = timedelta(minutes=15)
+# Key of the sections invalidated during the current transaction
+DASHBOARD_PENDING_KEY = 'rental_management.dashboard_stale_sections'
+
+
+class PropertyDashboardSnapshot(models.Model):
+    """Precomputed data of the property dashboard, one row per set of
+    allowed companies. Sections are flagged stale when their source data
+    changes and recomputed by the refresh cron or on the next read."""
+    _name = 'property.dashboard.snapshot'
+    _description = 'Property Dashboard Snapshot'
+    _rec_name = 'company_key'
+
+    company_key = fields.Char(string='Companies', required=True, readonly=True,
+                              help="Comma separated ids of the companies of the snapshot")
+    stats_data = fields.Json(string='Statistics')
+    stats_date = fields.Datetime(string='Statistics Date')
+    stats_stale = fields.Boolean(string='Statistics Stale', default=True)
+    map_data = fields.Json(string='Map')
+    map_date = fields.Datetime(string='Map Date')
+    map_stale = fields.Boolean(string='Map Stale', default=True)
+    due_paid_data = fields.Json(string='Due / Paid')
+    due_paid_date = fields.Datetime(string='Due / Paid Date')
+    due_paid_stale = fields.Boolean(string='Due / Paid Stale', default=True)
+    top_broker_data = fields.Json(string='Top Brokers')
+    top_broker_date = fields.Datetime(string='Top Brokers Date')
+    top_broker_stale = fields.Boolean(string='Top Brokers Stale', default=True)
+
+    _sql_constraints = [
+        ('company_key_unique', 'unique(company_key)',
+         'Only one dashboard snapshot per set of companies is allowed.'),
+    ]
+
+    # Invalidation
+    @api.model
+    def _mark_stale(self, sections):
+        """Remember sections whose source data changed in this transaction.
+        They are flagged stale on all snapshots right before commit, which
+        keeps the write path free of extra queries."""
+        if not sections:
+            return
+        pending = self.env.cr.precommit.data.setdefault(DASHBOARD_PENDING_KEY, set())
+        if not pending:
+            self.env.cr.precommit.add(self._flush_stale)
+        pending.update(sections)
+
+    @api.model
+    def _flush_stale(self):
+        sections = self.env.cr.precommit.data.pop(DASHBOARD_PENDING_KEY, set())
+        sections = sorted(set(sections) & set(DASHBOARD_SECTIONS))
+        if not sections:
+            return
+        # Only rows that are not stale yet are updated (and locked)
+        self.env.cr.execute("UPDATE property_dashboard_snapshot SET %s WHERE NOT (%s)" % (
+            ', '.join('%s_stale = TRUE' % section for section in sections),
+            ' AND '.join('COALESCE(%s_stale, FALSE)' % section for section in sections),
+        ))
+        self.invalidate_model(['%s_stale' % section for section in sections])
+
+    # Refresh
+    def _get_company_ids(self):
+        self.ensure_one()
+        return [int(company_id) for company_id in self.company_key.split(',')]
+
+    def _refresh(self, sections=None):
+        """Recompute the given sections (default: stale or outdated ones)"""
+        now = fields.Datetime.now()
+        for snapshot in self:
+            to_refresh = sections or [
+                section for section in DASHBOARD_SECTIONS
+                if snapshot['%s_stale' % section]
+                or not snapshot['%s_date' % section]
+                or snapshot['%s_date' % section] < now - DASHBOARD_MAX_AGE
+            ]
+            if not to_refresh:
+                continue
+            properties = self.env['property.details'].sudo().with_context(
+                allowed_company_ids=snapshot._get_company_ids())
+            vals = {}
+            for section in to_refresh:
+                method = DASHBOARD_SECTIONS[section][0]
+                vals.update({
+                    '%s_data' % section: getattr(properties, method)(),
+                    '%s_date' % section: now,
+                    '%s_stale' % section: False,
+                })
+            snapshot.write(vals)
+
+    def _get_dashboard_data(self):
+        self.ensure_one()
+        data = dict(self.stats_data or {})
+        data_age = {}
+        for section, (dummy, key) in DASHBOARD_SECTIONS.items():
+            if key:
+                data[key] = self['%s_data' % section]
+            data_age[section] = fields.Datetime.to_string(self['%s_date' % section])
+        data['data_age'] = data_age
+        return data
+
+    @api.model
+    def get_dashboard_data(self):
+        """Dashboard data of the current companies, read from their snapshot.
+        Sections changed since the last refresh are recomputed first."""
+        self._flush_stale()
+        company_key = ','.join(str(company_id) for company_id in self.env.companies.ids)
+        snapshot = self.sudo().search([('company_key', '=', company_key)], limit=1)
+        if not snapshot:
+            snapshot = self.sudo().create({'company_key': company_key})
+        snapshot._refresh()
+        return snapshot._get_dashboard_data()
+
+    @api.model
+    def _cron_refresh_snapshots(self):
+        """Keep snapshots fresh so that dashboard reads do not compute"""
+        snapshots = self.sudo().search([])
+        snapshots._refresh()
+        _logger.info("Property dashboard: %s snapshots checked", len(snapshots))
+
+
+class PropertyDashboardSourceMixin(models.AbstractModel):
+    """Flag the dashboard sections depending on a model when its records
+    are created, deleted or when one of the listed fields is written."""
+    _name = 'property.dashboard.source.mixin'
+    _description = 'Property Dashboard Source'
+
+    # Dashboard sections computed from the model
+    _dashboard_sections = ()
+    # Fields whose update changes the dashboard, None for any field
+    _dashboard_fields = None
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        records = super().create(vals_list)
+        self.env['property.dashboard.snapshot']._mark_stale(self._dashboard_sections)
+        return records
+
+    def write(self, vals):
+        res = super().write(vals)
+        if self._dashboard_fields is None or not self._dashboard_fields.isdisjoint(vals):
+            self.env['property.dashboard.snapshot']._mark_stale(self._dashboard_sections)
+        return res
+
+    def unlink(self):
+        self.env['property.dashboard.snapshot']._mark_stale(self._dashboard_sections)
+        return super().unlink()
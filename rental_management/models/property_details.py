@@ -2,15 +2,24 @@
 # Copyright 2020-Today TechKhedut.
 # Part of TechKhedut. See LICENSE file for full copyright and licensing details.
 import base64
+from collections import defaultdict
 from odoo import api, fields, models, tools, _
 from odoo.exceptions import ValidationError
+from odoo.tools.sql import create_index
 from odoo.addons.web_editor.tools import get_video_embed_code, get_video_thumbnail
 
+# Property map clustering: grid cells per side of a map tile at the requested zoom
+MAP_CLUSTER_GRID = 4
+MAP_MAX_ZOOM = 22
+
 
 class PropertyDetails(models.Model):
     _name = 'property.details'
     _description = 'Property Details and for registration new Property'
-    _inherit = ['mail.thread', 'mail.activity.mixin']
+    _inherit = ['mail.thread', 'mail.activity.mixin', 'property.dashboard.source.mixin']
+    _dashboard_sections = ('stats', 'map')
+    _dashboard_fields = {'stage', 'type', 'company_id', 'name', 'price', 'priority',
+                         'latitude', 'longitude', 'region_id', 'city_id'}
 
     # Property Details
     name = fields.Char(string='Name', required=True, translate=True)
@@ -64,9 +73,9 @@ class PropertyDetails(models.Model):
     # Project & Sub Project & Region
     region_id = fields.Many2one('property.region', string="Region", index=True)
     property_project_id = fields.Many2one('property.project',
-                                          string="Project")
+                                          string="Project", index='btree_not_null')
     subproject_id = fields.Many2one('property.sub.project',
-                                    string="Sub Project")
+                                    string="Sub Project", index='btree_not_null')
 
     # Address
     zip = fields.Char(string='Zip')
@@ -82,6 +91,10 @@ class PropertyDetails(models.Model):
     # Lat Long
     longitude = fields.Char(string='Longitude')
     latitude = fields.Char(string='Latitude')
+    map_latitude = fields.Float(string='Map Latitude', compute='_compute_map_coordinates', store=True)
+    map_longitude = fields.Float(string='Map Longitude', compute='_compute_map_coordinates', store=True)
+    map_located = fields.Boolean(string='Located on Map', compute='_compute_map_coordinates', store=True,
+                                 help="Latitude and longitude are valid coordinates")
 
     # Owner Details
     landlord_id = fields.Many2one('res.partner',
@@ -439,6 +452,14 @@ class PropertyDetails(models.Model):
 
     # ----------------------------------------------------------------------------------------------------DEPRECATED END
 
+    # Indexes
+    def init(self):
+        super().init()
+        # Bounding box lookups of the map clusters, see get_property_map_clusters()
+        create_index(self._cr, 'property_details_map_coordinates_index', self._table,
+                     ['map_latitude', 'map_longitude'],
+                     where="stage = 'available' AND map_located")
+
     # Create, Constrain, Write, Scheduler, Name get
     # Create
     @api.model_create_multi
@@ -515,6 +536,21 @@ class PropertyDetails(models.Model):
         #         data.compute_industrial_measure()
 
     # Compute
+    # Map Coordinates
+    @api.depends('latitude', 'longitude')
+    def _compute_map_coordinates(self):
+        for rec in self:
+            try:
+                latitude = float(rec.latitude)
+                longitude = float(rec.longitude)
+            except (TypeError, ValueError):
+                latitude = longitude = None
+            located = (latitude is not None and -90 <= latitude <= 90
+                       and -180 <= longitude <= 180)
+            rec.map_latitude = latitude if located else 0.0
+            rec.map_longitude = longitude if located else 0.0
+            rec.map_located = located
+
     # Total Measurement
     @api.depends('room_measurement_ids', 'type', 'measure_unit', 'is_section_measurement')
     def compute_room_measure(self):
@@ -638,6 +674,58 @@ class PropertyDetails(models.Model):
             rec.sale_broker_count = sale_counts.get(rec.id, 0)
             rec.tenancy_broker_count = tenancy_counts.get(rec.id, 0)
 
+    @api.model
+    def _get_project_statistics(self, group_field, group_ids):
+        """Unit statistics of projects or sub projects, computed with one grouped
+        query for the counts, one for the valuation and one search per contract model.
+
+        :param group_field: 'property_project_id' or 'subproject_id'
+        :return: {group id: {'counts': {stage: count},
+                             'units': {(sale_lease, subproject id): totals},
+                             'sale': {'paid': .., 'remaining': ..},
+                             'tenancy': {'paid': .., 'remaining': ..}}}
+        """
+        statistics = defaultdict(lambda: {
+            'counts': defaultdict(int),
+            'units': defaultdict(lambda: defaultdict(float)),
+            'sale': defaultdict(float),
+            'tenancy': defaultdict(float),
+        })
+        if not group_ids:
+            return statistics
+        domain = [(group_field, 'in', group_ids)]
+
+        # Counts follow the access rights of the user, as the smart buttons do
+        for group in self.read_group(domain, [group_field, 'stage'], [group_field, 'stage'], lazy=False):
+            statistics[group[group_field][0]]['counts'][group['stage']] += group['__count']
+
+        for group in self.sudo().read_group(
+                domain,
+                ['total_area:sum', 'price:sum', 'total_maintenance:sum'],
+                [group_field, 'subproject_id', 'sale_lease', 'stage', 'is_maintenance_service'],
+                lazy=False):
+            subproject_id = group['subproject_id'] and group['subproject_id'][0]
+            totals = statistics[group[group_field][0]]['units'][(group['sale_lease'], subproject_id)]
+            totals['total_area'] += group['total_area'] or 0.0
+            totals['total_values'] += group['price'] or 0.0
+            if group['stage'] == 'available':
+                totals['available_area'] += group['total_area'] or 0.0
+            if group['is_maintenance_service']:
+                totals['total_maintenance'] += group['total_maintenance'] or 0.0
+
+        # Paid and remaining amounts are not stored: computed once for the whole batch
+        sales = self.env['property.vendor'].sudo().search([('property_id.%s' % group_field, 'in', group_ids)])
+        for sale in sales:
+            amounts = statistics[sale.property_id[group_field].id]['sale']
+            amounts['paid'] += sale.paid_amount
+            amounts['remaining'] += sale.remaining_amount
+        tenancies = self.env['tenancy.details'].sudo().search([('property_id.%s' % group_field, 'in', group_ids)])
+        for tenancy in tenancies:
+            amounts = statistics[tenancy.property_id[group_field].id]['tenancy']
+            amounts['paid'] += tenancy.paid_tenancy
+            amounts['remaining'] += tenancy.remain_tenancy
+        return statistics
+
     # Onchange
     # Area Wise Price
     @api.onchange('pricing_type', 'price_per_area', 'measure_unit', 'room_measurement_ids', 'is_section_measurement',
@@ -889,6 +977,12 @@ class PropertyDetails(models.Model):
     # DashBoard
     @api.model
     def get_property_stats(self):
+        """Dashboard data, read from the snapshot of the current companies.
+        The 'data_age' key gives the refresh date of each widget."""
+        return self.env['property.dashboard.snapshot'].get_dashboard_data()
+
+    @api.model
+    def _get_dashboard_stats(self):
         """Optimized dashboard statistics using read_group for 5-10x performance improvement"""
         company_domain = [('company_id', 'in', self.env.companies.ids)]
         currency_symbol = self.env.company.currency_id.symbol
@@ -1025,9 +1119,6 @@ class PropertyDetails(models.Model):
             # Graph
             'property_type': property_type,
             'property_stage': property_stage,
-            'property_map_data': self.get_property_map_data(),
-            'due_paid_amount': self.due_paid_amount(),
-            'tenancy_top_broker': self.get_top_broker(),
         }
 
     def get_top_broker(self):
@@ -1060,40 +1151,38 @@ class PropertyDetails(models.Model):
                 list(broker_sold_list.values())]
 
     def due_paid_amount(self):
+        """Due and paid amounts of sold properties and tenancies, each
+        aggregated with a single grouped query"""
         company_domain = [('company_id', 'in', self.env.companies.ids)]
-        sold = {}
-        tenancy = {}
-        not_paid_amount_sold = 0.0
-        paid_amount_sold = 0.0
-        not_paid_amount_tenancy = 0.0
-        paid_amount_tenancy = 0.0
-        property_sold = self.env['account.move'].sudo().search(
-            [('sold_id', '!=', False)] + company_domain)
-        for data in property_sold:
-            if data.sold_id.stage == "sold":
-                if data.payment_state == "not_paid":
-                    not_paid_amount_sold = not_paid_amount_sold + data.amount_total
-                if data.payment_state == "paid":
-                    paid_amount_sold = paid_amount_sold + data.amount_total
-        sold['Due'] = not_paid_amount_sold
-        sold['Paid'] = paid_amount_sold
-        property_tenancy = self.env['rent.invoice'].sudo().search(
-            company_domain)
-        for rec in property_tenancy:
-            if rec.payment_state == 'not_paid':
-                not_paid_amount_tenancy = not_paid_amount_tenancy + \
-                    rec.rent_invoice_id.amount_total
-            if rec.payment_state == 'paid':
-                paid_amount_tenancy = paid_amount_tenancy + rec.rent_invoice_id.amount_total
-        tenancy['Due'] = not_paid_amount_tenancy
-        tenancy['Paid'] = paid_amount_tenancy
+        sold_groups = self.env['account.move'].sudo().read_group(
+            domain=[('sold_id.stage', '=', 'sold'),
+                    ('payment_state', 'in', ['not_paid', 'paid'])] + company_domain,
+            fields=['amount_total:sum'],
+            groupby=['payment_state'])
+        sold_amounts = {group['payment_state']: group['amount_total'] or 0.0
+                        for group in sold_groups}
+        self.env['rent.invoice'].flush_model(['company_id', 'rent_invoice_id'])
+        self.env['account.move'].flush_model(['payment_state', 'amount_total'])
+        self.env.cr.execute("""
+            SELECT move.payment_state, SUM(move.amount_total)
+              FROM rent_invoice invoice
+              JOIN account_move move ON move.id = invoice.rent_invoice_id
+             WHERE invoice.company_id = ANY(%s)
+               AND move.payment_state IN ('not_paid', 'paid')
+          GROUP BY move.payment_state
+        """, [self.env.companies.ids])
+        tenancy_amounts = {state: float(total or 0.0)
+                           for state, total in self.env.cr.fetchall()}
+        sold = {'Due': sold_amounts.get('not_paid', 0.0),
+                'Paid': sold_amounts.get('paid', 0.0)}
+        tenancy = {'Due': tenancy_amounts.get('not_paid', 0.0),
+                   'Paid': tenancy_amounts.get('paid', 0.0)}
         return [list(sold.keys()), list(sold.values()), list(tenancy.keys()),
                 list(tenancy.values())]
 
     def get_property_map_data(self):
         """Optimized map data with limits and prefetching for 10x performance improvement"""
         company_domain = [('company_id', 'in', self.env.companies.ids)]
-        data = []
 
         # ✅ OPTIMIZED: Add limit, filter for coordinates, and order by priority
         properties = self.env['property.details'].sudo().search(
@@ -1107,22 +1196,82 @@ class PropertyDetails(models.Model):
         # ✅ OPTIMIZED: Prefetch related fields to avoid N+1 queries
         properties.mapped('region_id.name')
         properties.mapped('city_id.name')
+        return [prop._prepare_map_marker() for prop in properties]
+
+    def _prepare_map_marker(self):
+        self.ensure_one()
+        title = f"Property: {self.name}"
+        if self.region_id:
+            title += f"\nRegion: {self.region_id.name}"
+        if self.city_id:
+            title += f"\nCity: {self.city_id.name}"
+        return {
+            'title': title,
+            'latitude': self.latitude,
+            'longitude': self.longitude,
+            'id': self.id,
+            'price': self.price,
+        }
 
-        for prop in properties:
-            title = f"Property: {prop.name}"
-            if prop.region_id:
-                title += f"\nRegion: {prop.region_id.name}"
-            if prop.city_id:
-                title += f"\nCity: {prop.city_id.name}"
-
-            data.append({
-                'title': title,
-                'latitude': prop.latitude,
-                'longitude': prop.longitude,
-                'id': prop.id,
-                'price': prop.price,
+    @api.model
+    def get_property_map_clusters(self, bounds, zoom):
+        """Available properties of the map viewport, clustered server side.
+
+        Properties are bucketed on a grid whose cell size follows the zoom level,
+        so that the payload depends on the viewport and not on the portfolio size.
+        Buckets holding a single property return its id, its details are loaded
+        on demand with get_property_map_markers().
+
+        :param bounds: dict with the south, west, north and east viewport edges
+        :param zoom: map zoom level
+        :return: {'zoom': int, 'total': int, 'markers': [{'id', 'count', 'latitude',
+                  'longitude', 'bounds'}]}
+        """
+        zoom = min(max(int(zoom or 0), 0), MAP_MAX_ZOOM)
+        params = {
+            'cell': 360.0 / (2 ** zoom * MAP_CLUSTER_GRID),
+            'south': float(bounds['south']),
+            'north': float(bounds['north']),
+            'west': float(bounds['west']),
+            'east': float(bounds['east']),
+            'company_ids': tuple(self.env.companies.ids),
+        }
+        # A viewport crossing the antimeridian has its west edge east of its east edge
+        longitude_join = 'AND' if params['west'] <= params['east'] else 'OR'
+        self.flush_model(['map_latitude', 'map_longitude', 'map_located', 'stage', 'company_id'])
+        self.env.cr.execute(f"""
+            SELECT COUNT(*), AVG(map_latitude), AVG(map_longitude),
+                   MIN(map_latitude), MIN(map_longitude), MAX(map_latitude), MAX(map_longitude),
+                   MIN(id)
+              FROM {self._table}
+             WHERE stage = 'available'
+               AND map_located
+               AND company_id IN %(company_ids)s
+               AND map_latitude BETWEEN %(south)s AND %(north)s
+               AND (map_longitude >= %(west)s {longitude_join} map_longitude <= %(east)s)
+             GROUP BY FLOOR(map_latitude / %(cell)s), FLOOR(map_longitude / %(cell)s)
+        """, params)
+        markers = []
+        for count, latitude, longitude, south, west, north, east, property_id in self.env.cr.fetchall():
+            markers.append({
+                'id': property_id if count == 1 else False,
+                'count': count,
+                'latitude': latitude,
+                'longitude': longitude,
+                'bounds': {'south': south, 'west': west, 'north': north, 'east': east},
             })
-        return data
+        return {
+            'zoom': zoom,
+            'total': sum(marker['count'] for marker in markers),
+            'markers': markers,
+        }
+
+    @api.model
+    def get_property_map_markers(self, property_ids):
+        """Details of the map markers, loaded when a marker is opened"""
+        properties = self.sudo().search([('id', 'in', property_ids),
+                                         ('company_id', 'in', self.env.companies.ids)])
+        return [prop._prepare_map_marker() for prop in properties]
 
 
 # Area Measurement
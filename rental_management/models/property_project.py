@@ -9,7 +9,9 @@ from odoo.addons.web_editor.tools import get_video_embed_code, get_video_thumbna
 
 class PropertyProject(models.Model):
     _name = "property.project"
-    _inherit = ["mail.thread", "mail.activity.mixin"]
+    _inherit = ["mail.thread", "mail.activity.mixin", "property.dashboard.source.mixin"]
+    _dashboard_sections = ('stats',)
+    _dashboard_fields = {'company_id'}
     _description = "Property Project Details"
 
     # Project Details
@@ -169,84 +171,60 @@ class PropertyProject(models.Model):
     # Smart Button Count
     @api.depends('is_sub_project')
     def compute_count(self):
+        document_counts = {
+            group['project_id'][0]: group['project_id_count']
+            for group in self.env["project.document.line"].read_group(
+                [("project_id", "in", self._origin.ids)], ['project_id'], ['project_id'])
+        }
+        statistics = self.env['property.details']._get_project_statistics(
+            'property_project_id', self._origin.ids)
         for rec in self:
-            rec.document_count = self.env["project.document.line"].search_count(
-                [("project_id", "=", rec.id)])
-            rec.unit_count = self.env['property.details'].search_count(
-                [('property_project_id', '=', rec.id)])
-            rec.available_unit_count = self.env['property.details'].search_count(
-                [('property_project_id', '=', rec.id), ('stage', '=', 'available')])
-            rec.sold_count = self.env['property.details'].search_count(
-                [('property_project_id', '=', rec.id), ('stage', 'in', ['sale', 'sold'])])
-            rec.rent_count = self.env['property.details'].search_count(
-                [('property_project_id', '=', rec.id), ('stage', '=', 'on_lease')])
+            counts = statistics[rec._origin.id]['counts']
+            rec.document_count = document_counts.get(rec._origin.id, 0)
+            rec.unit_count = sum(counts.values())
+            rec.available_unit_count = counts['available']
+            rec.sold_count = counts['sale'] + counts['sold']
+            rec.rent_count = counts['on_lease']
 
     @api.depends("sub_project_ids")
     def _compute_sub_project_count(self):
+        sub_project_counts = {
+            group['property_project_id'][0]: group['property_project_id_count']
+            for group in self.env["property.sub.project"].read_group(
+                [("property_project_id", "in", self._origin.ids)],
+                ['property_project_id'], ['property_project_id'])
+        }
         for rec in self:
-            rec.total_subproject = (self.env["property.sub.project"].search_count(
-                [("property_project_id", "=", rec.id)]))
+            rec.total_subproject = sub_project_counts.get(rec._origin.id, 0)
 
     @api.depends('sale_lease', 'is_sub_project')
     def compute_properties_statics(self):
+        statistics = self.env['property.details']._get_project_statistics(
+            'property_project_id', self._origin.ids)
+        sub_project_ids = set(self.env['property.sub.project'].sudo().search(
+            [('property_project_id', 'in', self._origin.ids)]).ids)
         for rec in self:
-            total_area = 0.0
-            available_area = 0.0
-            total_values = 0.0
-            total_maintenance = 0.0
-            total_collection = 0.0
-            scope_of_collection = 0.0
-            properties = self.env['property.details'].sudo()
-            project_domain = [('property_project_id', '=', rec.id)]
-            subprojects = self.env['property.sub.project'].sudo().search(
-                [('property_project_id', '=', rec.id)]).mapped('id')
-            properties_ids = self.env['property.details'].sudo().search(
-                project_domain).mapped('id')
-            properties_sale = self.env['property.vendor'].sudo().search(
-                [('property_id', 'in', properties_ids)])
-            properties_tenancy = self.env['tenancy.details'].sudo().search(
-                [('property_id', 'in', properties_ids)])
-            if rec.sale_lease == 'sale':
-                sale_domain = project_domain + \
-                              [('sale_lease', '=', 'for_sale')]
-                if rec.is_sub_project:
-                    sale_domain = sale_domain + \
-                                  [('subproject_id', 'in', subprojects)]
-                total_area = sum(properties.search(
-                    sale_domain).mapped('total_area'))
-                available_area = sum(properties.search(
-                    sale_domain + [('stage', '=', 'available')]).mapped('total_area'))
-                total_values = sum(properties.search(
-                    sale_domain).mapped('price'))
-                total_maintenance = sum(properties.search(
-                    sale_domain + [('is_maintenance_service', '=', True)]).mapped('total_maintenance'))
-                total_collection = sum(properties_sale.mapped('paid_amount'))
-                scope_of_collection = sum(
-                    properties_sale.mapped('remaining_amount'))
-            if rec.sale_lease == 'rent':
-                tenancy_domain = [
-                                     ('sale_lease', '=', 'for_tenancy')] + project_domain
-                if rec.is_sub_project:
-                    tenancy_domain = tenancy_domain + \
-                                     [('subproject_id', 'in', subprojects)]
-                total_area = sum(properties.search(
-                    tenancy_domain).mapped('total_area'))
-                available_area = sum(properties.search(
-                    tenancy_domain + [('stage', '=', 'available')]).mapped('total_area'))
-                total_values = sum(properties.search(
-                    tenancy_domain).mapped('price'))
-                total_maintenance = sum(properties.search(
-                    tenancy_domain + [('is_maintenance_service', '=', True)]).mapped('total_maintenance'))
-                total_collection = sum(
-                    properties_tenancy.mapped('paid_tenancy'))
-                scope_of_collection = sum(
-                    properties_tenancy.mapped('remain_tenancy'))
-            rec.total_area = total_area
-            rec.available_area = available_area
-            rec.total_values = total_values
-            rec.total_maintenance = total_maintenance
-            rec.total_collection = total_collection
-            rec.scope_of_collection = scope_of_collection
+            project_statistics = statistics[rec._origin.id]
+            sale_lease = {'sale': 'for_sale', 'rent': 'for_tenancy'}.get(rec.sale_lease)
+            totals = {'total_area': 0.0, 'available_area': 0.0, 'total_values': 0.0, 'total_maintenance': 0.0}
+            for (unit_sale_lease, subproject_id), unit_totals in project_statistics['units'].items():
+                if unit_sale_lease != sale_lease:
+                    continue
+                # Projects with sub projects only value the units of their sub projects
+                if rec.is_sub_project and subproject_id not in sub_project_ids:
+                    continue
+                for key in totals:
+                    totals[key] += unit_totals[key]
+            contract_amounts = {
+                'sale': project_statistics['sale'],
+                'rent': project_statistics['tenancy'],
+            }.get(rec.sale_lease, {})
+            rec.total_area = totals['total_area']
+            rec.available_area = totals['available_area']
+            rec.total_values = totals['total_values']
+            rec.total_maintenance = totals['total_maintenance']
+            rec.total_collection = contract_amounts.get('paid', 0.0)
+            rec.scope_of_collection = contract_amounts.get('remaining', 0.0)
 
     # Onchange
     @api.onchange('country_id')
@@ -8,6 +8,9 @@ from odoo import api, models, fields
 class PropertyRegion(models.Model):
     _name = "property.region"
     _description = "Property Regions"
+    _inherit = ['property.dashboard.source.mixin']
+    _dashboard_sections = ('stats',)
+    _dashboard_fields = set()
 
     name = fields.Char(string="Region")
     city_ids = fields.Many2many('property.res.city', string="Cities")
@@ -1,19 +1,40 @@
 # -*- coding: utf-8 -*-
 # Copyright 2020-Today TechKhedut.
 # Part of TechKhedut. See LICENSE file for full copyright and licensing details.
-import datetime
+import logging
 import re
+from collections import defaultdict
 from dateutil.relativedelta import relativedelta
 from odoo.exceptions import ValidationError, UserError
-from odoo import api, fields, models, _
-from odoo.tools import DEFAULT_SERVER_DATE_FORMAT as DATE_FORMAT
+from odoo import api, fields, models, tools, _
+from odoo.osv import expression
+from odoo.tools.sql import create_index
+
+_logger = logging.getLogger(__name__)
+
+# Recurring billing: invoice period and rent unit of each automatic payment term
+BILLING_PERIODS = {
+    'monthly': relativedelta(months=1),
+    'quarterly': relativedelta(months=3),
+    'year': relativedelta(years=1),
+}
+BILLING_RENT_UNITS = {
+    'monthly': 'Month',
+    'quarterly': 'Month',
+    'year': 'Year',
+}
+# Contracts invoiced (and committed) together by the billing scheduler
+BILLING_BATCH_SIZE = 200
 
 
 class TenancyDetails(models.Model):
     _name = 'tenancy.details'
     _description = 'Information Related To customer Tenancy while Creating Contract'
-    _inherit = ['mail.thread', 'mail.activity.mixin']
+    _inherit = ['mail.thread', 'mail.activity.mixin', 'property.dashboard.source.mixin']
     _rec_name = 'tenancy_seq'
+    _dashboard_sections = ('stats', 'top_broker')
+    _dashboard_fields = {'contract_type', 'is_extended', 'is_any_broker', 'broker_id',
+                         'company_id'}
 
     # Tenancy Details
     tenancy_seq = fields.Char(string='Sequence', required=True, readonly=True, copy=False,
@@ -129,10 +150,14 @@ class TenancyDetails(models.Model):
                                  compute="_compute_rent_unit")
     start_date = fields.Date(string='Start Date', default=fields.date.today(), index=True)
     end_date = fields.Date(string='End Date', compute='_compute_end_date',
-                           search='_search_end_date', store=True, index=True)
+                           store=True, index=True)
     invoice_start_date = fields.Date(
         string="Invoice Start From", default=fields.date.today())
     last_invoice_payment_date = fields.Date(string='Last Invoice Payment Date')
+    next_invoice_due_date = fields.Date(string='Next Invoice Date',
+                                        compute='_compute_next_invoice_due_date',
+                                        store=True, index=True,
+                                        help="Date of the next recurring installment invoice")
     rent_invoice_ids = fields.One2many(
         'rent.invoice', 'tenancy_id', string='Invoices')
     total_area = fields.Float(related="property_id.total_area")
@@ -331,6 +356,15 @@ class TenancyDetails(models.Model):
     added_service_invoice = fields.Selection([('merge', 'Merge With Installment'),
                                               ('separate', 'Separate')], default='merge')
 
+    # Indexes
+    def init(self):
+        super().init()
+        # Contract period [start date, end date) for the overlap (&&) lookups
+        # of the availability checks, see _get_period_conflicts()
+        create_index(self._cr, 'tenancy_details_period_gist_index', self._table,
+                     ["daterange(start_date, end_date, '[)')"], method='gist',
+                     where="start_date IS NOT NULL AND end_date IS NOT NULL AND start_date <= end_date")
+
     # Create, Write, Name get...
     @api.model_create_multi
     def create(self, vals_list):
@@ -380,9 +414,12 @@ class TenancyDetails(models.Model):
 
     # Compute
     # Contract End Date
-    @api.depends('start_date', 'month', 'rent_unit', 'payment_term', 'duration_type',
+    @api.depends('start_date', 'duration_id.month', 'final_rent_unit',
+                 'property_id.rent_unit', 'payment_term', 'duration_type',
                  'duration_end_date')
     def _compute_end_date(self):
+        """Stored and indexed so that end date filters (list views, expiry
+        and reminder crons) are plain SQL conditions"""
         for rec in self:
             end_date = None
             if rec.duration_type == 'by_duration' and rec.start_date:
@@ -397,29 +434,12 @@ class TenancyDetails(models.Model):
                 end_date = rec.duration_end_date
             rec.end_date = end_date
 
-    # Search End Date
-    def _search_end_date(self, operator, value):
-        contracts = []
-        contracts_ids = self.env['tenancy.details'].search([])
-        for rec in contracts_ids:
-            end_date = rec.end_date
-            if value and end_date:
-                if isinstance(value, str):
-                    end_date = datetime.datetime.strftime(
-                        end_date, DATE_FORMAT)
-                if operator == '=' and end_date == value:
-                    contracts.append(rec.id)
-                elif operator == '>=' and end_date >= value:
-                    contracts.append(rec.id)
-                elif operator == '<=' and end_date <= value:
-                    contracts.append(rec.id)
-                elif operator == '>' and end_date > value:
-                    contracts.append(rec.id)
-                elif operator == '<' and end_date < value:
-                    contracts.append(rec.id)
-                elif operator == '!=' and end_date != value:
-                    contracts.append(rec.id)
-        return [('id', 'in', contracts)]
+    @api.depends('last_invoice_payment_date', 'payment_term')
+    def _compute_next_invoice_due_date(self):
+        for rec in self:
+            period = BILLING_PERIODS.get(rec.payment_term)
+            rec.next_invoice_due_date = rec.last_invoice_payment_date + period \
+                if period and rec.last_invoice_payment_date else False
 
     # Broker Commission
     @api.depends('is_any_broker', 'month', 'broker_commission', 'broker_commission_percentage',
@@ -488,52 +508,67 @@ class TenancyDetails(models.Model):
     # Count
     @api.depends('rent_invoice_ids')
     def _compute_invoice_count(self):
+        """Invoice count for the whole recordset with a single grouped query"""
+        invoice_groups = self.env['rent.invoice'].read_group(
+            domain=[('tenancy_id', 'in', self._origin.ids)],
+            fields=['tenancy_id'],
+            groupby=['tenancy_id'])
+        invoice_counts = {group['tenancy_id'][0]: group['tenancy_id_count']
+                          for group in invoice_groups}
         for rec in self:
-            rec.invoice_count = self.env['rent.invoice'].search_count(
-                [('tenancy_id', '=', rec.id)])
+            rec.invoice_count = invoice_counts.get(rec._origin.id, 0)
 
     @api.depends('rent_bill_ids')
     def _compute_total_bill_amount(self):
+        """Bills of all contracts are fetched at once, their account moves
+        are then read through the prefetch instead of one search per
+        contract"""
+        totals = {rec_id: [0.0, 0.0] for rec_id in self._origin.ids}
+        bills = self.env['rent.bill'].search([('tenancy_id', 'in', self._origin.ids)])
+        for bill in bills:
+            amounts = totals[bill.tenancy_id.id]
+            amounts[0] += bill.amount
+            if bill.rent_bill_id.payment_state == 'paid':
+                amounts[1] += bill.rent_bill_id.amount_total
         for rec in self:
-            bills = self.env['rent.bill'].search([('tenancy_id', '=', rec.id)])
-            total = 0.0
-            paid = 0.0
-            for bill in bills:
-                total += bill.amount
-                if bill.rent_bill_id.payment_state == 'paid':
-                    paid = paid + bill.rent_bill_id.amount_total
+            total, paid = totals.get(rec._origin.id, (0.0, 0.0))
             rec.total_bill_amount = total
             rec.paid_bill_amount = paid
             rec.remaining_bill_amount = total - paid
 
     def _compute_maintenance_request_count(self):
+        request_groups = self.env['maintenance.request'].read_group(
+            domain=[('rent_contract_id', 'in', self._origin.ids)],
+            fields=['rent_contract_id'],
+            groupby=['rent_contract_id'])
+        request_counts = {group['rent_contract_id'][0]: group['rent_contract_id_count']
+                          for group in request_groups}
         for rec in self:
-            request_count = self.env['maintenance.request'].search_count(
-                [('rent_contract_id', 'in', [rec.id])])
-            rec.maintenance_request_count = request_count
+            rec.maintenance_request_count = request_counts.get(rec._origin.id, 0)
 
     # Profit and Loss (P/L)
     @api.depends('rent_invoice_ids', 'rent_bill_ids')
     def _compute_total_amount(self):
+        """Posted invoice and bill totals of the whole recordset from one
+        aggregation over account.move grouped by contract and move type"""
+        move_groups = self.env['account.move'].sudo().read_group(
+            domain=[('tenancy_id', 'in', self._origin.ids),
+                    ('move_type', 'in', ['out_invoice', 'in_invoice']),
+                    ('state', '=', 'posted')],
+            fields=['amount_total_signed:sum', 'amount_residual_signed:sum'],
+            groupby=['tenancy_id', 'move_type'],
+            lazy=False)
+        move_totals = {
+            (group['tenancy_id'][0], group['move_type']): (
+                group['amount_total_signed'] or 0.0,
+                group['amount_residual_signed'] or 0.0)
+            for group in move_groups
+        }
         for rec in self:
-            invoice_amount = 0.0
-            invoice_residual = 0.0
-            bill_amount = 0.0
-            bill_residual = 0.0
-
-            invoices = self.env['account.move'].sudo().search(
-                [('tenancy_id', '=', rec.id), ('move_type', '=', 'out_invoice'),
-                 ('state', '=', 'posted')])
-            for invoice in invoices:
-                invoice_amount += invoice.amount_total_signed
-                invoice_residual += invoice.amount_residual_signed
-
-            bills = self.env['account.move'].sudo().search(
-                [('tenancy_id', '=', rec.id), ('move_type', '=', 'in_invoice'),
-                 ('state', '=', 'posted')])
-            for bill in bills:
-                bill_amount += bill.amount_total_signed
-                bill_residual += bill.amount_residual_signed
+            invoice_amount, invoice_residual = move_totals.get(
+                (rec._origin.id, 'out_invoice'), (0.0, 0.0))
+            bill_amount, bill_residual = move_totals.get(
+                (rec._origin.id, 'in_invoice'), (0.0, 0.0))
 
             rec.total_invoiced = invoice_amount
             rec.invoice_residual = invoice_residual
@@ -566,19 +601,45 @@ class TenancyDetails(models.Model):
                  'payment_term')
     def _compute_is_contract_period_available(self):
         """Check weather contract period is available or not"""
-        for rec in self:
-            is_period_available = True
-            if rec.start_date and rec.end_date:
-                contract = self.env['tenancy.details'].search([('start_date', '<=', rec.end_date),
-                                                               ('end_date', '>',
-                                                                rec.start_date),
-                                                               ('property_id', '=',
-                                                                rec.property_id.id),
-                                                               ('contract_type', '=',
-                                                                'running_contract')])
-                if contract:
-                    is_period_available = False
-            rec.is_contract_period_available = is_period_available
+        conflicts = self._get_period_conflicts(
+            [(rec.property_id.id, rec.start_date, rec.end_date) for rec in self],
+            ['running_contract'])
+        for index, rec in enumerate(self):
+            rec.is_contract_period_available = not conflicts.get(index)
+
+    @api.model
+    def _get_period_conflicts(self, periods, contract_types):
+        """Contracts of the given types overlapping each period, found with one
+        query on the period GiST index.
+
+        :param periods: list of (property id, start date, end date)
+        :return: {index of the period: contract ids}
+        """
+        conflicts = defaultdict(list)
+        periods = [(index, property_id or None, start_date, end_date)
+                   for index, (property_id, start_date, end_date) in enumerate(periods)
+                   if start_date and end_date and start_date <= end_date]
+        if not periods:
+            return conflicts
+        self.flush_model(['property_id', 'start_date', 'end_date', 'contract_type'])
+        indexes, property_ids, start_dates, end_dates = zip(*periods)
+        self.env.cr.execute(f"""
+            SELECT period.period_index, tenancy.id
+              FROM unnest(%s::int[], %s::int[], %s::date[], %s::date[])
+                   AS period(period_index, property_id, start_date, end_date)
+              JOIN {self._table} tenancy
+                ON tenancy.property_id IS NOT DISTINCT FROM period.property_id
+               AND daterange(tenancy.start_date, tenancy.end_date, '[)')
+                   && daterange(period.start_date, period.end_date, '[]')
+             WHERE tenancy.start_date IS NOT NULL
+               AND tenancy.end_date IS NOT NULL
+               AND tenancy.start_date <= tenancy.end_date
+               AND tenancy.contract_type IN %s
+             ORDER BY tenancy.id
+        """, [list(indexes), list(property_ids), list(start_dates), list(end_dates), tuple(contract_types)])
+        for index, tenancy_id in self.env.cr.fetchall():
+            conflicts[index].append(tenancy_id)
+        return conflicts
 
     @api.depends('payment_term', 'rent_unit')
     def _compute_durations_ids(self):
@@ -834,9 +895,17 @@ class TenancyDetails(models.Model):
 
     def _process_separate_invoices(self, maintenance=None, utility=None, quarter_qty=None):
         """Process Utility and Maintenance Separate Invoices"""
+        separate_invoices = self._prepare_separate_invoices(
+            maintenance=maintenance, utility=utility, quarter_qty=quarter_qty)
+        self._create_invoices_with_entries(separate_invoices)
+
+    def _prepare_separate_invoices(self, maintenance=None, utility=None, quarter_qty=None):
+        """Return (invoice values, rent.invoice values) pairs of the separate
+        maintenance and utility invoices of the contract"""
         quarter = quarter_qty if quarter_qty else 3
+        separate_invoices = []
         if maintenance:
-            maintenance_invoice_id = self.env['account.move'].create({
+            separate_invoices.append(({
                 "partner_id": self.tenancy_id.id,
                 "move_type": "out_invoice",
                 "invoice_date": self.invoice_start_date,
@@ -847,14 +916,12 @@ class TenancyDetails(models.Model):
                     "quantity": quarter if self.payment_term == 'quarterly' else 1,
                     "price_unit": self.total_maintenance,
                 })],
-            })
-            self.env['rent.invoice'].create({
+            }, {
                 "tenancy_id": self.id,
                 "type": "maintenance",
                 "invoice_date": self.invoice_start_date,
-                "amount": maintenance_invoice_id.amount_total,
                 "description": "Maintenance of " + self.property_id.name,
-                "rent_invoice_id": maintenance_invoice_id.id})
+            }))
         if utility:
             service_invoice_lines = []
             for line in self.extra_services_ids:
@@ -866,20 +933,38 @@ class TenancyDetails(models.Model):
                     "price_unit": line.price,
                     "tax_ids": self.tax_ids.ids if self.service_tax else False,
                 }))
-            service_invoice_id = self.env['account.move'].create({
+            separate_invoices.append(({
                 "partner_id": self.tenancy_id.id,
                 "move_type": "out_invoice",
                 "invoice_date": self.invoice_start_date,
                 "tenancy_id": self.id,
                 "invoice_line_ids": service_invoice_lines,
-            })
-            self.env['rent.invoice'].create({
+            }, {
                 "tenancy_id": self.id,
                 "type": "other",
                 "invoice_date": self.invoice_start_date,
-                "amount": service_invoice_id.amount_total,
                 "description": "Utility Services",
-                "rent_invoice_id": service_invoice_id.id})
+            }))
+        return separate_invoices
+
+    @api.model
+    def _create_invoices_with_entries(self, invoices, post=False):
+        """Create the account moves of (invoice values, rent.invoice values)
+        pairs in one call, optionally post them together, then create the
+        matching rent.invoice entries in one call. The moves are created with
+        the environment of the caller: the recurring billing cron runs on a
+        sudo recordset, manual actions under the user's access rights"""
+        if not invoices:
+            return self.env['account.move']
+        moves = self.env['account.move'].create(
+            [move_vals for move_vals, dummy in invoices])
+        if post:
+            moves.action_post()
+        self.env['rent.invoice'].create([
+            dict(entry_vals, rent_invoice_id=move.id, amount=move.amount_total)
+            for (dummy, entry_vals), move in zip(invoices, moves)
+        ])
+        return moves
 
     # Rent Invoice Record
     def action_create_rent_invoice_entry(self, amount, invoice_id):
@@ -907,40 +992,51 @@ class TenancyDetails(models.Model):
         This method allows users to manually apply the property's default 
         rental payment schedule to the contract. This is useful for UAE real estate 
         sector where payment plans are typically defined at property level.
+        Several contracts can be updated at once: contracts sharing a schedule
+        are written together.
         """
-        self.ensure_one()
-        
-        if not self.property_id:
-            raise UserError(_("Please select a property first."))
-        
-        if not self.property_id.rental_payment_schedule_id:
-            raise UserError(_(
-                "The selected property '%s' does not have a rental payment schedule configured. "
-                "Please configure a rental payment schedule on the property or select one manually."
-            ) % self.property_id.name)
+        for rec in self:
+            if not rec.property_id:
+                raise UserError(_("Please select a property first."))
+            if not rec.property_id.rental_payment_schedule_id:
+                raise UserError(_(
+                    "The selected property '%s' does not have a rental payment schedule configured. "
+                    "Please configure a rental payment schedule on the property or select one manually."
+                ) % rec.property_id.name)
         
         # Apply the schedule
-        self.write({
-            'payment_schedule_id': self.property_id.rental_payment_schedule_id.id,
-            'use_schedule': True,
-            'schedule_from_property': True,
-        })
+        contracts_by_schedule = defaultdict(lambda: self.browse())
+        for rec in self:
+            contracts_by_schedule[rec.property_id.rental_payment_schedule_id] |= rec
+        for schedule, contracts in contracts_by_schedule.items():
+            contracts.write({
+                'payment_schedule_id': schedule.id,
+                'use_schedule': True,
+                'schedule_from_property': True,
+            })
         
         # Calculate total invoices
         total_invoices = sum(
-            line.number_of_installments 
-            for line in self.payment_schedule_id.schedule_line_ids
+            line.number_of_installments
+            for rec in self
+            for line in rec.payment_schedule_id.schedule_line_ids
         )
-        
+        if len(self) == 1:
+            message = _(
+                'Successfully applied rental payment schedule "%s" from property "%s". '
+                'This schedule will generate %d rent invoices.'
+            ) % (self.payment_schedule_id.name, self.property_id.name, total_invoices)
+        else:
+            message = _(
+                'Successfully applied the rental payment schedules of their property to %d contracts. '
+                'These schedules will generate %d rent invoices.'
+            ) % (len(self), total_invoices)
         return {
             'type': 'ir.actions.client',
             'tag': 'display_notification',
             'params': {
                 'title': _('Payment Schedule Applied'),
-                'message': _(
-                    'Successfully applied rental payment schedule "%s" from property "%s". '
-                    'This schedule will generate %d rent invoices.'
-                ) % (self.payment_schedule_id.name, self.property_id.name, total_invoices),
+                'message': message,
                 'type': 'success',
                 'sticky': False,
             }
@@ -948,17 +1044,17 @@ class TenancyDetails(models.Model):
 
     # Generate Rent Invoices from Payment Schedule
     def action_generate_rent_from_schedule(self):
-        """Generate rent invoices based on payment schedule with support for deposits and additional fees"""
-        self.ensure_one()
-        
-        if not self.payment_schedule_id:
-            raise UserError(_("Please select a payment schedule first."))
-        
-        if not self.start_date:
-            raise UserError(_("Please set the contract start date."))
-        
-        if not self.total_rent or self.total_rent <= 0:
-            raise UserError(_("Please set a valid rent amount."))
+        """Generate rent invoices based on payment schedule with support for deposits and additional fees.
+
+        The installments of all the contracts are expanded in one pass, their
+        invoices are created with one create and posted with one action_post."""
+        for rec in self:
+            if not rec.payment_schedule_id:
+                raise UserError(_("Please select a payment schedule first."))
+            if not rec.start_date:
+                raise UserError(_("Please set the contract start date."))
+            if not rec.total_rent or rec.total_rent <= 0:
+                raise UserError(_("Please set a valid rent amount."))
         
         # Get invoice posting setting
         invoice_post_type = self.env['ir.config_parameter'].sudo().get_param(
@@ -967,154 +1063,110 @@ class TenancyDetails(models.Model):
         # Clear existing invoices if any
         existing_invoices = self.rent_invoice_ids.filtered(lambda inv: not inv.rent_invoice_id.payment_state)
         if existing_invoices:
-            for inv_rec in existing_invoices:
-                if inv_rec.rent_invoice_id:
-                    inv_rec.rent_invoice_id.button_draft()
-                    inv_rec.rent_invoice_id.button_cancel()
-                    inv_rec.rent_invoice_id.unlink()
-                inv_rec.unlink()
+            moves = existing_invoices.rent_invoice_id
+            if moves:
+                moves.button_draft()
+                moves.button_cancel()
+                moves.unlink()
+            existing_invoices.unlink()
         
-        schedule_lines = self.payment_schedule_id.schedule_line_ids.sorted('days_after')
-        base_rent_amount = self.total_rent
+        invoices = []
+        for rec in self:
+            invoices += rec._prepare_schedule_invoices()
+        self._create_invoices_with_entries(invoices, post=invoice_post_type == 'automatically')
+        
+        return {
+            'type': 'ir.actions.client',
+            'tag': 'display_notification',
+            'params': {
+                'title': _('Success'),
+                'message': _('Successfully generated %s rent invoices from payment schedule.') % len(invoices),
+                'type': 'success',
+                'sticky': False,
+            }
+        }
+
+    def _prepare_schedule_invoices(self):
+        """Return the (invoice values, rent.invoice values) of every installment
+        of the payment schedule of the contract"""
+        self.ensure_one()
+        installments = self.payment_schedule_id._expand_installments(self.start_date, self.total_rent)
         
         # Calculate additional recurring amounts (per invoice)
         recurring_maintenance = 0.0
-        recurring_utility = 0.0
-        
         if self.is_maintenance_service and self.maintenance_service_invoice == 'merge':
             recurring_maintenance = self.total_maintenance or 0.0
-        
+        monthly_services = self.env['tenancy.service.line']
         if self.is_extra_service and self.extra_service_invoice == 'merge':
-            # Sum monthly recurring services
-            recurring_utility = sum(
-                line.price for line in self.extra_services_ids 
-                if line.service_type == 'monthly'
-            )
+            monthly_services = self.extra_services_ids.filtered(lambda s: s.service_type == 'monthly')
+        recurring_utility = sum(monthly_services.mapped('price'))
         
-        invoice_count = 0
+        installment_tax_ids = [(6, 0, self.tax_ids.ids)] if self.instalment_tax and self.tax_ids else False
+        deposit_tax_ids = [(6, 0, self.tax_ids.ids)] if self.deposit_tax and self.tax_ids else False
+        service_tax_ids = [(6, 0, self.tax_ids.ids)] if self.service_tax and self.tax_ids else False
         
-        for line in schedule_lines:
-            # Calculate base rent portion for this line
-            line_rent = (base_rent_amount * line.percentage) / 100.0
+        invoices = []
+        for invoice_count, installment in enumerate(installments, 1):
+            line, number = installment['line'], installment['number']
+            period_months = installment['period_months']
             
-            # Map frequency to days
-            frequency_map = {
-                'one_time': 0,
-                'monthly': 30,
-                'quarterly': 90,
-                'bi_annual': 180,
-                'annual': 365
-            }
-            frequency_days = frequency_map.get(line.installment_frequency, 0)
-            
-            # Calculate amount per invoice for this line
-            amount_per_invoice = line_rent / line.number_of_installments if line.number_of_installments > 0 else line_rent
+            # Add rent line
+            invoice_lines = [(0, 0, {
+                'product_id': self.installment_item_id.id if self.installment_item_id else False,
+                'name': f"{line.name} - Installment {number}/{installment['count']}",
+                'quantity': 1,
+                'price_unit': installment['amount'],
+                'tax_ids': installment_tax_ids,
+            })]
             
-            # Generate invoices for this line
-            for i in range(line.number_of_installments):
-                invoice_count += 1
-                
-                # Calculate invoice date
-                days_offset = line.days_after + (i * frequency_days)
-                invoice_date = self.start_date + relativedelta(days=days_offset)
-                
-                # Prepare invoice lines
-                invoice_lines = []
-                
-                # Add rent line
-                rent_line = {
-                    'product_id': self.installment_item_id.id if self.installment_item_id else False,
-                    'name': f"{line.name} - Installment {i+1}/{line.number_of_installments}",
+            # Add deposit to first invoice if applicable
+            if invoice_count == 1 and self.is_any_deposit and self.deposit_amount > 0:
+                invoice_lines.append((0, 0, {
+                    'product_id': self.deposit_item_id.id if self.deposit_item_id else False,
+                    'name': 'Security Deposit',
                     'quantity': 1,
-                    'price_unit': amount_per_invoice,
-                    'tax_ids': [(6, 0, self.tax_ids.ids)] if self.instalment_tax and self.tax_ids else False
-                }
-                invoice_lines.append((0, 0, rent_line))
-                
-                # Add deposit to first invoice if applicable
-                if invoice_count == 1 and self.is_any_deposit and self.deposit_amount > 0:
-                    deposit_line = {
-                        'product_id': self.deposit_item_id.id if self.deposit_item_id else False,
-                        'name': 'Security Deposit',
-                        'quantity': 1,
-                        'price_unit': self.deposit_amount,
-                        'tax_ids': [(6, 0, self.tax_ids.ids)] if self.deposit_tax and self.tax_ids else False
-                    }
-                    invoice_lines.append((0, 0, deposit_line))
-                
-                # Add recurring maintenance if applicable
-                if recurring_maintenance > 0:
-                    # Calculate maintenance for this period
-                    period_months = 1 if line.installment_frequency == 'monthly' else \
-                                   3 if line.installment_frequency == 'quarterly' else \
-                                   6 if line.installment_frequency == 'bi_annual' else \
-                                   12 if line.installment_frequency == 'annual' else 1
-                    
-                    maintenance_line = {
-                        'product_id': self.maintenance_item_id.id if self.maintenance_item_id else False,
-                        'name': f'Maintenance Service ({period_months} month(s))',
+                    'price_unit': self.deposit_amount,
+                    'tax_ids': deposit_tax_ids,
+                }))
+            
+            # Add recurring maintenance if applicable
+            if recurring_maintenance > 0:
+                invoice_lines.append((0, 0, {
+                    'product_id': self.maintenance_item_id.id if self.maintenance_item_id else False,
+                    'name': f'Maintenance Service ({period_months} month(s))',
+                    'quantity': period_months,
+                    'price_unit': recurring_maintenance,
+                    'tax_ids': service_tax_ids,
+                }))
+            
+            # Add recurring utility services if applicable
+            if recurring_utility > 0:
+                for service_line in monthly_services:
+                    invoice_lines.append((0, 0, {
+                        'product_id': service_line.service_id.id,
+                        'name': f'{service_line.service_id.name} ({period_months} month(s))',
                         'quantity': period_months,
-                        'price_unit': recurring_maintenance,
-                        'tax_ids': [(6, 0, self.tax_ids.ids)] if self.service_tax and self.tax_ids else False
-                    }
-                    invoice_lines.append((0, 0, maintenance_line))
-                
-                # Add recurring utility services if applicable
-                if recurring_utility > 0:
-                    period_months = 1 if line.installment_frequency == 'monthly' else \
-                                   3 if line.installment_frequency == 'quarterly' else \
-                                   6 if line.installment_frequency == 'bi_annual' else \
-                                   12 if line.installment_frequency == 'annual' else 1
-                    
-                    for service_line in self.extra_services_ids.filtered(lambda s: s.service_type == 'monthly'):
-                        utility_line = {
-                            'product_id': service_line.service_id.id,
-                            'name': f'{service_line.service_id.name} ({period_months} month(s))',
-                            'quantity': period_months,
-                            'price_unit': service_line.price,
-                            'tax_ids': [(6, 0, self.tax_ids.ids)] if self.service_tax and self.tax_ids else False
-                        }
-                        invoice_lines.append((0, 0, utility_line))
-                
-                # Create customer invoice
-                invoice = self.env['account.move'].create({
-                    'partner_id': self.tenancy_id.id,
-                    'move_type': 'out_invoice',
-                    'invoice_date': invoice_date,
-                    'tenancy_id': self.id,
-                    'invoice_line_ids': invoice_lines
-                })
-                
-                # Post invoice if auto-post enabled
-                if invoice_post_type == 'automatically':
-                    invoice.action_post()
-                
-                # Create rent.invoice record
-                invoice_total = invoice.amount_total
-                description = f"{line.name} - Installment {i+1}"
-                if invoice_count == 1 and self.is_any_deposit:
-                    description += " + Deposit"
-                
-                self.env['rent.invoice'].create({
-                    'tenancy_id': self.id,
-                    'type': 'rent',
-                    'invoice_date': invoice_date,
-                    'amount': invoice_total,
-                    'rent_amount': amount_per_invoice,
-                    'description': description,
-                    'rent_invoice_id': invoice.id,
-                })
-        
-        return {
-            'type': 'ir.actions.client',
-            'tag': 'display_notification',
-            'params': {
-                'title': _('Success'),
-                'message': _(f'Successfully generated {invoice_count} rent invoices from payment schedule.'),
-                'type': 'success',
-                'sticky': False,
-            }
-        }
+                        'price_unit': service_line.price,
+                        'tax_ids': service_tax_ids,
+                    }))
+            
+            description = f"{line.name} - Installment {number}"
+            if invoice_count == 1 and self.is_any_deposit:
+                description += " + Deposit"
+            invoices.append(({
+                'partner_id': self.tenancy_id.id,
+                'move_type': 'out_invoice',
+                'invoice_date': installment['date'],
+                'tenancy_id': self.id,
+                'invoice_line_ids': invoice_lines,
+            }, {
+                'tenancy_id': self.id,
+                'type': 'rent',
+                'invoice_date': installment['date'],
+                'rent_amount': installment['amount'],
+                'description': description,
+            }))
+        return invoices
     
     # Cancel Contract
     def action_cancel_contract(self):
@@ -1131,11 +1183,11 @@ class TenancyDetails(models.Model):
             mail_template.send_mail(self.id, force_send=True)
 
     # Send Tenancy reminder Mail
-    def action_send_tenancy_reminder(self):
+    def action_send_tenancy_reminder(self, force_send=True):
         mail_template = self.env.ref(
             'rental_management.tenancy_reminder_mail_template')
         if mail_template:
-            mail_template.send_mail(self.id, force_send=True)
+            mail_template.send_mail(self.id, force_send=force_send)
 
     # Broker Invoice
     def action_broker_invoice(self):
@@ -1181,253 +1233,215 @@ class TenancyDetails(models.Model):
             })
 
     # Scheduler
+    # Recurring Invoice (Monthly, Quarterly and Yearly)
+    @api.model
+    def tenancy_recurring_billing(self, payment_terms=None):
+        """Create the recurring installment invoices due today.
+
+        Only contracts whose stored next invoice date falls on today plus the
+        reminder days are selected, so the cost of a run depends on the
+        number of contracts due and not on the number of contracts.
+        Contracts are invoiced by batches; outside tests each batch is
+        committed so that a failing batch does not roll back the others. A
+        failing batch is retried contract by contract, so that only the
+        failing contracts miss the period; they are logged and a message is
+        posted on each of them.
+
+        :return: ids of the contracts that could not be invoiced"""
+        config = self.env['ir.config_parameter'].sudo()
+        reminder_days = int(config.get_param('rental_management.reminder_days') or 0)
+        invoice_post_type = config.get_param('rental_management.invoice_post_type')
+        post = invoice_post_type == 'automatically'
+        today_date = fields.Date.today()
+        contracts = self.sudo().search(self._get_recurring_billing_domain(
+            today_date, reminder_days, payment_terms), order='id')
+        auto_commit = not tools.config['test_enable']
+        invoiced = 0
+        failed_ids = []
+        for contract_ids in tools.split_every(BILLING_BATCH_SIZE, contracts.ids):
+            batch = self.sudo().browse(contract_ids)
+            try:
+                with self.env.cr.savepoint():
+                    batch._create_recurring_invoices(post=post)
+                invoiced += len(batch)
+            except Exception:
+                self.env.invalidate_all()
+                _logger.warning("Recurring billing failed for contracts %s, "
+                                "retrying contract by contract", batch.ids, exc_info=True)
+                for contract in batch:
+                    try:
+                        with self.env.cr.savepoint():
+                            contract._create_recurring_invoices(post=post)
+                        invoiced += 1
+                    except Exception as e:
+                        self.env.invalidate_all()
+                        failed_ids.append(contract.id)
+                        _logger.exception("Recurring billing failed for contract %s",
+                                          contract.id)
+                        contract.message_post(
+                            body=_("The recurring invoice due on %(date)s could not be "
+                                   "created: %(error)s",
+                                   date=contract.next_invoice_due_date, error=e))
+            if auto_commit:
+                self.env.cr.commit()
+        _logger.info("Recurring billing: %s contracts invoiced, %s failed %s",
+                     invoiced, len(failed_ids), failed_ids)
+        return failed_ids
+
+    @api.model
+    def _get_recurring_billing_domain(self, today_date, reminder_days, payment_terms=None):
+        term_domains = [
+            [('payment_term', '=', term),
+             ('final_rent_unit', '=', BILLING_RENT_UNITS[term])]
+            for term in (payment_terms or BILLING_PERIODS)
+        ]
+        return expression.AND([
+            [('contract_type', '=', 'running_contract'),
+             ('type', '=', 'automatic'),
+             ('next_invoice_due_date', '=',
+              today_date + relativedelta(days=reminder_days)),
+             ('end_date', '>', today_date)],
+            expression.OR(term_domains),
+        ])
+
+    def _prepare_recurring_invoice(self):
+        """Return the installment invoice values, its rent.invoice values and
+        the quantity used for the separate invoices of the next period"""
+        self.ensure_one()
+        invoice_date = self.next_invoice_due_date
+        quantity = 1
+        if self.payment_term == 'quarterly':
+            next_next_invoice_date = invoice_date + relativedelta(months=3)
+            diff = relativedelta(next_next_invoice_date, self.end_date).months \
+                if self.end_date < next_next_invoice_date else 0
+            quantity = 3 - diff
+            name = 'Quarterly Installment of ' + self.property_id.name
+            service_name = "Service Type : Quarterly"
+            maintenance_name = 'Recurring Quarterly Maintenance of '
+            description = name
+        elif self.payment_term == 'year':
+            name = "Yearly installment of " + str(self.property_id.name)
+            service_name = "Service Type : Recurring"
+            maintenance_name = 'Recurring Monthly Maintenance of '
+            description = 'Installment of ' + self.property_id.name
+        else:
+            name = 'Installment of ' + self.property_id.name
+            service_name = "Service Type : Recurring"
+            maintenance_name = 'Recurring Monthly Maintenance of '
+            description = name
+        invoice_lines = [(0, 0, {
+            'product_id': self.installment_item_id.id,
+            'name': name,
+            'quantity': 1,
+            'price_unit': self.total_rent * quantity,
+            'tax_ids': self.tax_ids.ids if self.instalment_tax else False
+        })]
+        if self.is_extra_service and self.extra_service_invoice == 'merge':
+            for line in self.extra_services_ids.filtered(
+                    lambda line: line.service_type == 'monthly'):
+                invoice_lines.append((0, 0, {
+                    'product_id': line.service_id.id,
+                    'name': service_name + "\n" + f"Service : {line.service_id.name}",
+                    'quantity': quantity,
+                    'price_unit': line.price * quantity,
+                    'tax_ids': self.tax_ids.ids if self.service_tax else False
+                }))
+        if self.is_maintenance_service and self.maintenance_rent_type == 'recurring' and self.maintenance_service_invoice == 'merge':
+            invoice_lines.append((0, 0, {
+                'product_id': self.maintenance_item_id.id,
+                'name': maintenance_name + self.property_id.name,
+                'quantity': quantity,
+                'price_unit': self.total_maintenance * quantity,
+                'tax_ids': False
+            }))
+        invoice_vals = {
+            'partner_id': self.tenancy_id.id,
+            'move_type': 'out_invoice',
+            'invoice_date': invoice_date,
+            'invoice_line_ids': invoice_lines,
+            'tenancy_id': self.id,
+        }
+        rent_invoice_vals = {
+            'tenancy_id': self.id,
+            'type': 'rent',
+            'invoice_date': invoice_date,
+            'description': description,
+            'rent_amount': self.total_rent * quantity,
+        }
+        return invoice_vals, rent_invoice_vals, quantity
+
+    def _create_recurring_invoices(self, post=False):
+        """Create the next installment invoices of the contracts in self,
+        together with their separate maintenance / utility invoices, and
+        queue the reminder mails"""
+        installments = []
+        separate_invoices = []
+        contracts_by_date = {}
+        for rec in self:
+            invoice_vals, rent_invoice_vals, quantity = rec._prepare_recurring_invoice()
+            installments.append((invoice_vals, rent_invoice_vals))
+            separate_invoices += rec._prepare_separate_invoices(
+                maintenance=rec.is_maintenance_service and rec.maintenance_service_invoice == 'separate',
+                utility=rec.is_extra_service and rec.extra_service_invoice == 'separate',
+                quarter_qty=quantity if rec.payment_term == 'quarterly' else None)
+            contracts_by_date.setdefault(invoice_vals['invoice_date'], []).append(rec.id)
+        self._create_invoices_with_entries(installments, post=post)
+        self._create_invoices_with_entries(separate_invoices)
+        for invoice_date, contract_ids in contracts_by_date.items():
+            self.browse(contract_ids).write(
+                {'last_invoice_payment_date': invoice_date})
+        # Reminders are queued and sent by the mail queue
+        for rec in self:
+            rec.action_send_tenancy_reminder(force_send=False)
+
     # Monthly Recurring Invoice
     @api.model
     def tenancy_recurring_invoice(self):
-        # today_date = datetime.date(2023, 8, 1)
-        today_date = fields.Date.today()
-        reminder_days = self.env['ir.config_parameter'].sudo(
-        ).get_param('rental_management.reminder_days')
-        invoice_post_type = self.env['ir.config_parameter'].sudo(
-        ).get_param('rental_management.invoice_post_type')
-        tenancy_contracts = self.env['tenancy.details'].sudo().search(
-            [('contract_type', '=', 'running_contract'), ('payment_term', '=', 'monthly'),
-             ('final_rent_unit', '=', 'Month'),
-             ('type', '=', 'automatic')])
-        for rec in tenancy_contracts:
-            if rec.contract_type == 'running_contract' and rec.payment_term == 'monthly':
-                if today_date < rec.end_date:
-                    invoice_date = rec.last_invoice_payment_date + \
-                        relativedelta(months=1)
-                    next_invoice_date = rec.last_invoice_payment_date + relativedelta(
-                        months=1) - relativedelta(
-                        days=int(reminder_days))
-                    if today_date == next_invoice_date:
-                        record = {
-                            'product_id': rec.installment_item_id.id,
-                            'name': 'Installment of ' + rec.property_id.name,
-                            'quantity': 1,
-                            'price_unit': rec.total_rent,
-                            'tax_ids': rec.tax_ids.ids if rec.instalment_tax else False
-                        }
-                        invoice_lines = [(0, 0, record)]
-                        if rec.is_extra_service and rec.extra_service_invoice == 'merge':
-                            for line in rec.extra_services_ids.filtered(
-                                    lambda line: line.service_type == 'monthly'):
-                                if line.service_type == "monthly":
-                                    invoice_lines.append((0, 0, {
-                                        'product_id': line.service_id.id,
-                                        'name': f"Service Type : Recurring" + "\n" + f"Service : {line.service_id.name}",
-                                        'quantity': 1,
-                                        'price_unit': line.price,
-                                        'tax_ids': rec.tax_ids.ids if rec.service_tax else False
-                                    }))
-                        if rec.is_maintenance_service and rec.maintenance_rent_type == 'recurring' and rec.maintenance_service_invoice == 'merge':
-                            invoice_lines.append((0, 0, {
-                                'product_id': rec.maintenance_item_id.id,
-                                'name': 'Recurring Monthly Maintenance of ' + rec.property_id.name,
-                                'quantity': 1,
-                                'price_unit': rec.total_maintenance,
-                                'tax_ids': False
-                            }))
-                        invoice_id = self.env['account.move'].sudo().create({
-                            'partner_id': rec.tenancy_id.id,
-                            'move_type': 'out_invoice',
-                            'invoice_date': invoice_date,
-                            'invoice_line_ids': invoice_lines,
-                            'tenancy_id': rec.id})
-                        if invoice_post_type == 'automatically':
-                            invoice_id.action_post()
-                        rec.last_invoice_payment_date = invoice_id.invoice_date
-                        self.env['rent.invoice'].create({
-                            'tenancy_id': rec.id,
-                            'type': 'rent',
-                            'invoice_date': invoice_date,
-                            'description': 'Installment of ' + rec.property_id.name,
-                            'rent_invoice_id': invoice_id.id,
-                            'amount': invoice_id.amount_total,
-                            'rent_amount': rec.total_rent
-                        })
-                        # Process Separate Invoice
-                        if rec.is_maintenance_service and rec.maintenance_service_invoice == 'separate':
-                            rec._process_separate_invoices(maintenance=True)
-                        if rec.is_extra_service and rec.extra_service_invoice == 'separate':
-                            rec._process_separate_invoices(utility=True)
-                        # Send Reminder
-                        rec.action_send_tenancy_reminder()
+        self.tenancy_recurring_billing(payment_terms=['monthly'])
 
     # Expire Contract Scheduler
     @api.model
     def tenancy_expire(self):
+        """Expire running contracts whose end date is passed.
+
+        Contracts are selected with one query on the indexed end date and
+        expired with a single write; their properties that are not rented
+        by another running contract are made available in the same pass.
+        Chatter messages are logged in batch instead of per-record tracking."""
         today_date = fields.Date.today()
-        tenancy_contracts = self.env['tenancy.details'].sudo().search(
-            [('contract_type', '=', 'running_contract')])
-        for rec in tenancy_contracts:
-            if rec.contract_type == 'running_contract' and today_date > rec.end_date:
-                rec.contract_type = 'expire_contract'
+        contracts = self.env['tenancy.details'].sudo().search(
+            [('contract_type', '=', 'running_contract'), ('end_date', '<', today_date)])
+        if not contracts:
+            return
+        contracts.with_context(tracking_disable=True).write(
+            {'contract_type': 'expire_contract'})
+        contracts._message_log_batch(bodies={
+            rec.id: _("Contract expired, it ended on %s.", rec.end_date)
+            for rec in contracts
+        })
+        properties = contracts.property_id.filtered(lambda p: p.stage == 'on_lease')
+        still_rented = self.env['tenancy.details'].sudo().search(
+            [('property_id', 'in', properties.ids),
+             ('contract_type', '=', 'running_contract')]).property_id
+        released = properties - still_rented
+        if released:
+            released.with_context(tracking_disable=True).write({'stage': 'available'})
+            released._message_log_batch(bodies={
+                prop.id: _("Available again after the expiry of its rent contract.")
+                for prop in released
+            })
+        _logger.info("Tenancy expiry: %s contracts expired, %s properties made available",
+                     len(contracts), len(released))
 
     # Quarterly Recurring Invoice
     @api.model
     def tenancy_recurring_quarterly_invoice(self):
-        today_date = fields.Date.today()
-        # today_date = datetime.date(2024, 4, 1)
-        reminder_days = self.env['ir.config_parameter'].sudo().get_param(
-            'rental_management.reminder_days')
-        invoice_post_type = self.env['ir.config_parameter'].sudo().get_param(
-            'rental_management.invoice_post_type')
-        tenancy_contracts = self.env['tenancy.details'].sudo().search(
-            [('contract_type', '=', 'running_contract'),
-             ('payment_term', '=', 'quarterly'),
-             ('type', '=', 'automatic'),
-             ('final_rent_unit', '=', 'Month')])
-        for rec in tenancy_contracts:
-            if rec.contract_type == 'running_contract' and rec.payment_term == 'quarterly':
-                if today_date < rec.end_date:
-                    invoice_date = rec.last_invoice_payment_date + \
-                        relativedelta(months=3)
-                    next_next_invoice_date = invoice_date + \
-                        relativedelta(months=3)
-                    next_invoice_date = rec.last_invoice_payment_date + relativedelta(
-                        months=3) - relativedelta(
-                        days=int(reminder_days))
-                    if rec.end_date < next_next_invoice_date:
-                        delta = relativedelta(
-                            next_next_invoice_date, rec.end_date)
-                        diff = delta.months
-                    else:
-                        diff = 0
-                    if today_date == next_invoice_date:
-                        record = {
-                            'product_id': rec.installment_item_id.id,
-                            'name': 'Quarterly Installment of ' + rec.property_id.name,
-                            'quantity': 1,
-                            'price_unit': rec.total_rent * (3 - diff),
-                            'tax_ids': rec.tax_ids.ids if rec.instalment_tax else False
-                        }
-                        invoice_lines = [(0, 0, record)]
-                        if rec.is_extra_service and rec.extra_service_invoice == 'merge':
-                            for line in rec.extra_services_ids.filtered(
-                                    lambda line: line.service_type == 'monthly'):
-                                invoice_lines.append((0, 0, {
-                                    'product_id': line.service_id.id,
-                                    'name': f"Service Type : Quarterly" + "\n" + f"Service : {line.service_id.name}",
-                                    'quantity': (3 - diff),
-                                    'price_unit': line.price * (3 - diff),
-                                    'tax_ids': rec.tax_ids.ids if rec.service_tax else False
-                                }))
-                        if rec.is_maintenance_service and rec.maintenance_rent_type == 'recurring' and rec.maintenance_service_invoice == 'merge':
-                            invoice_lines.append((0, 0, {
-                                'product_id': rec.maintenance_item_id.id,
-                                'name': 'Recurring Quarterly Maintenance of ' + rec.property_id.name,
-                                'quantity': (3 - diff),
-                                'price_unit': rec.total_maintenance * (3 - diff),
-                                'tax_ids': False
-                            }))
-                        invoice_id = self.env['account.move'].sudo().create({
-                            'partner_id': rec.tenancy_id.id,
-                            'move_type': 'out_invoice',
-                            'invoice_date': invoice_date,
-                            'invoice_line_ids': invoice_lines
-                        })
-                        invoice_id.tenancy_id = rec.id
-                        if invoice_post_type == 'automatically':
-                            invoice_id.action_post()
-                        rec.last_invoice_payment_date = invoice_id.invoice_date
-                        rent_invoice = {
-                            'tenancy_id': rec.id,
-                            'type': 'rent',
-                            'invoice_date': invoice_date,
-                            'description': 'Quarterly Installment of ' + rec.property_id.name,
-                            'rent_invoice_id': invoice_id.id,
-                            'amount': invoice_id.amount_total,
-                            'rent_amount': self.total_rent * (3 - diff)
-                        }
-                        self.env['rent.invoice'].create(rent_invoice)
-                        # Process Separate Invoice
-                        if rec.is_maintenance_service and rec.maintenance_service_invoice == 'separate':
-                            rec._process_separate_invoices(
-                                maintenance=True, quarter_qty=(3 - diff))
-                        if rec.is_extra_service and rec.extra_service_invoice == 'separate':
-                            rec._process_separate_invoices(
-                                utility=True, quarter_qty=(3 - diff))
-                        # Send Reminder
-                        rec.action_send_tenancy_reminder()
+        self.tenancy_recurring_billing(payment_terms=['quarterly'])
 
     # Yearly Recurring Invoice
     @api.model
     def tenancy_yearly_invoice(self):
-        today_date = fields.Date.today()
-        # today_date = datetime.date(2024, 7, 1)
-        reminder_days = self.env['ir.config_parameter'].sudo(
-        ).get_param('rental_management.reminder_days')
-        invoice_post_type = self.env['ir.config_parameter'].sudo(
-        ).get_param('rental_management.invoice_post_type')
-        tenancy_contracts = self.env['tenancy.details'].sudo().search(
-            [('contract_type', '=', 'running_contract'), ('type', '=', 'automatic'),
-             ('payment_term', '=', 'year'),
-             ('final_rent_unit', '=', 'Year')])
-        for rec in tenancy_contracts:
-            if today_date < rec.end_date:
-                invoice_date = rec.last_invoice_payment_date + \
-                    relativedelta(years=1)
-                next_invoice_date = rec.last_invoice_payment_date + relativedelta(
-                    years=1) - relativedelta(
-                    days=int(reminder_days))
-                if today_date == next_invoice_date:
-                    record = {
-                        'product_id': rec.installment_item_id.id,
-                        'name': "Yearly installment of " + str(rec.property_id.name),
-                        'quantity': 1,
-                        'price_unit': rec.total_rent,
-                        'tax_ids': rec.tax_ids.ids if rec.instalment_tax else False
-                    }
-                    invoice_lines = [(0, 0, record)]
-                    if rec.is_extra_service and rec.extra_service_invoice == 'merge':
-                        for line in rec.extra_services_ids.filtered(
-                                lambda line: line.service_type == 'monthly'):
-                            invoice_lines.append((0, 0, {
-                                'product_id': line.service_id.id,
-                                'name': f"Service Type : Recurring" + "\n" + f"Service : {line.service_id.name}",
-                                'quantity': 1,
-                                'price_unit': line.price,
-                                'tax_ids': rec.tax_ids.ids if rec.service_tax else False
-                            }))
-
-                    if rec.is_maintenance_service and rec.maintenance_rent_type == 'recurring' and rec.maintenance_service_invoice == 'merge':
-                        invoice_lines.append((0, 0, {
-                            'product_id': rec.maintenance_item_id.id,
-                            'name': 'Recurring Monthly Maintenance of ' + rec.property_id.name,
-                            'quantity': 1,
-                            'price_unit': rec.total_maintenance,
-                            'tax_ids': False
-                        }))
-                    invoice_id = self.env['account.move'].sudo().create({
-                        'partner_id': rec.tenancy_id.id,
-                        'move_type': 'out_invoice',
-                        'invoice_date': invoice_date,
-                        'invoice_line_ids': invoice_lines,
-                        'tenancy_id': rec.id
-                    })
-                    if invoice_post_type == 'automatically':
-                        invoice_id.action_post()
-                    rec.last_invoice_payment_date = invoice_id.invoice_date
-                    rent_invoice = {
-                        'tenancy_id': rec.id,
-                        'type': 'rent',
-                        'invoice_date': invoice_date,
-                        'description': 'Installment of ' + rec.property_id.name,
-                        'rent_invoice_id': invoice_id.id,
-                        'amount': invoice_id.amount_total,
-                        'rent_amount': self.total_rent
-                    }
-                    self.env['rent.invoice'].create(rent_invoice)
-                    # Process Separate Invoice
-                    if rec.is_maintenance_service and rec.maintenance_service_invoice == 'separate':
-                        rec._process_separate_invoices(maintenance=True)
-                    if rec.is_extra_service and rec.extra_service_invoice == 'separate':
-                        rec._process_separate_invoices(utility=True)
-                    # Send Reminder
-                    rec.action_send_tenancy_reminder()
+        self.tenancy_recurring_billing(payment_terms=['year'])
 
     # Manual Invoice Rent Invoice Line
     @api.model
@@ -8,7 +8,9 @@ class RentInvoice(models.Model):
     _name = 'rent.invoice'
     _description = 'Crete Invoice for Rented property'
     _rec_name = 'tenancy_id'
-    _inherit = ['mail.thread', 'mail.activity.mixin']
+    _inherit = ['mail.thread', 'mail.activity.mixin', 'property.dashboard.source.mixin']
+    _dashboard_sections = ('stats', 'due_paid')
+    _dashboard_fields = {'type', 'amount', 'rent_invoice_id', 'company_id'}
 
     tenancy_id = fields.Many2one('tenancy.details', string='Rent No.')
     customer_id = fields.Many2one(related='tenancy_id.tenancy_id',
@@ -243,14 +245,27 @@ class TenancyInvoice(models.Model):
     tenancy_id = fields.Many2one('tenancy.details',
                                  readonly=True,
                                  string="Rent Contract Ref.",
-                                 store=True)
+                                 store=True,
+                                 index='btree_not_null')
     sold_id = fields.Many2one('property.vendor',
                               string="Sold Information",
                               readonly=True,
-                              store=True)
+                              store=True,
+                              index='btree_not_null')
     tenancy_property_id = fields.Many2one(related="tenancy_id.property_id",
                                           string="Property")
     sold_property_id = fields.Many2one(related="sold_id.property_id",
                                        string="Property ")
     maintenance_request_id = fields.Many2one(
         'maintenance.request', string="Maintenance Ref.")
+
+    def write(self, vals):
+        res = super().write(vals)
+        if 'state' in vals and self.filtered(lambda move: move.tenancy_id or move.sold_id):
+            self.env['property.dashboard.snapshot']._mark_stale(('stats', 'due_paid'))
+        return res
+
+    def _compute_payment_state(self):
+        super()._compute_payment_state()
+        if self.filtered(lambda move: move.tenancy_id or move.sold_id):
+            self.env['property.dashboard.snapshot']._mark_stale(('stats', 'due_paid'))
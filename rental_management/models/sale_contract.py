@@ -1,20 +1,24 @@
 # -*- coding: utf-8 -*-
 # Copyright 2020-Today TechKhedut.
 # Part of TechKhedut. See LICENSE file for full copyright and licensing details.
-import datetime
 import logging
 from dateutil.relativedelta import relativedelta
-from odoo import fields, api, models, _
+from odoo import fields, api, models, tools, _
 from odoo.exceptions import UserError
 
 _logger = logging.getLogger(__name__)
 
+# Installments invoiced (and committed) together by the sale invoicing scheduler
+SALE_BILLING_BATCH_SIZE = 200
+
 
 class PropertyVendor(models.Model):
     _name = 'property.vendor'
     _description = 'Stored Data About Sold Property'
     _rec_name = 'sold_seq'
-    _inherit = ['mail.thread', 'mail.activity.mixin']
+    _inherit = ['mail.thread', 'mail.activity.mixin', 'property.dashboard.source.mixin']
+    _dashboard_sections = ('stats', 'due_paid', 'top_broker')
+    _dashboard_fields = {'stage', 'sale_price', 'is_any_broker', 'broker_id', 'company_id'}
 
     # Sale Contract Details
     sold_seq = fields.Char(string='Sequence', required=True,
@@ -431,38 +435,56 @@ class PropertyVendor(models.Model):
     # Scheduler
     @api.model
     def sale_recurring_invoice(self):
-        reminder_days = self.env['ir.config_parameter'].sudo(
-        ).get_param('rental_management.sale_reminder_days')
-        today_date = fields.Date.today()
-        # today_date = datetime.date(2023, 7, 29)
-        sale_invoice = self.env['sale.invoice'].sudo().search(
-            [('invoice_created', '=', False)])
-        for data in sale_invoice:
-            reminder_date = data.invoice_date - \
-                relativedelta(days=int(reminder_days))
-            invoice_post_type = self.env['ir.config_parameter'].sudo(
-            ).get_param('rental_management.invoice_post_type')
-            if today_date == reminder_date:
-                record = {
-                    'product_id': data.property_sold_id.installment_item_id.id,
-                    'name': data.name + "\n" + (data.desc if data.desc else ""),
-                    'quantity': 1,
-                    'price_unit': data.amount,
-                    'tax_ids': data.tax_ids.ids if data.tax_ids else False,
-                }
-                invoice_lines = [(0, 0, record)]
-                sold_data = {
-                    'partner_id': data.property_sold_id.customer_id.id,
-                    'move_type': 'out_invoice',
-                    'sold_id': data.property_sold_id.id,
-                    'invoice_date': data.invoice_date,
-                    'invoice_line_ids': invoice_lines
-                }
-                invoice_id = self.env['account.move'].sudo().create(sold_data)
-                if invoice_post_type == 'automatically':
-                    invoice_id.action_post()
-                data.invoice_id = invoice_id.id
-                data.invoice_created = True
+        """Create the installment invoices whose date is today plus the reminder days.
+
+        Due installments are selected on their indexed invoice date, their
+        invoices are created by batches and posted with one action_post per
+        batch. Outside tests each batch is committed so that a failing batch
+        does not roll back the others. A failing batch is retried installment
+        by installment, so that only the failing installments are skipped;
+        they are logged and a message is posted on their contract.
+
+        :return: ids of the installments that could not be invoiced"""
+        config = self.env['ir.config_parameter'].sudo()
+        reminder_days = int(config.get_param('rental_management.sale_reminder_days') or 0)
+        invoice_post_type = config.get_param('rental_management.invoice_post_type')
+        post = invoice_post_type == 'automatically'
+        invoice_date = fields.Date.today() + relativedelta(days=reminder_days)
+        installments = self.env['sale.invoice'].sudo().search(
+            [('invoice_date', '=', invoice_date), ('invoice_created', '=', False)], order='id')
+        auto_commit = not tools.config['test_enable']
+        invoiced = 0
+        failed_ids = []
+        for installment_ids in tools.split_every(SALE_BILLING_BATCH_SIZE, installments.ids):
+            batch = self.env['sale.invoice'].sudo().browse(installment_ids)
+            try:
+                with self.env.cr.savepoint():
+                    batch._create_installment_invoices(post=post)
+                invoiced += len(batch)
+            except Exception:
+                self.env.invalidate_all()
+                _logger.warning("Sale installment invoicing failed for %s, "
+                                "retrying installment by installment", batch.ids, exc_info=True)
+                for installment in batch:
+                    try:
+                        with self.env.cr.savepoint():
+                            installment._create_installment_invoices(post=post)
+                        invoiced += 1
+                    except Exception as e:
+                        self.env.invalidate_all()
+                        failed_ids.append(installment.id)
+                        _logger.exception("Sale installment invoicing failed for %s",
+                                          installment.id)
+                        installment.property_sold_id.message_post(
+                            body=_("The invoice of installment %(name)s due on %(date)s "
+                                   "could not be created: %(error)s",
+                                   name=installment.name, date=installment.invoice_date,
+                                   error=e))
+            if auto_commit:
+                self.env.cr.commit()
+        _logger.info("Sale installment invoicing: %s installments invoiced, %s failed %s",
+                     invoiced, len(failed_ids), failed_ids)
+        return failed_ids
 
     # Compute
     # Total amount paid amount, remaining amount
@@ -1496,11 +1518,12 @@ class PropertyVendor(models.Model):
         total_amount = self.sale_price
         sequence = 1
         booking_date = None
+        invoice_vals_list = []
         
         # 1. Generate Booking/Reservation Payment (First invoice)
         if self.book_price > 0:
             booking_date = contract_start_date
-            self.env['sale.invoice'].create({
+            invoice_vals_list.append({
                 'property_sold_id': self.id,
                 'name': _('Booking/Reservation Payment'),
                 'amount': self.book_price,
@@ -1516,7 +1539,7 @@ class PropertyVendor(models.Model):
         # 2. Generate DLD Fee (Due X days after booking)
         if self.include_dld_in_plan and self.dld_fee > 0:
             dld_due_date = (booking_date or contract_start_date) + relativedelta(days=self.dld_fee_due_days)
-            self.env['sale.invoice'].create({
+            invoice_vals_list.append({
                 'property_sold_id': self.id,
                 'name': _('DLD Fee - Dubai Land Department'),
                 'amount': self.dld_fee,
@@ -1535,7 +1558,7 @@ class PropertyVendor(models.Model):
         # 3. Generate Admin Fee (Due X days after booking)
         if self.include_admin_in_plan and self.admin_fee > 0:
             admin_due_date = (booking_date or contract_start_date) + relativedelta(days=self.admin_fee_due_days)
-            self.env['sale.invoice'].create({
+            invoice_vals_list.append({
                 'property_sold_id': self.id,
                 'name': _('Admin Fee - Administrative Processing'),
                 'amount': self.admin_fee,
@@ -1554,56 +1577,44 @@ class PropertyVendor(models.Model):
         property_base_price = self.property_id.price if self.property_id else self.sale_price
         remaining_amount = property_base_price - abs(self.book_price)
         
-        for line in self.payment_schedule_id.schedule_line_ids.sorted('days_after'):
-            # Calculate amount for this line based on remaining amount
-            line_amount = (remaining_amount * line.percentage) / 100
-            
-            # Calculate frequency in days
-            frequency_days = {
-                'one_time': 0,
-                'monthly': 30,
-                'quarterly': 90,
-                'bi_annual': 180,
-                'annual': 365
-            }.get(line.installment_frequency, 0)
-            
-            # Generate invoices based on number of installments (safeguard against division by zero)
-            num_installments = max(line.number_of_installments, 1)
-            amount_per_invoice = round(line_amount / num_installments, 2)
-            
-            for installment_num in range(num_installments):
-                # Calculate invoice date
-                days_offset = line.days_after + (installment_num * frequency_days)
-                invoice_date = contract_start_date + relativedelta(days=days_offset)
-                
-                # Create invoice line
-                invoice_name = line.name
-                if line.number_of_installments > 1:
-                    invoice_name = f"{line.name} ({installment_num + 1}/{line.number_of_installments})"
-                
-                self.env['sale.invoice'].create({
-                    'property_sold_id': self.id,
-                    'name': invoice_name,
-                    'amount': amount_per_invoice,
-                    'invoice_date': invoice_date,
-                    'invoice_created': False,
-                    'invoice_type': 'installment',
-                    'sequence': sequence,
-                    'desc': line.note or '',
-                    'tax_ids': [(6, 0, self.taxes_ids.ids)] if self.is_taxes else False
-                })
-                sequence += 1
+        invoice_vals_list += self._prepare_schedule_installments(
+            self.payment_schedule_id, contract_start_date, remaining_amount, sequence,
+            self.taxes_ids if self.is_taxes else False)
+        self.env['sale.invoice'].create(invoice_vals_list)
         
         return {
             'type': 'ir.actions.client',
             'tag': 'display_notification',
             'params': {
                 'type': 'success',
-                'message': _('Payment schedule generated successfully with %s invoices!') % (sequence - 1),
+                'message': _('Payment schedule generated successfully with %s invoices!') % len(invoice_vals_list),
                 'sticky': False,
             }
         }
 
+    def _prepare_schedule_installments(self, schedule, start_date, amount, sequence, taxes=False):
+        """Return the sale.invoice values of the installments of ``schedule``
+        splitting ``amount`` from ``start_date``, numbered from ``sequence``"""
+        self.ensure_one()
+        vals_list = []
+        for installment in schedule._expand_installments(start_date, amount, precision_digits=2):
+            line = installment['line']
+            invoice_name = line.name
+            if installment['count'] > 1:
+                invoice_name = f"{line.name} ({installment['number']}/{installment['count']})"
+            vals_list.append({
+                'property_sold_id': self.id,
+                'name': invoice_name,
+                'amount': installment['amount'],
+                'invoice_date': installment['date'],
+                'invoice_created': False,
+                'invoice_type': 'installment',
+                'sequence': sequence + len(vals_list),
+                'desc': line.note or '',
+                'tax_ids': [(6, 0, taxes.ids)] if taxes else False
+            })
+        return vals_list
+
     # Confirm Sale
     def action_confirm_sale(self):
         """Confirm Sale and Update Status to SOLD"""
@@ -1653,7 +1664,7 @@ class SaleInvoice(models.Model):
                                        string="Property Sold",
                                        ondelete='cascade')
     invoice_id = fields.Many2one('account.move', string="Invoice")
-    invoice_date = fields.Date(string="Date")
+    invoice_date = fields.Date(string="Date", index=True)
     payment_state = fields.Selection(related="invoice_id.payment_state")
     company_id = fields.Many2one('res.company',
                                  string='Company',
@@ -1734,7 +1745,13 @@ class SaleInvoice(models.Model):
     def action_create_invoice(self):
         invoice_post_type = self.env['ir.config_parameter'].sudo(
         ).get_param('rental_management.invoice_post_type')
-        invoice_id = self.env['account.move'].sudo().create({
+        invoice_id = self._create_installment_invoices(
+            post=invoice_post_type == 'automatically')
+        self.action_send_sale_invoice(invoice_id.id)
+
+    def _prepare_installment_invoice(self):
+        self.ensure_one()
+        return {
             'partner_id': self.property_sold_id.customer_id.id,
             'move_type': 'out_invoice',
             'sold_id': self.property_sold_id.id,
@@ -1746,12 +1763,29 @@ class SaleInvoice(models.Model):
                 'price_unit': self.amount,
                 'tax_ids': self.tax_ids.ids if self.tax_ids else False
             })]
-        })
-        if invoice_post_type == 'automatically':
-            invoice_id.action_post()
-        self.invoice_id = invoice_id.id
-        self.invoice_created = True
-        self.action_send_sale_invoice(invoice_id.id)
+        }
+
+    def _create_installment_invoices(self, post=False):
+        """Create the invoices of the installments with one create, post them
+        with one action_post and link them to their installment with one
+        UPDATE"""
+        invoices = self.env['account.move'].sudo().create(
+            [rec._prepare_installment_invoice() for rec in self])
+        if post:
+            invoices.action_post()
+        self.flush_recordset(['invoice_id', 'invoice_created'])
+        self.env.cr.execute("""
+            UPDATE sale_invoice
+               SET invoice_id = link.invoice_id,
+                   invoice_created = TRUE,
+                   write_uid = %s,
+                   write_date = (now() at time zone 'UTC')
+              FROM unnest(%s::int[], %s::int[]) AS link(id, invoice_id)
+             WHERE sale_invoice.id = link.id
+        """, [self.env.uid, self.ids, invoices.ids])
+        self.invalidate_recordset(['invoice_id', 'invoice_created', 'write_uid', 'write_date'])
+        self.modified(['invoice_id', 'invoice_created'])
+        return invoices
 
     def action_send_sale_invoice(self, invoice_id):
         mail_template = self.env.ref(
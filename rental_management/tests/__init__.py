@@ -6,4 +6,5 @@ from . import test_rent_contract
 from . import test_rent_extend_contract
 from . import test_statics
 from . import test_reports
-from . import test_region
\ No newline at end of file
+from . import test_region
+from . import test_performance_benchmark
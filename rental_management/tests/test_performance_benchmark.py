@@ -0,0 +1,336 @@
+import json
+import logging
+import os
+import time
+from dateutil.relativedelta import relativedelta
+from odoo import fields
+from odoo.tests.common import tagged
+from .common import CreateRentalData
+
+_logger = logging.getLogger(__name__)
+
+# Volumes can be tuned from the environment, e.g. for a quick smoke run:
+#
+#   RENTAL_BENCH_UNITS=2000 RENTAL_BENCH_TENANCIES=4000 \
+#   RENTAL_BENCH_REPORT=/tmp/rental_bench.json \
+#   odoo-bin -d bench -i rental_management --test-tags rental_benchmark
+REGIONS = int(os.environ.get("RENTAL_BENCH_REGIONS", 20))
+PROJECTS = int(os.environ.get("RENTAL_BENCH_PROJECTS", 200))
+SUB_PROJECTS = int(os.environ.get("RENTAL_BENCH_SUB_PROJECTS", 1000))
+UNITS = int(os.environ.get("RENTAL_BENCH_UNITS", 50000))
+TENANCIES = int(os.environ.get("RENTAL_BENCH_TENANCIES", 100000))
+TENANTS = int(os.environ.get("RENTAL_BENCH_TENANTS", 10000))
+LANDLORDS = int(os.environ.get("RENTAL_BENCH_LANDLORDS", 50))
+INVOICED_CONTRACTS = int(os.environ.get("RENTAL_BENCH_INVOICED_CONTRACTS", 1000))
+INVOICE_MONTHS = int(os.environ.get("RENTAL_BENCH_INVOICE_MONTHS", 36))
+REPORT_PATH = os.environ.get("RENTAL_BENCH_REPORT")
+CREATE_BATCH = 1000
+INVOICE_BATCH = 500
+# Running contract payment terms: (payment term, rent unit, duration months)
+PAYMENT_TERMS = [
+    ("monthly", "Month", 12),
+    ("quarterly", "Month", 12),
+    ("year", "Year", 1),
+]
+TERM_PERIODS = {
+    "monthly": relativedelta(months=1),
+    "quarterly": relativedelta(months=3),
+    "year": relativedelta(years=1),
+}
+
+
+@tagged("post_install", "-at_install", "-standard", "rental_benchmark")
+class TestRentalBenchmark(CreateRentalData):
+    """Timings and query counts of the rental schedulers, dashboard,
+    statistics, availability search and reports on a realistic portfolio.
+
+    It is excluded from the standard test run and only executed with
+    ``--test-tags rental_benchmark``. Results are logged and, when
+    ``RENTAL_BENCH_REPORT`` is set, written as JSON so that two runs
+    can be compared.
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.env = cls.env(context=dict(
+            cls.env.context, tracking_disable=True, mail_notrack=True,
+            mail_create_nolog=True, test_mode=True))
+        config = cls.env["ir.config_parameter"].sudo()
+        config.set_param("rental_management.reminder_days", 0)
+        config.set_param("rental_management.invoice_post_type", "automatically")
+        cls.today = fields.Date.today()
+        started = time.time()
+        cls._seed_partners()
+        cls._seed_projects()
+        cls._seed_units()
+        cls._seed_tenancies()
+        cls._seed_invoices()
+        cls.env.flush_all()
+        _logger.info(
+            "Rental benchmark seeded %s units, %s contracts and %s invoices in %.1fs",
+            len(cls.units), len(cls.tenancies), cls.invoice_count,
+            time.time() - started)
+        cls.report = {
+            "regions": REGIONS,
+            "projects": PROJECTS,
+            "sub_projects": SUB_PROJECTS,
+            "units": len(cls.units),
+            "tenancies": len(cls.tenancies),
+            "invoices": cls.invoice_count,
+            "metrics": {},
+        }
+
+    @classmethod
+    def tearDownClass(cls):
+        report = json.dumps(cls.report, indent=2, sort_keys=True)
+        _logger.info("Rental benchmark report:\n%s", report)
+        if REPORT_PATH:
+            with open(REPORT_PATH, "w") as report_file:
+                report_file.write(report)
+        super().tearDownClass()
+
+    # Data generator
+    @classmethod
+    def _create_batched(cls, model, vals_list):
+        records = cls.env[model]
+        for start in range(0, len(vals_list), CREATE_BATCH):
+            records |= cls.env[model].create(vals_list[start:start + CREATE_BATCH])
+        return records
+
+    @classmethod
+    def _seed_partners(cls):
+        cls.tenants = cls._create_batched("res.partner", [
+            {"name": "Bench Tenant %05d" % index, "user_type": "customer"}
+            for index in range(TENANTS)
+        ])
+        cls.landlords = cls._create_batched("res.partner", [
+            {"name": "Bench Landlord %03d" % index, "user_type": "landlord"}
+            for index in range(LANDLORDS)
+        ])
+        cls.durations = {
+            (rent_unit, months): cls.env["contract.duration"].create({
+                "duration": "Bench %s %s" % (months, rent_unit),
+                "month": months, "rent_unit": rent_unit})
+            for dummy, rent_unit, months in PAYMENT_TERMS
+        }
+
+    @classmethod
+    def _seed_projects(cls):
+        subtype = cls.env["property.sub.type"].create({
+            "name": "Bench Apartment", "type": "residential"})
+        cls.regions = cls._create_batched("property.region", [
+            {"name": "Bench Region %02d" % index} for index in range(REGIONS)
+        ])
+        cls.projects = cls._create_batched("property.project", [{
+            "name": "Bench Project %04d" % index,
+            "project_sequence": "BP%04d" % index,
+            "project_for": "rent",
+            "property_type": "residential",
+            "property_subtype_id": subtype.id,
+            "landlord_id": cls.landlords[index % LANDLORDS].id,
+            "region_id": cls.regions[index % REGIONS].id,
+            "company_id": cls.company.id,
+            "date_of_project": cls.today,
+            "status": "available",
+        } for index in range(PROJECTS)])
+        cls.sub_projects = cls._create_batched("property.sub.project", [{
+            "name": "Bench Sub Project %05d" % index,
+            "project_sequence": "BS%05d" % index,
+            "property_project_id": cls.projects[index % PROJECTS].id,
+            "status": "available",
+        } for index in range(SUB_PROJECTS)])
+
+    @classmethod
+    def _seed_units(cls):
+        """Units spread over the sub projects, located around their region.
+        One in four units is vacant, the others are rented."""
+        vals_list = []
+        for index in range(UNITS):
+            sub_project = cls.sub_projects[index % SUB_PROJECTS]
+            region_index = index % SUB_PROJECTS % PROJECTS % REGIONS
+            vals_list.append({
+                "name": "Bench Unit %06d" % index,
+                "property_seq": "BU%06d" % index,
+                "sale_lease": "for_tenancy",
+                "type": "residential",
+                "stage": "available" if index % 4 == 0 else "on_lease",
+                "price": 500 + index % 2500,
+                "rent_unit": "Month",
+                "landlord_id": sub_project.property_project_id.landlord_id.id,
+                "property_project_id": sub_project.property_project_id.id,
+                "subproject_id": sub_project.id,
+                "region_id": cls.regions[region_index].id,
+                "latitude": str(-60 + (region_index * 7) % 120 + (index % 1000) / 1000),
+                "longitude": str(-170 + (region_index * 17) % 340 + (index % 997) / 997),
+            })
+        cls.units = cls._create_batched("property.details", vals_list)
+
+    @classmethod
+    def _tenancy_vals(cls, index):
+        """Contract ``index``: each unit has consecutive yearly contracts, the
+        last one running for rented units. A few running contracts are
+        past their end date and one in thirty is due for invoicing today."""
+        unit_index = index % UNITS
+        unit = cls.units[unit_index]
+        rounds = -(-TENANCIES // UNITS)
+        age = rounds - 1 - index // UNITS
+        payment_term, rent_unit, months = PAYMENT_TERMS[index % len(PAYMENT_TERMS)]
+        start_date = cls.today - relativedelta(years=age, days=unit_index % 330)
+        contract_type = "close_contract"
+        last_invoice_date = False
+        if age == 0 and unit.stage == "on_lease":
+            contract_type = "running_contract"
+            if index % 50 == 1:
+                start_date = cls.today - relativedelta(months=13)
+            if index % 30 == 2:
+                last_invoice_date = cls.today - TERM_PERIODS[payment_term]
+            else:
+                last_invoice_date = start_date
+        elif age == 0:
+            contract_type = "new_contract"
+        return {
+            "tenancy_seq": "BT%06d" % index,
+            "property_id": unit.id,
+            "tenancy_id": cls.tenants[index % TENANTS].id,
+            "contract_type": contract_type,
+            "type": "automatic",
+            "payment_term": payment_term,
+            "final_rent_unit": rent_unit,
+            "duration_id": cls.durations[(rent_unit, months)].id,
+            "start_date": start_date,
+            "invoice_start_date": start_date,
+            "last_invoice_payment_date": last_invoice_date,
+            "total_rent": unit.price,
+        }
+
+    @classmethod
+    def _seed_tenancies(cls):
+        cls.tenancies = cls._create_batched(
+            "tenancy.details", [cls._tenancy_vals(index) for index in range(TENANCIES)])
+
+    @classmethod
+    def _seed_invoices(cls):
+        """Monthly posted invoice history of the first contracts"""
+        product = cls.env.ref("rental_management.property_product_1")
+        tenancies = cls.env["tenancy.details"]
+        contracts = cls.tenancies[:INVOICED_CONTRACTS]
+        invoices = []
+        for contract in contracts:
+            for month in range(INVOICE_MONTHS):
+                invoice_date = cls.today - relativedelta(months=INVOICE_MONTHS - month)
+                invoices.append(({
+                    "partner_id": contract.tenancy_id.id,
+                    "move_type": "out_invoice",
+                    "invoice_date": invoice_date,
+                    "tenancy_id": contract.id,
+                    "invoice_line_ids": [(0, 0, {
+                        "product_id": product.id,
+                        "name": "Installment of " + contract.property_id.name,
+                        "quantity": 1,
+                        "price_unit": contract.total_rent,
+                    })],
+                }, {
+                    "tenancy_id": contract.id,
+                    "type": "rent",
+                    "invoice_date": invoice_date,
+                    "description": "Installment of " + contract.property_id.name,
+                    "rent_amount": contract.total_rent,
+                }))
+        for start in range(0, len(invoices), INVOICE_BATCH):
+            tenancies._create_invoices_with_entries(
+                invoices[start:start + INVOICE_BATCH], post=True)
+        cls.invoice_count = len(invoices)
+
+    # Measure
+    def _measure(self, key, callback, rows=None):
+        """Run ``callback`` once and store its duration and query count"""
+        self.env.flush_all()
+        queries_before = self.env.cr.sql_log_count
+        started = time.perf_counter()
+        result = callback()
+        self.env.flush_all()
+        elapsed = time.perf_counter() - started
+        metric = {
+            "seconds": round(elapsed, 3),
+            "queries": self.env.cr.sql_log_count - queries_before,
+        }
+        if rows is not None:
+            metric["rows"] = rows(result) if callable(rows) else rows
+        self.report["metrics"][key] = metric
+        _logger.info("Rental benchmark %s: %s", key, metric)
+        return result
+
+    def test_01_recurring_billing(self):
+        due = self.env["tenancy.details"].search_count([
+            ("contract_type", "=", "running_contract"),
+            ("next_invoice_due_date", "=", self.today)])
+        moves_before = self.env["account.move"].search_count([("tenancy_id", "!=", False)])
+        self._measure("recurring_billing",
+                      self.env["tenancy.details"].tenancy_recurring_billing, rows=due)
+        moves = self.env["account.move"].search_count([("tenancy_id", "!=", False)])
+        self.assertGreater(moves, moves_before)
+
+    def test_02_expire(self):
+        self._measure("expire", self.env["tenancy.details"].tenancy_expire)
+        self.assertFalse(self.env["tenancy.details"].search_count([
+            ("contract_type", "=", "running_contract"), ("end_date", "<", self.today)]))
+
+    def test_03_dashboard(self):
+        properties = self.env["property.details"]
+        stats = self._measure("dashboard_cold", properties.get_property_stats)
+        self._measure("dashboard_warm", properties.get_property_stats)
+        self.assertTrue(stats)
+
+    def test_04_project_statistics(self):
+        properties = self.env["property.details"]
+        self._measure(
+            "project_statistics",
+            lambda: properties._get_project_statistics("property_project_id", self.projects.ids),
+            rows=len(self.projects))
+        self._measure(
+            "sub_project_statistics",
+            lambda: properties._get_project_statistics("subproject_id", self.sub_projects.ids),
+            rows=len(self.sub_projects))
+        self.projects.invalidate_recordset()
+        self._measure("project_fields", lambda: self.projects.mapped("total_values"),
+                      rows=len(self.projects))
+
+    def test_05_availability(self):
+        tenancies = self.env["tenancy.details"]
+        periods = [(unit.id, self.today, self.today + relativedelta(months=1))
+                   for unit in self.units]
+        conflicts = self._measure(
+            "period_conflicts",
+            lambda: tenancies._get_period_conflicts(periods, ["running_contract"]),
+            rows=len(periods))
+        self.assertTrue(conflicts)
+        self._measure(
+            "available_search",
+            lambda: self.env["property.details"].search([
+                ("stage", "=", "available"), ("sale_lease", "=", "for_tenancy")]),
+            rows=len)
+
+    def test_06_map_clusters(self):
+        properties = self.env["property.details"]
+        world = {"south": -90, "north": 90, "west": -180, "east": 180}
+        clusters = self._measure(
+            "map_clusters_world", lambda: properties.get_property_map_clusters(world, 2),
+            rows=lambda result: len(result["markers"]))
+        self.assertTrue(clusters["total"])
+        city = {"south": -60, "north": -58, "west": -170, "east": -168}
+        self._measure(
+            "map_clusters_city", lambda: properties.get_property_map_clusters(city, 12),
+            rows=lambda result: len(result["markers"]))
+
+    def test_07_reports(self):
+        landlord_report = self.env["landlord.sale.tenancy"].create({
+            "landlord_id": self.landlords[0].id, "report_for": "tenancy"})
+        report = self._measure("landlord_rent_report",
+                               landlord_report.action_tenancy_sold_xls_report)
+        self.assertEqual(report["type"], "ir.actions.act_url")
+        # The rent report is xls, limited to 65536 rows per sheet
+        property_report = self.env["property.report.wizard"].create({
+            "type": "tenancy", "start_date": self.today - relativedelta(months=1),
+            "end_date": self.today})
+        self._measure("property_rent_report", property_report.action_property_xls_report)
@@ -183,6 +183,16 @@ class TestProject(CreateRentalData):
         self.assertEqual(self.test_property_one.rent_count, 5)
         self.assertEqual(self.test_property_two.rent_count, 0)
 
+        # Computing a whole recordset gives the same figures as one by one
+        projects = self.test_property_one | self.test_property_two
+        projects.invalidate_recordset()
+        projects.compute_count()
+        self.assertEqual(projects.mapped('unit_count'), [25, 0])
+        self.assertEqual(projects.mapped('available_unit_count'), [5, 0])
+        self.assertEqual(projects.mapped('sold_count'), [10, 0])
+        self.assertEqual(projects.mapped('rent_count'), [5, 0])
+        self.assertEqual(projects.mapped('document_count'), [3, 0])
+
     def test_all_action_methods(self):
 
         action = self.test_property_one.action_document_count()
@@ -668,3 +668,49 @@ class TestProperty(CreateRentalData):
 
         self.assertEqual(data["total_property"],
                          property.search_count(company_domain))
+
+        # Snapshot: unchanged sections are served as stored, changed ones
+        # are refreshed on the next read
+        self.assertEqual(set(data["data_age"]),
+                         {"stats", "map", "due_paid", "top_broker"})
+        self.assertIn("due_paid_amount", data)
+        snapshot = self.env["property.dashboard.snapshot"].search(
+            [("company_key", "=", ",".join(map(str, self.env.companies.ids)))])
+        self.assertEqual(len(snapshot), 1)
+        snapshot.stats_data = dict(snapshot.stats_data, total_property=-1)
+        data = self.property_one.get_property_stats()
+        self.assertEqual(data["total_property"], -1)
+        self.property_one.stage = "available"
+        data = self.property_one.get_property_stats()
+        self.assertEqual(data["total_property"],
+                         property.search_count(company_domain))
+
+    def test_map_clusters(self):
+        properties = self.property_one | self.property_two | self.property_three
+        properties.write({"stage": "available", "company_id": self.env.company.id})
+        self.property_one.write({"latitude": "-48.8767", "longitude": "-123.3933"})
+        self.property_two.write({"latitude": "-48.8762", "longitude": "-123.3927"})
+        self.property_three.write({"latitude": "not a coordinate", "longitude": "-123.5"})
+        self.assertTrue(self.property_one.map_located)
+        self.assertFalse(self.property_three.map_located)
+
+        bounds = {"south": -50.0, "west": -124.0, "north": -48.0, "east": -123.0}
+        property = self.env["property.details"]
+
+        # Close properties share a cluster at low zoom ...
+        clusters = property.get_property_map_clusters(bounds, 5)
+        cluster = [marker for marker in clusters["markers"] if marker["count"] > 1]
+        self.assertEqual(len(cluster), 1)
+        self.assertFalse(cluster[0]["id"])
+        self.assertEqual(cluster[0]["count"], 2)
+
+        # ... and are split at street level
+        clusters = property.get_property_map_clusters(bounds, 20)
+        ids = [marker["id"] for marker in clusters["markers"]]
+        self.assertIn(self.property_one.id, ids)
+        self.assertIn(self.property_two.id, ids)
+        self.assertNotIn(self.property_three.id, ids)
+
+        markers = property.get_property_map_markers([self.property_one.id])
+        self.assertEqual(markers[0]["id"], self.property_one.id)
+        self.assertIn(self.property_one.name, markers[0]["title"])
@@ -1,5 +1,6 @@
 import datetime
 import psycopg2
+from unittest.mock import patch
 from dateutil.relativedelta import relativedelta
 from odoo.exceptions import ValidationError, AccessError
 from odoo.tests.common import tagged
@@ -182,12 +183,15 @@ class TestRentContract(CreateRentalData):
         self.assertEqual(self.contract_two.end_date, datetime.datetime.strptime(
             "2026-03-01", "%Y-%m-%d").date())
 
-        #  _search_end_date ----------------------------------------------------
+        #  end_date search ------------------------------------------------------
 
-        domain = self.contract_one._search_end_date(
-            "=", datetime.datetime.strptime("2026-03-01", "%Y-%m-%d").date())
-        value = self.env["tenancy.details"].search(domain)
+        value = self.env["tenancy.details"].search(
+            [("end_date", "=", "2026-03-01")])
         self.assertEqual(value.id, self.contract_two.id)
+        value = self.env["tenancy.details"].search(
+            [("end_date", ">=", "2026-03-01"),
+             ("id", "in", (self.contract_one + self.contract_two).ids)])
+        self.assertIn(self.contract_two, value)
 
         # _compute_broker_commission -------------------------------------------
 
@@ -317,6 +321,26 @@ class TestRentContract(CreateRentalData):
         self.assertEqual(self.contract_two.margin, 98390.0)
         self.assertEqual(self.contract_two.margin_percentage, 89.44545454545455)
 
+        # Aggregates computed for a whole recordset ----------------------------
+
+        contracts = self.contract_one + self.contract_two
+        contracts.invalidate_recordset()
+        contracts.read(["invoice_count", "total_bill_amount",
+                        "maintenance_request_count", "total_invoiced"])
+        self.assertEqual(self.contract_two.invoice_count, 10)
+        self.assertEqual(self.contract_two.total_bill_amount, 100)
+        self.assertEqual(self.contract_two.maintenance_request_count, 5)
+        self.assertEqual(self.contract_two.total_invoiced, 110000)
+        self.assertEqual(self.contract_one.maintenance_request_count, 0)
+
+        # Aggregates of a contract edited in a form (onchange) -----------------
+
+        edited = self.contract_two.new(origin=self.contract_two)
+        self.assertEqual(edited.invoice_count, 10)
+        self.assertEqual(edited.total_bill_amount, 100)
+        self.assertEqual(edited.maintenance_request_count, 5)
+        self.assertEqual(edited.total_invoiced, 110000)
+
         # _compute_rent_unit ---------------------------------------------------
 
         self.contract_two._compute_rent_unit()
@@ -456,11 +480,18 @@ class TestRentContract(CreateRentalData):
         invoice = self.contract_four.rent_invoice_ids[-1].rent_invoice_id
         self.assertEqual(invoice.amount_untaxed, 10020)
         self.assertEqual(invoice.amount_residual, 11020)
+        self.assertEqual(
+            self.contract_four.next_invoice_due_date,
+            self.contract_four.last_invoice_payment_date + relativedelta(months=1))
+        # Already billed for this period: a new run is a no-op
+        self.contract_four.tenancy_recurring_billing()
+        self.assertEqual(len(self.contract_four.rent_invoice_ids), 2)
 
         self.contract_four.end_date = datetime.date(2025, 1, 1)
         self.contract_four.contract_type = "running_contract"
         self.contract_four.tenancy_expire()
         self.assertEqual(self.contract_four.contract_type, "expire_contract")
+        self.assertEqual(self.contract_four.property_id.stage, "available")
 
         # tenancy_recurring_quarterly_invoice ----------------------------------
 
@@ -510,6 +541,29 @@ class TestRentContract(CreateRentalData):
         self.contract_six.tenancy_expire()
         self.assertEqual(self.contract_six.contract_type, "expire_contract")
 
+    def test_recurring_billing_failed_batch(self):
+        # A failing contract does not prevent the others of its batch from
+        # being invoiced
+        Tenancy = self.env["tenancy.details"]
+        contracts = self.contract_one | self.contract_four | self.contract_five
+        invoiced = []
+
+        def create_recurring_invoices(records, post=False):
+            if self.contract_four in records:
+                raise ValidationError("Missing installment item")
+            invoiced.extend(records.ids)
+
+        with patch.object(type(Tenancy), "search", return_value=contracts), \
+                patch.object(type(Tenancy), "_create_recurring_invoices",
+                             create_recurring_invoices):
+            failed_ids = Tenancy.tenancy_recurring_billing()
+
+        self.assertEqual(failed_ids, [self.contract_four.id])
+        self.assertEqual(sorted(invoiced),
+                         sorted([self.contract_one.id, self.contract_five.id]))
+        self.assertIn("could not be created",
+                      self.contract_four.message_ids[0].body)
+
     def test_scheduler_manual(self):
         active_contract_wizard = self._create_active_contract(
             active_id=self.contract_four.id, type="manual", contract_id=
@@ -552,3 +606,34 @@ class TestRentContract(CreateRentalData):
         self.assertTrue(invoice)
         self.assertEqual(invoice.amount_untaxed, 10020)
         self.assertEqual(invoice.amount_residual, 11021)
+
+    def test_payment_schedule(self):
+        schedule = self.env["payment.schedule"].create({
+            "name": "Down Payment and 3 Months", "schedule_type": "rental",
+            "schedule_line_ids": [
+                (0, 0, {"name": "Down Payment", "percentage": 40, "days_after": 0}),
+                (0, 0, {"name": "Monthly", "percentage": 60, "days_after": 30,
+                        "installment_frequency": "monthly", "number_of_installments": 3}),
+            ]})
+        start_date = datetime.date(2025, 3, 1)
+        installments = schedule._expand_installments(start_date, 10000)
+        self.assertEqual([installment["amount"] for installment in installments],
+                         [4000, 2000, 2000, 2000])
+        self.assertEqual([installment["date"] for installment in installments],
+                         [start_date + datetime.timedelta(days=days) for days in (0, 30, 60, 90)])
+
+        # Bulk apply to the property, then generate the draft contract installments
+        self.assertEqual(self.contract_one.contract_type, "new_contract")
+        wizard = self.env["property.schedule.wizard"].with_context(
+            active_model="property.details", active_ids=self.property.ids).create({
+                "payment_schedule_id": schedule.id, "update_contracts": True,
+                "generate_installments": True})
+        wizard.action_apply_schedule()
+        self.assertEqual(self.property.rental_payment_schedule_id, schedule)
+        self.assertEqual(self.contract_one.payment_schedule_id, schedule)
+        self.assertTrue(self.contract_one.use_schedule)
+        entries = self.contract_one.rent_invoice_ids.filtered(
+            lambda entry: "Installment" in (entry.description or ""))
+        self.assertEqual(len(entries), 4)
+        self.assertEqual(sorted(entries.mapped("rent_amount")), [2000, 2000, 2000, 4000])
+        self.assertEqual(len(entries.rent_invoice_id), 4)
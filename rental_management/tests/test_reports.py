@@ -1,6 +1,8 @@
 import base64
 import datetime
+import io
 import re
+import zipfile
 import psycopg2
 from dateutil.relativedelta import relativedelta
 from odoo.exceptions import ValidationError, AccessError
@@ -31,6 +33,13 @@ class TestPropertyReport(CreateRentalData):
             name="Property Four", sale_lease="for_tenancy", stage="draft",
             type="industrial", price=4000,)
 
+    def _read_xlsx_sheets(self, document):
+        """Text of all the sheets of an xlsx attachment"""
+        with zipfile.ZipFile(io.BytesIO(base64.b64decode(document.datas))) as xlsx:
+            return "".join(
+                xlsx.read(name).decode() for name in xlsx.namelist()
+                if name.startswith("xl/worksheets/") or name == "xl/sharedStrings.xml")
+
     def test_property_sale_tenancy_xls_report_rent(self):
         document_id = 0
         contracts = []
@@ -97,9 +106,9 @@ class TestPropertyReport(CreateRentalData):
             document_id = int(number)
         document = self.env["ir.attachment"].browse(document_id)
         self.assertTrue(document)
+        sheets = self._read_xlsx_sheets(document)
         for rec in contracts:
-            self.assertIn(rec.tenancy_seq, str(
-                base64.decodebytes(document.datas)))
+            self.assertIn(rec.tenancy_seq, sheets)
 
     def test_property_sale_tenancy_xls_report_sale(self):
         document_id = 0
@@ -168,6 +177,6 @@ class TestPropertyReport(CreateRentalData):
             document_id = int(number)
         document = self.env["ir.attachment"].browse(document_id)
         self.assertTrue(document)
+        sheets = self._read_xlsx_sheets(document)
         for rec in contracts:
-            self.assertIn(rec.tenancy_seq, str(
-                base64.decodebytes(document.datas)))
\ No newline at end of file
+            self.assertIn(rec.tenancy_seq, sheets)
@@ -341,3 +341,30 @@ class TestSaleContract(CreateRentalData):
         self.assertEqual({'create': False}, action.get("context"))
         self.assertEqual(action["view_mode"], 'kanban,list,form')
         self.assertEqual(action["target"], 'current')
+
+    def test_sale_recurring_invoice(self):
+        installment_wizard = self._create_installment_wizard(
+            self.contract_two.id, customer_id=self.contract_two.id,
+            company_id=self.company.id, property_id=self.property.id,
+            payment_term="monthly", duration_id=self.duration.id,
+            start_date="2025-04-01", final_price=10000, is_taxes=True,
+            taxes_ids=[(6, 0, [self.tax.id], )], )
+        installment_wizard.property_sale_action()
+        installments = self.contract_two.sale_invoice_ids
+        self.assertEqual(len(installments), 10)
+
+        config = self.env["ir.config_parameter"].sudo()
+        config.set_param("rental_management.sale_reminder_days", 3)
+        config.set_param("rental_management.invoice_post_type", "automatically")
+        due_date = datetime.date.today() + datetime.timedelta(days=3)
+        installments[:2].invoice_date = due_date
+        installments[2:].invoice_date = due_date + datetime.timedelta(days=1)
+
+        self.env["property.vendor"].sale_recurring_invoice()
+        self.assertTrue(all(installments[:2].mapped("invoice_created")))
+        self.assertEqual(installments[:2].invoice_id.mapped("state"), ["posted", "posted"])
+        self.assertFalse(any(installments[2:].mapped("invoice_created")))
+
+        # Invoiced installments are not selected again
+        self.env["property.vendor"].sale_recurring_invoice()
+        self.assertEqual(len(installments.invoice_id), 2)
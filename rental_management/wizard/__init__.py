@@ -14,3 +14,4 @@ from . import active_contract
 from . import subproject_creation
 from . import unit_creation
 from . import aggremment_preview
+from . import property_schedule_wizard
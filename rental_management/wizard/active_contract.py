@@ -588,15 +588,11 @@ class ActiveContract(models.Model):
     def check_current_active_contract_status(self):
         active_id = self._context.get("active_id")
         tenancy_id = self.env["tenancy.details"].browse(active_id)
-        contracts = self.env["tenancy.details"].search(
-            [
-                ("start_date", "<=", tenancy_id.end_date),
-                ("end_date", ">", tenancy_id.start_date),
-                ("property_id", "=", tenancy_id.property_id.id),
-                ("contract_type", "=", "running_contract"),
-            ]
+        conflicts = self.env["tenancy.details"]._get_period_conflicts(
+            [(tenancy_id.property_id.id, tenancy_id.start_date, tenancy_id.end_date)],
+            ["running_contract"],
         )
-        if contracts:
+        if conflicts:
             return "Some contracts are active for this time period. Please choose a different contract period"
         return ""
 
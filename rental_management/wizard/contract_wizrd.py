@@ -305,26 +305,16 @@ class ContractWizard(models.TransientModel):
     @api.depends("start_date", "end_date", "property_id")
     def _compute_is_contract_available(self):
         """Check Contract Period Available between start date and end date."""
-        for rec in self:
+        tenancy = self.env["tenancy.details"].sudo()
+        conflicts = tenancy._get_period_conflicts(
+            [(rec.property_id.id, rec.start_date, rec.end_date) for rec in self],
+            ["new_contract", "running_contract"],
+        )
+        for index, rec in enumerate(self):
             availability = False
             desc = ""
             if rec.start_date and rec.end_date:
-                date_domain = [
-                    ("start_date", "<=", rec.end_date),
-                    ("end_date", ">", rec.start_date),
-                ]
-                domain = [
-                    (
-                        "contract_type",
-                        "not in",
-                        ["expire_contract", "cancel_contract", "close_contract"],
-                    ),
-                    ("property_id", "=", rec.property_id.id),
-                ]
-                rent_record = (
-                    self.env["tenancy.details"].sudo().search(
-                        date_domain + domain)
-                )
+                rent_record = tenancy.browse(conflicts.get(index, []))
                 draft_contract_record = rent_record.filtered(
                     lambda line: line.contract_type == "new_contract"
                 )
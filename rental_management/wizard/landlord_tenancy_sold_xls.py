@@ -1,7 +1,51 @@
-from odoo import fields, api, models
-import xlwt
 import base64
 from io import BytesIO
+from odoo import fields, api, models
+
+try:
+    from odoo.tools.misc import xlsxwriter
+except ImportError:
+    import xlsxwriter
+
+# Rows fetched at once from the report queries
+REPORT_FETCH_SIZE = 2000
+PAYMENT_TERMS = {
+    'monthly': "Monthly",
+    'full_payment': "Full Payment",
+    'quarterly': "Quarterly",
+}
+# Payment state -> (label, cell format)
+PAYMENT_STATUS = {
+    'paid': ("Paid", 'green'),
+    'not_paid': ("Not Paid", 'red'),
+    'reversed': ("Reversed", 'magenta'),
+    'partial': ("Partial Paid", 'blue_gray'),
+    'in_payment': ("In Payment", 'violet'),
+    'invoicing_legacy': ("Invoicing App Legacy", 'gold'),
+}
+# Contract type -> (label, cell format)
+CONTRACT_STATUS = {
+    'cancel_contract': ("Cancel", 'red_bg'),
+    'close_contract': ("Close", 'red_bg'),
+    'running_contract': ("Running", 'green_bg'),
+    'expire_contract': ("Expire", 'yellow_bg'),
+}
+# Sale stage -> (label, cell format)
+SOLD_STATUS = {
+    'draft': ("Draft", 'blue_gray'),
+    'booked': ("Booked", 'blue_gray'),
+    'refund': ("Refund", 'red'),
+    'sold': ("Sold", 'green'),
+    'cancel': ("Cancel", 'red'),
+    'locked': ("Locked", 'green'),
+}
+# Rent sheets filled from the invoice query: (sheet name, title, payment state)
+RENT_SHEETS = [
+    ("Landlord wise Contracts", "RENT INFORMATION - %s", None),
+    ("Paid Contracts", "Rent Information - %s : PAID", 'paid'),
+    ("Not Paid Contracts", "Rent Information - %s : NOT PAID", 'not_paid'),
+    ("Partial Paid Contracts", "Rent Information - %s : PARTIAL PAID", 'partial'),
+]
 
 
 class LandlordSaleTenancy(models.TransientModel):
@@ -15,1036 +59,257 @@ class LandlordSaleTenancy(models.TransientModel):
         [('tenancy', 'Rent'), ('sold', 'Property Sold')], string="Report For")
 
     def action_tenancy_sold_xls_report(self):
+        """Landlord report, streamed to the workbook: rows are fetched by
+        chunks from one query per sheet and written in constant memory."""
+        stream = BytesIO()
+        workbook = xlsxwriter.Workbook(stream, {'constant_memory': True})
+        formats = self._get_report_formats(workbook)
         if self.report_for == "tenancy":
-            sheet1_title = "RENT INFORMATION - " + self.landlord_id.name
-            sheet2_title = "Rent Information - " + self.landlord_id.name + " : PAID"
-            sheet3_title = "Rent Information - " + self.landlord_id.name + " : NOT PAID"
-            sheet4_title = "Rent Information - " + \
-                           self.landlord_id.name + " : PARTIAL PAID"
-            sheet5_title = "Rent Bills - " + self.landlord_id.name
-            workbook = xlwt.Workbook(encoding='utf-8')
-            # <<<<<<<<<<<<< Sheet 1 >>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>
-            sheet1 = workbook.add_sheet("Landlord wise Contracts")
-            domain = [('landlord_id', '=', self.landlord_id.id)]
-            record = self.env['rent.invoice'].search(domain)
-            self.action_create_landlord_tenancy_report(sheet=sheet1, sheet_title=sheet1_title, record=record,
-                                                       workbook=workbook)
-            # <<<<<<<<<<<<<<< Sheet 2 >>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>
-            sheet2 = workbook.add_sheet(
-                'Paid Contracts', cell_overwrite_ok=True)
-            record_paid = self.env['rent.invoice'].search(
-                domain + [('payment_state', '=', 'paid')])
-            self.action_create_landlord_tenancy_report(sheet=sheet2, sheet_title=sheet2_title, record=record_paid,
-                                                       workbook=workbook)
-
-            # <<<<<<<<<<<<<<<< Sheet 3 >>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>
-            sheet3 = workbook.add_sheet(
-                'Not Paid Contracts', cell_overwrite_ok=True)
-            record_not_paid = self.env['rent.invoice'].search(
-                domain + [('payment_state', '=', 'not_paid')])
-            self.action_create_landlord_tenancy_report(sheet=sheet3, sheet_title=sheet3_title, record=record_not_paid,
-                                                       workbook=workbook)
-            # <<<<<<<<<<<<<<<<<<<< Sheet 4 >>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>
-            sheet4 = workbook.add_sheet(
-                'Partial Paid Contracts', cell_overwrite_ok=True)
-            record_partial_paid = self.env['rent.invoice'].search(
-                domain + [('payment_state', '=', 'partial')])
-            self.action_create_landlord_tenancy_report(sheet=sheet4, sheet_title=sheet4_title,
-                                                       record=record_partial_paid,
-                                                       workbook=workbook)
-            # <<<<<<<<<<<<<<<<<<<< Sheet 5 >>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>
-            sheet5 = workbook.add_sheet(
-                'Contract Bills', cell_overwrite_ok=True)
-            contract_bills = self.env['rent.bill'].search([('vendor_id', '=', self.landlord_id.id)])
-            self.action_create_landlord_tenancy_report(sheet=sheet5, sheet_title=sheet5_title,
-                                                       record=contract_bills,
-                                                       workbook=workbook, is_bill_record=True)
-
-            stream = BytesIO()
-            workbook.save(stream)
-            out = base64.encodebytes(stream.getvalue())
-            attachment = self.env['ir.attachment'].sudo()
-            filename = self.landlord_id.name + " Rent.xls"
-            attachment_id = attachment.create(
-                {'name': filename,
-                 'type': 'binary',
-                 'public': False,
-                 'datas': out})
-            if attachment_id:
-                report = {
-                    'type': 'ir.actions.act_url',
-                    'url': '/web/content/%s?download=true' % (attachment_id.id),
-                    'target': 'self',
-                    'nodestroy': False,
-                }
-                return report
+            self._write_rent_sheets(workbook, formats)
+            filename = self.landlord_id.name + " Rent.xlsx"
         elif self.report_for == "sold":
-            name = "Sold Information - " + self.landlord_id.name
-            workbook = xlwt.Workbook(encoding='utf-8')
-            sheet1 = workbook.add_sheet(
-                "Landlord wise Sold Information", cell_overwrite_ok=True)
-            border_squre = xlwt.Borders()
-            border_squre.top = xlwt.Borders.HAIR
-            border_squre.left = xlwt.Borders.HAIR
-            border_squre.right = xlwt.Borders.HAIR
-            border_squre.bottom = xlwt.Borders.HAIR
-            border_squre.top_colour = xlwt.Style.colour_map["gray50"]
-            border_squre.bottom_colour = xlwt.Style.colour_map["gray50"]
-            border_squre.right_colour = xlwt.Style.colour_map["gray50"]
-            border_squre.left_colour = xlwt.Style.colour_map["gray50"]
-            al = xlwt.Alignment()
-            al.horz = xlwt.Alignment.HORZ_CENTER
-            al.vert = xlwt.Alignment.VERT_CENTER
-            date_format = xlwt.XFStyle()
-            date_format.num_format_str = 'mm/dd/yyyy'
-            date_format.font.name = "Century Gothic"
-            date_format.borders = border_squre
-            date_format.alignment = al
-
-            xlwt.add_palette_colour("custom_red", 0x21)
-            workbook.set_colour_RGB(0x21, 240, 210, 211)
-            xlwt.add_palette_colour("custom_green", 0x22)
-            workbook.set_colour_RGB(0x22, 210, 241, 214)
-            xlwt.add_palette_colour("custom_yellow", 0x23)
-            workbook.set_colour_RGB(0x23, 255, 255, 224)
-            xlwt.add_palette_colour("custom_blue", 0x24)
-            workbook.set_colour_RGB(0x24, 240, 255, 255)
-
-            red_bg = xlwt.easyxf(
-                "align: vert centre, horiz right;"
-                "pattern: pattern solid, fore_colour custom_red;"
-                " font:name Century Gothic, bold on;"
-                "border:  top hair, bottom hair, left hair, right hair,"
-                " top_color gray50, bottom_color gray50, left_color gray50, right_color gray50;")
-            green_bg = xlwt.easyxf(
-                "align: vert centre, horiz right;"
-                "pattern: pattern solid, fore_colour custom_green; "
-                "font:name Century Gothic, bold on;"
-                "border:  top hair, bottom hair, left hair, right hair, "
-                "top_color gray50, bottom_color gray50, left_color gray50, right_color gray50;")
-            # Font Color
-            red = xlwt.easyxf(
-                "align: vert centre, horiz center;"
-                "font: color-index red, name Century Gothic;"
-                "border:  top hair, bottom hair, left hair, right hair,"
-                " top_color gray50, bottom_color gray50, left_color gray50, right_color gray50")
-            green = xlwt.easyxf(
-                "align: vert centre, horiz center;"
-                "font: color-index green, name Century Gothic;"
-                "border:  top hair, bottom hair, left hair, right hair,"
-                " top_color gray50, bottom_color gray50, left_color gray50, right_color gray50")
-            blue_gray = xlwt.easyxf(
-                "align: vert centre, horiz center;"
-                "font: color-index blue_gray, name Century Gothic;"
-                "border:  top hair, bottom hair, left hair, right hair,"
-                " top_color gray50, bottom_color gray50, left_color gray50, right_color gray50")
-
-            title = xlwt.easyxf(
-                "font: height 440, name Century Gothic, bold on, color_index blue_gray; "
-                "align: vert center, horz center;border: bottom thick, bottom_color sea_green;")
-            sub_title = xlwt.easyxf(
-                "font: height 185, name Century Gothic, bold on, color_index gray80; "
-                "align: vert center, horz center; "
-                "border: top hair, bottom hair, left hair, right hair,"
-                "top_color gray50, bottom_color gray50, left_color gray50, right_color gray50")
-            border_all_right = xlwt.easyxf(
-                "align:horz right, vert center;"
-                "font:name Century Gothic;"
-                "border:  top hair, bottom hair, left hair, right hair,"
-                " top_color gray50, bottom_color gray50, left_color gray50, right_color gray50")
-            border_all_center = xlwt.easyxf(
-                "align:horz center, vert center;"
-                "font:name Century Gothic;"
-                "border:  top hair, bottom hair, left hair, right hair,"
-                " top_color gray50, bottom_color gray50, left_color gray50, right_color gray50")
-
-            sheet1.set_panes_frozen(True)
-            sheet1.set_horz_split_pos(1)
-            sheet1.set_horz_split_pos(2)
-            sheet1.set_vert_split_pos(1)
-            sheet1.show_grid = False
-
-            for num in range(1, 13):
-                sheet1.col(num).width = 4000
-
-            sheet1.row(0).height = 1000
-            sheet1.row(1).height = 600
-            sheet1.col(0).width = 400
-            sheet1.col(9).width = 5000
-            sheet1.col(11).width = 5500
-            sheet1.col(2).width = 5000
-            sheet1.col(4).width = 5000
-            sheet1.col(8).width = 5500
-            sheet1.write_merge(0, 0, 1, 12, name, title)
-            sheet1.write(1, 1, "Date", sub_title)
-            sheet1.write(1, 2, "Sequence", sub_title)
-            sheet1.write(1, 3, "Customer", sub_title)
-            sheet1.write(1, 4, "Property", sub_title)
-            sheet1.write(1, 5, "Payment Term", sub_title)
-            sheet1.write(1, 6, "Currency", sub_title)
-            sheet1.write(1, 7, "Sell Price", sub_title)
-            sheet1.write(1, 8, "Book price", sub_title)
-            sheet1.write(1, 9, "Payable Amount", sub_title)
-            sheet1.write(1, 10, "Paid Amount", sub_title)
-            sheet1.write(1, 11, "Remaining Amount", sub_title)
-            sheet1.write(1, 12, "Sold Status", sub_title)
-
-            record = self.env['property.vendor'].search(
-                [('landlord_id', '=', self.landlord_id.id)])
-            main_total_paid, main_total_remaining, total_sell_price, total_book_price, total_payable_price = 0.0, 0.0, 0.0, 0.0, 0.0
-            row = 2
-            for rec in record:
-                main_total_paid += rec.paid_amount
-                main_total_remaining += rec.remaining_amount
-                total_sell_price += rec.total_sell_amount
-                total_book_price += rec.book_price
-                total_payable_price += rec.payable_amount
-                if rec.stage == "booked":
-                    stage = "Booked"
-                    style1 = blue_gray
-                elif rec.stage == "refund":
-                    stage = "Refund"
-                    style1 = red
-                elif rec.stage == 'sold':
-                    stage = "Sold"
-                    style1 = green
-                elif rec.stage == 'cancel':
-                    stage = "Cancel"
-                    style1 = red
-                elif rec.stage == 'locked':
-                    stage = "Locked"
-                    style1 = green
-
-                sheet1.row(row).height = 400
-                sheet1.write(row, 1, rec.date, date_format)
-                sheet1.write(row, 2, rec.sold_seq, border_all_center)
-                sheet1.write(row, 3, rec.customer_id.name, border_all_center)
-                sheet1.write(row, 4, rec.property_id.name, border_all_center)
-                sheet1.write(row, 5, self.action_get_payment_term(
-                    rec.payment_term), border_all_center)
-                sheet1.write(row, 6, f"{rec.currency_id.symbol} ({rec.currency_id.name})", border_all_center)
-                sheet1.write(
-                    row, 7, f"{rec.total_sell_amount}", border_all_right)
-                sheet1.write(
-                    row, 8, f"{rec.book_price}", border_all_right)
-                sheet1.write(
-                    row, 9, f"{rec.payable_amount}", border_all_right)
-                sheet1.write(
-                    row, 10, f"{rec.paid_amount}", border_all_right)
-                sheet1.write(
-                    row, 11, f"{rec.remaining_amount}", border_all_right)
-                sheet1.write(row, 12, stage, style1)
-                row += 1
-
-            sheet1.row(row).height = 400
-            sheet1.write(row, 6, "Totals", sub_title)
-            sheet1.write(
-                row, 7, f"{total_sell_price}", green_bg)
-            sheet1.write(
-                row, 8, f"{total_book_price}", green_bg)
-            sheet1.write(
-                row, 9, f"{total_payable_price}", green_bg)
-            sheet1.write(
-                row, 10, f"{main_total_paid}", green_bg)
-            sheet1.write(
-                row, 11, f"{main_total_remaining}", red_bg)
-
-            stream = BytesIO()
-            workbook.save(stream)
-            out = base64.encodebytes(stream.getvalue())
-
-            attachment = self.env['ir.attachment'].sudo()
-            filename = self.landlord_id.name + " Sold.xls"
-            attachment_id = attachment.create(
-                {'name': filename,
-                 'type': 'binary',
-                 'public': False,
-                 'datas': out})
-            if attachment_id:
-                report = {
-                    'type': 'ir.actions.act_url',
-                    'url': '/web/content/%s?download=true' % (attachment_id.id),
-                    'target': 'self',
-                    'nodestroy': False,
-                }
-                return report
+            self._write_sold_sheet(workbook, formats)
+            filename = self.landlord_id.name + " Sold.xlsx"
+        else:
+            return
+        workbook.close()
+        attachment_id = self.env['ir.attachment'].sudo().create(
+            {'name': filename,
+             'type': 'binary',
+             'public': False,
+             'datas': base64.encodebytes(stream.getvalue())})
+        if attachment_id:
+            report = {
+                'type': 'ir.actions.act_url',
+                'url': '/web/content/%s?download=true' % (attachment_id.id),
+                'target': 'self',
+                'nodestroy': False,
+            }
+            return report
 
     def action_get_payment_term(self, term):
-        name = ""
-        if term == "monthly":
-            name = "Monthly"
-        elif term == "full_payment":
-            name = "Full Payment"
-        elif term == "quarterly":
-            name = "Quarterly"
+        return PAYMENT_TERMS.get(term, " ")
+
+    def _get_report_formats(self, workbook):
+        """Cell formats of the report, created once per workbook"""
+        cell = {'font_name': 'Century Gothic', 'valign': 'vcenter',
+                'border': 7, 'border_color': '#808080'}
+
+        def add_format(**options):
+            return workbook.add_format(dict(cell, **options))
+
+        return {
+            'title': workbook.add_format({
+                'font_name': 'Century Gothic', 'font_size': 22, 'bold': True,
+                'font_color': '#666699', 'align': 'center', 'valign': 'vcenter',
+                'bottom': 5, 'bottom_color': '#339966'}),
+            'sub_title': add_format(font_size=9, bold=True, font_color='#333333', align='center'),
+            'center': add_format(align='center'),
+            'italic': add_format(align='center', italic=True),
+            'date': add_format(align='center', num_format='mm/dd/yyyy'),
+            'amount': add_format(align='right', num_format='#,##0.00'),
+            'total': add_format(align='right', bold=True, bg_color='#D2F1D6', num_format='#,##0.00'),
+            'total_due': add_format(align='right', bold=True, bg_color='#F0D2D3', num_format='#,##0.00'),
+            # Status font colors
+            'red': add_format(align='center', font_color='#FF0000'),
+            'green': add_format(align='center', font_color='#008000'),
+            'magenta': add_format(align='center', font_color='#FF00FF'),
+            'gold': add_format(align='center', font_color='#FFCC00'),
+            'violet': add_format(align='center', font_color='#800080'),
+            'blue_gray': add_format(align='center', font_color='#666699'),
+            # Status backgrounds
+            'red_bg': add_format(align='center', bg_color='#F0D2D3'),
+            'green_bg': add_format(align='center', bg_color='#D2F1D6'),
+            'yellow_bg': add_format(align='center', bg_color='#FFFFE0'),
+            'blue_bg': add_format(align='center', bg_color='#F0FFFF'),
+        }
+
+    def _fetch_report_rows(self, query, params):
+        """Execute ``query`` and yield its rows by chunks"""
+        self.env.cr.execute(query, params)
+        while True:
+            rows = self.env.cr.fetchmany(REPORT_FETCH_SIZE)
+            if not rows:
+                break
+            yield from rows
+
+    def _get_rent_report_query(self, is_bill_record=False):
+        """Rent invoices (or bills) of the landlord with everything the sheets
+        display, in a single query"""
+        table, move_field, partner_field = (
+            ('rent_bill', 'rent_bill_id', 'vendor_id') if is_bill_record
+            else ('rent_invoice', 'rent_invoice_id', 'landlord_id'))
+        return f"""
+            SELECT line.invoice_date,
+                   tenancy.tenancy_seq,
+                   customer.name,
+                   COALESCE(property.name->>%(lang)s, property.name->>'en_US'),
+                   move.name,
+                   move.state,
+                   tenancy.payment_term,
+                   currency.symbol,
+                   currency.name,
+                   COALESCE(move.amount_total, 0.0),
+                   move.payment_state,
+                   tenancy.contract_type
+              FROM {table} line
+         LEFT JOIN tenancy_details tenancy ON tenancy.id = line.tenancy_id
+         LEFT JOIN res_partner customer ON customer.id = line.customer_id
+         LEFT JOIN property_details property ON property.id = tenancy.property_id
+         LEFT JOIN account_move move ON move.id = line.{move_field}
+         LEFT JOIN res_company company ON company.id = line.company_id
+         LEFT JOIN res_currency currency ON currency.id = company.currency_id
+             WHERE line.{partner_field} = %(landlord_id)s
+               AND (line.company_id IS NULL OR line.company_id IN %(company_ids)s)
+          ORDER BY line.id
+        """
+
+    def _write_rent_sheets(self, workbook, formats):
+        landlord_name = self.landlord_id.name
+        self.env['rent.invoice'].flush_model()
+        self.env['rent.bill'].flush_model()
+        self.env['tenancy.details'].flush_model(
+            ['tenancy_seq', 'payment_term', 'contract_type', 'property_id'])
+        self.env['account.move'].flush_model(['name', 'state', 'amount_total', 'payment_state'])
+        params = {
+            'landlord_id': self.landlord_id.id,
+            'company_ids': tuple(self.env.companies.ids),
+            'lang': self.env.lang or 'en_US',
+        }
+
+        # All the invoice sheets are filled in one pass over the invoices
+        sheets = []
+        for sheet_name, sheet_title, payment_state in RENT_SHEETS:
+            sheet = workbook.add_worksheet(sheet_name)
+            self._write_rent_sheet_header(sheet, sheet_title % landlord_name, formats)
+            sheets.append({'sheet': sheet, 'payment_state': payment_state, 'row': 2, 'total': 0.0})
+        for values in self._fetch_report_rows(self._get_rent_report_query(), params):
+            for sheet in sheets:
+                if sheet['payment_state'] and sheet['payment_state'] != values[10]:
+                    continue
+                self._write_rent_row(sheet['sheet'], sheet['row'], values, formats)
+                sheet['row'] += 1
+                sheet['total'] += values[9]
+        for sheet in sheets:
+            self._write_rent_sheet_total(sheet['sheet'], sheet['row'], sheet['total'], formats)
+
+        bill_sheet = workbook.add_worksheet("Contract Bills")
+        self._write_rent_sheet_header(
+            bill_sheet, "Rent Bills - " + landlord_name, formats, is_bill_record=True)
+        row, total = 2, 0.0
+        for values in self._fetch_report_rows(self._get_rent_report_query(is_bill_record=True), params):
+            self._write_rent_row(bill_sheet, row, values, formats, is_bill_record=True)
+            row += 1
+            total += values[9]
+        self._write_rent_sheet_total(bill_sheet, row, total, formats)
+
+    def _write_rent_sheet_header(self, sheet, sheet_title, formats, is_bill_record=False):
+        sheet.hide_gridlines(2)
+        sheet.freeze_panes(2, 1)
+        sheet.set_column(0, 0, 1.5)
+        sheet.set_column(1, 10, 15.5)
+        sheet.set_column(2, 2, 21.5)
+        sheet.set_column(5, 6, 19.5)
+        sheet.set_column(9, 10, 19.5)
+        sheet.set_row(0, 50)
+        sheet.merge_range(0, 1, 0, 9, sheet_title, formats['title'])
+        sheet.set_row(1, 30)
+        headers = ["Date", "Contract Reference", "Tenant", "Property",
+                   "Bill Reference" if is_bill_record else "Invoice Reference",
+                   "Payment Term", "Currency", "Amount", "Payment Status", "Contract Status"]
+        for col, header in enumerate(headers, 1):
+            sheet.write_string(1, col, header, formats['sub_title'])
+
+    def _write_rent_row(self, sheet, row, values, formats, is_bill_record=False):
+        (invoice_date, tenancy_seq, customer, property_name, move_name, move_state,
+         payment_term, currency_symbol, currency_name, amount, payment_state, contract_type) = values
+        status, status_format = PAYMENT_STATUS.get(payment_state, (" ", 'center'))
+        contract_status, contract_format = CONTRACT_STATUS.get(contract_type, (" ", 'blue_bg'))
+        if not move_state:
+            reference, reference_format = " ", 'center'
+        elif move_state == "draft":
+            reference = "Draft Bill" if is_bill_record else "Draft Invoice"
+            reference_format = 'italic'
         else:
-            name = " "
-        return name
-
-    def action_create_landlord_tenancy_report(self, sheet, sheet_title, record, workbook, is_bill_record=False):
-        sheet.set_panes_frozen(True)
-        sheet.set_horz_split_pos(1)
-        sheet.set_horz_split_pos(2)
-        sheet.set_vert_split_pos(1)
-        sheet.show_grid = False
-        border_squre = xlwt.Borders()
-        border_squre.top = xlwt.Borders.HAIR
-        border_squre.left = xlwt.Borders.HAIR
-        border_squre.right = xlwt.Borders.HAIR
-        border_squre.bottom = xlwt.Borders.HAIR
-        border_squre.top_colour = xlwt.Style.colour_map["gray50"]
-        border_squre.bottom_colour = xlwt.Style.colour_map["gray50"]
-        border_squre.right_colour = xlwt.Style.colour_map["gray50"]
-        border_squre.left_colour = xlwt.Style.colour_map["gray50"]
-        al = xlwt.Alignment()
-        al.horz = xlwt.Alignment.HORZ_CENTER
-        al.vert = xlwt.Alignment.VERT_CENTER
-        date_format = xlwt.XFStyle()
-        date_format.num_format_str = 'mm/dd/yyyy'
-        date_format.font.name = "Century Gothic"
-        date_format.borders = border_squre
-        date_format.alignment = al
-
-        xlwt.add_palette_colour("custom_red", 0x21)
-        workbook.set_colour_RGB(0x21, 240, 210, 211)
-        xlwt.add_palette_colour("custom_green", 0x22)
-        workbook.set_colour_RGB(0x22, 210, 241, 214)
-        xlwt.add_palette_colour("custom_yellow", 0x23)
-        workbook.set_colour_RGB(0x23, 255, 255, 224)
-        xlwt.add_palette_colour("custom_blue", 0x24)
-        workbook.set_colour_RGB(0x24, 240, 255, 255)
+            reference, reference_format = move_name, 'center'
 
-        italic_on = xlwt.easyxf(
-            "align:horz center, vert center;"
-            "font:name Century Gothic, italic on;"
-            "border:  top hair, bottom hair, left hair, right hair, "
-            "top_color gray50, bottom_color gray50, left_color gray50, right_color gray50")
-
-        red_bg = xlwt.easyxf(
-            "align: vert centre, horiz center;"
-            "pattern: pattern solid, fore_colour custom_red; "
-            "font:name Century Gothic;border:  top hair, bottom hair, left hair, right hair, "
-            "top_color gray50, bottom_color gray50, left_color gray50, right_color gray50;")
-        green_bg = xlwt.easyxf(
-            "align: vert centre, horiz center;"
-            "pattern: pattern solid, fore_colour custom_green; "
-            "font:name Century Gothic;"
-            "border:  top hair, bottom hair, left hair, right hair,"
-            " top_color gray50, bottom_color gray50, left_color gray50, right_color gray50;")
-        yellow_bg = xlwt.easyxf(
-            "align: vert centre, horiz center;"
-            "pattern: pattern solid, fore_colour custom_yellow; "
-            "font:name Century Gothic;"
-            "border:  top hair, bottom hair, left hair, right hair,"
-            " top_color gray50, bottom_color gray50, left_color gray50, right_color gray50;")
-        blue_bg = xlwt.easyxf(
-            "align: vert centre, horiz center;"
-            "pattern: pattern solid, fore_colour custom_blue; "
-            "font:name Century Gothic;"
-            "border:  top hair, bottom hair, left hair, right hair,"
-            " top_color gray50, bottom_color gray50, left_color gray50, right_color gray50;")
-
-        # Font Color
-        red = xlwt.easyxf(
-            "align: vert centre, horiz center;"
-            "font: color-index red, name Century Gothic;"
-            "border:  top hair, bottom hair, left hair, right hair, "
-            "top_color gray50, bottom_color gray50, left_color gray50, right_color gray50")
-        green = xlwt.easyxf(
-            "align: vert centre, horiz center;"
-            "font: color-index green, name Century Gothic;"
-            "border:  top hair, bottom hair, left hair, right hair, "
-            "top_color gray50, bottom_color gray50, left_color gray50, right_color gray50")
-        magenta_ega = xlwt.easyxf(
-            "align: vert centre, horiz center;"
-            "font: color-index magenta_ega, name Century Gothic;"
-            "border:  top hair, bottom hair, left hair, right hair, "
-            "top_color gray50, bottom_color gray50, left_color gray50, right_color gray50")
-        gold = xlwt.easyxf(
-            "align: vert centre, horiz center;"
-            "font: color-index gold, name Century Gothic;"
-            "border:  top hair, bottom hair, left hair, right hair, "
-            "top_color gray50, bottom_color gray50, left_color gray50, right_color gray50")
-        violet = xlwt.easyxf(
-            "align: vert centre, horiz center;"
-            "font: color-index violet, name Century Gothic;"
-            "border:  top hair, bottom hair, left hair, right hair, "
-            "top_color gray50, bottom_color gray50, left_color gray50, right_color gray50")
-        blue_gray = xlwt.easyxf(
-            "align: vert centre, horiz center;"
-            "font: color-index blue_gray, name Century Gothic;"
-            "border:  top hair, bottom hair, left hair, right hair, "
-            "top_color gray50, bottom_color gray50, left_color gray50, right_color gray50")
-
-        title = xlwt.easyxf(
-            "font: height 440, name Century Gothic, bold on, color_index blue_gray; "
-            "align: vert center, horz center;"
-            "border: bottom thick, bottom_color sea_green;")
-        sub_title = xlwt.easyxf(
-            "font: height 185, name Century Gothic, bold on, color_index gray80; "
-            "align: vert center, horz center; "
-            "border: top hair, bottom hair, left hair, right hair, "
-            "top_color gray50, bottom_color gray50, left_color gray50, right_color gray50")
-        border_all_right = xlwt.easyxf(
-            "align:horz right, vert center;"
-            "font:name Century Gothic;"
-            "border:  top hair, bottom hair, left hair, right hair, "
-            "top_color gray50, bottom_color gray50, left_color gray50, right_color gray50")
-        border_all_center = xlwt.easyxf(
-            "align:horz center, vert center;"
-            "font:name Century Gothic;"
-            "border:  top hair, bottom hair, left hair, right hair, "
-            "top_color gray50, bottom_color gray50, left_color gray50, right_color gray50")
-        total_paid_text = xlwt.easyxf(
-            "pattern: pattern solid, fore_colour custom_green;"
-            "align:horz right, vert center;"
-            "font:name Century Gothic, bold on;"
-            "border:  top hair, bottom hair, left hair, right hair, "
-            "top_color gray50, bottom_color gray50, left_color gray50, right_color gray50")
-
-        for num in range(1, 11):
-            sheet.col(num).width = 4000
-
-        sheet.col(5).width = 5000
-        sheet.col(2).width = 5500
-        sheet.col(9).width = 5000
-        sheet.col(10).width = 5000
-        sheet.col(6).width = 5000
-        sheet.row(0).height = 1000
-        sheet.row(1).height = 600
-        sheet.col(0).width = 400
-        sheet.write_merge(0, 0, 1, 9, sheet_title, title)
-        sheet.write(1, 1, "Date", sub_title)
-        sheet.write(1, 2, "Contract Reference", sub_title)
-        sheet.write(1, 3, "Tenant", sub_title)
-        sheet.write(1, 4, "Property", sub_title)
-        if is_bill_record:
-            sheet.write(1, 5, "Bill Reference", sub_title)
+        sheet.set_row(row, 20)
+        if invoice_date:
+            sheet.write_datetime(row, 1, invoice_date, formats['date'])
         else:
-            sheet.write(1, 5, "Invoice Reference", sub_title)
-        sheet.write(1, 6, "Payment Term", sub_title)
-        sheet.write(1, 7, "Currency", sub_title)
-        sheet.write(1, 8, "Amount", sub_title)
-        sheet.write(1, 9, "Payment Status", sub_title)
-        sheet.write(1, 10, "Contract Status", sub_title)
+            sheet.write_blank(row, 1, None, formats['date'])
+        sheet.write_string(row, 2, tenancy_seq or "", formats['center'])
+        sheet.write_string(row, 3, customer or "", formats['center'])
+        sheet.write_string(row, 4, property_name or "", formats['center'])
+        sheet.write_string(row, 5, reference or "", formats[reference_format])
+        sheet.write_string(row, 6, self.action_get_payment_term(payment_term), formats['center'])
+        sheet.write_string(row, 7, f"{currency_symbol} ({currency_name})", formats['center'])
+        sheet.write_number(row, 8, amount, formats['amount'])
+        sheet.write_string(row, 9, status, formats[status_format])
+        sheet.write_string(row, 10, contract_status, formats[contract_format])
+
+    def _write_rent_sheet_total(self, sheet, row, total, formats):
+        sheet.set_row(row, 20)
+        sheet.write_string(row, 7, "Totals", formats['sub_title'])
+        sheet.write_number(row, 8, total, formats['total'])
+
+    def _write_sold_sheet(self, workbook, formats):
+        sheet = workbook.add_worksheet("Landlord wise Sold Information")
+        sheet.hide_gridlines(2)
+        sheet.freeze_panes(2, 1)
+        sheet.set_column(0, 0, 1.5)
+        sheet.set_column(1, 12, 15.5)
+        sheet.set_column(2, 2, 19.5)
+        sheet.set_column(4, 4, 19.5)
+        sheet.set_column(8, 9, 21.5)
+        sheet.set_column(11, 11, 21.5)
+        sheet.set_row(0, 50)
+        sheet.merge_range(0, 1, 0, 12, "Sold Information - " + self.landlord_id.name, formats['title'])
+        sheet.set_row(1, 30)
+        headers = ["Date", "Sequence", "Customer", "Property", "Payment Term", "Currency",
+                   "Sell Price", "Book price", "Payable Amount", "Paid Amount",
+                   "Remaining Amount", "Sold Status"]
+        for col, header in enumerate(headers, 1):
+            sheet.write_string(1, col, header, formats['sub_title'])
+
+        # Amounts are computed (not stored): read them for all the contracts at once
+        amount_fields = ['total_sell_amount', 'book_price', 'payable_amount',
+                         'paid_amount', 'remaining_amount']
+        contracts = self.env['property.vendor'].search_read(
+            [('landlord_id', '=', self.landlord_id.id)],
+            ['date', 'sold_seq', 'customer_id', 'property_id', 'payment_term',
+             'currency_id', 'stage'] + amount_fields)
+        currencies = {
+            currency.id: f"{currency.symbol} ({currency.name})"
+            for currency in self.env['res.currency'].browse(
+                {contract['currency_id'][0] for contract in contracts if contract['currency_id']})
+        }
+        totals = dict.fromkeys(amount_fields, 0.0)
         row = 2
-        total_amount = 0.0
-        for rec in record:
-            if is_bill_record:
-                total_amount += rec.rent_bill_id.amount_total
-            else:
-                total_amount += rec.rent_invoice_id.amount_total
-
-            payment_term = self.action_get_payment_term(
-                rec.tenancy_id.payment_term)
-            if rec.payment_state == "paid":
-                status = "Paid"
-                style0 = green
-            elif rec.payment_state == "not_paid":
-                status = "Not Paid"
-                style0 = red
-            elif rec.payment_state == "reversed":
-                status = "Reversed"
-                style0 = magenta_ega
-            elif rec.payment_state == "partial":
-                status = "Partial Paid"
-                style0 = blue_gray
-            elif rec.payment_state == "in_payment":
-                status = "In Payment"
-                style0 = violet
-            elif rec.payment_state == "invoicing_legacy":
-                status = "Invoicing App Legacy"
-                style0 = gold
-            else:
-                status = " "
-                style0 = border_all_center
-
-            if rec.tenancy_id.contract_type == "cancel_contract":
-                contract_status = "Cancel"
-                style1 = red_bg
-            elif rec.tenancy_id.contract_type == "close_contract":
-                contract_status = "Close"
-                style1 = red_bg
-            elif rec.tenancy_id.contract_type == "running_contract":
-                contract_status = "Running"
-                style1 = green_bg
-            elif rec.tenancy_id.contract_type == "expire_contract":
-                contract_status = "Expire"
-                style1 = yellow_bg
-            else:
-                contract_status = " "
-                style1 = blue_bg
-
-            if is_bill_record:
-                if not rec.rent_bill_id.state:
-                    tenancy_seq = " "
-                    style2 = border_all_center
-                elif rec.rent_bill_id.state == "draft":
-                    tenancy_seq = "Draft Bill"
-                    style2 = italic_on
-                else:
-                    tenancy_seq = rec.rent_bill_id.name
-                    style2 = border_all_center
-            else:
-                if not rec.rent_invoice_id.state:
-                    tenancy_seq = " "
-                    style2 = border_all_center
-                elif rec.rent_invoice_id.state == "draft":
-                    tenancy_seq = "Draft Invoice"
-                    style2 = italic_on
-                else:
-                    tenancy_seq = rec.rent_invoice_id.name
-                    style2 = border_all_center
-
-            sheet.row(row).height = 400
-            sheet.write(row, 1, rec.invoice_date, date_format)
-            sheet.write(row, 2, rec.tenancy_id.tenancy_seq, border_all_center)
-            sheet.write(row, 3, rec.customer_id.name, border_all_center)
-            sheet.write(row, 4, rec.tenancy_id.property_id.name,
-                        border_all_center)
-            sheet.write(row, 5, tenancy_seq, style2)
-            sheet.write(row, 6, payment_term, border_all_center)
-            sheet.write(row, 7, f"{rec.currency_id.symbol} ({rec.currency_id.name})", border_all_center)
-            if is_bill_record:
-                sheet.write(
-                    row, 8, f"{rec.rent_bill_id.amount_total}", border_all_right)
+        for contract in contracts:
+            stage, stage_format = SOLD_STATUS.get(contract['stage'], (" ", 'center'))
+            sheet.set_row(row, 20)
+            if contract['date']:
+                sheet.write_datetime(row, 1, contract['date'], formats['date'])
             else:
-                sheet.write(
-                    row, 8, f"{rec.rent_invoice_id.amount_total}", border_all_right)
-            sheet.write(row, 9, status, style0)
-            sheet.write(row, 10, contract_status, style1)
+                sheet.write_blank(row, 1, None, formats['date'])
+            sheet.write_string(row, 2, contract['sold_seq'] or "", formats['center'])
+            sheet.write_string(row, 3, contract['customer_id'] and contract['customer_id'][1] or "",
+                               formats['center'])
+            sheet.write_string(row, 4, contract['property_id'] and contract['property_id'][1] or "",
+                               formats['center'])
+            sheet.write_string(row, 5, self.action_get_payment_term(contract['payment_term']),
+                               formats['center'])
+            sheet.write_string(row, 6, currencies.get(contract['currency_id'] and contract['currency_id'][0], ""),
+                               formats['center'])
+            for col, field_name in enumerate(amount_fields, 7):
+                sheet.write_number(row, col, contract[field_name], formats['amount'])
+                totals[field_name] += contract[field_name]
+            sheet.write_string(row, 12, stage, formats[stage_format])
             row += 1
-        sheet.row(row).height = 400
-        sheet.write(row, 7, "Totals", sub_title)
-        sheet.write(
-            row, 8, f"{total_amount}", total_paid_text)
-
-    # def action_tenancy_sold_xls_report(self):
-        if self.report_for == "tenancy":
-            name = "Rent Information - " + self.landlord_id.name
-            sheet2_name = "Rent Information - " + self.landlord_id.name + " : PAID"
-            sheet3_name = "Rent Information - " + self.landlord_id.name + " : NOT PAID"
-            sheet4_name = "Rent Information - " + \
-                self.landlord_id.name + " : PARTIAL PAID"
-            sheet5_name = "Contract Bill -" + self.landlord_id.name
-            workbook = xlwt.Workbook(encoding='utf-8')
-
-            # Font Color
-            red = xlwt.easyxf(
-                "align: vert centre, horiz centre;font: bold on, color-index red")
-            green = xlwt.easyxf(
-                "align: vert centre, horiz centre;font: bold on, color-index green")
-            magenta_ega = xlwt.easyxf(
-                "align: vert centre, horiz centre;font: bold on, color-index magenta_ega")
-            gold = xlwt.easyxf(
-                "align: vert centre, horiz centre;font: bold on, color-index gold")
-            violet = xlwt.easyxf(
-                "align: vert centre, horiz centre;font: bold on, color-index violet")
-            blue_gray = xlwt.easyxf(
-                "align: vert centre, horiz centre;font: bold on, color-index blue_gray")
-            # Style
-            sheet_style = xlwt.easyxf("align: vert centre, horiz centre")
-            sheet_style_amount = xlwt.easyxf("align: vert centre, horiz right")
-            heading = xlwt.easyxf(
-                "align: vert centre, horiz centre;font: bold on,height 200")
-            main_heading = xlwt.easyxf(
-                "align: vert centre, horiz centre;font: bold on,height 320")
-
-            # Sheet
-            xlwt.add_palette_colour("warning", 0x21)
-            workbook.set_colour_RGB(0x21, 75, 211, 152)
-            sheet1 = workbook.add_sheet(
-                'Landlord wise Contracts', cell_overwrite_ok=True)
-            sheet2 = workbook.add_sheet(
-                'Paid Contracts', cell_overwrite_ok=True)
-            sheet3 = workbook.add_sheet(
-                'Not Paid Contracts', cell_overwrite_ok=True)
-            sheet4 = workbook.add_sheet(
-                'Partial Paid Contracts', cell_overwrite_ok=True)
-            sheet5 = workbook.add_sheet(
-                'Contract Bills', cell_overwrite_ok=True)
-            date_format = xlwt.XFStyle()
-            date_format.num_format_str = 'mm/dd/yyyy'
-
-            # SHEET1
-            sheet1.write_merge(0, 1, 0, 8, name, main_heading)
-            sheet1.col(0).width = 2800
-            sheet1.col(1).width = 3500
-            sheet1.col(2).width = 7000
-            sheet1.col(3).width = 7000
-            sheet1.col(4).width = 6000
-            sheet1.col(5).width = 5500
-            sheet1.col(6).width = 3000
-            sheet1.col(7).width = 5500
-            sheet1.col(8).width = 5500
-            sheet1.row(2).height = 500
-            sheet1.write(2, 0, 'Date', heading)
-            sheet1.write(2, 1, 'Contract Ref.', heading)
-            sheet1.write(2, 2, 'Tenant', heading)
-            sheet1.write(2, 3, 'Property', heading)
-            sheet1.write(2, 4, 'Invoice Ref.', heading)
-            sheet1.write(2, 5, 'Payment Term', heading)
-            sheet1.write(2, 6, 'Amount', heading)
-            sheet1.write(2, 7, 'Payment Status', heading)
-            sheet1.write(2, 8, 'Contract Status', heading)
-            c = 3
-            rent_invoice = self.env['rent.invoice'].search(
-                [('landlord_id', '=', self.landlord_id.id)])
-            for data in rent_invoice:
-                amount = str(data.rent_invoice_id.amount_total) + \
-                    " " + str(data.currency_id.symbol)
-                status = ""
-                stage = ""
-                if data.payment_state == "paid":
-                    status = "Paid"
-                    style0 = green
-                elif data.payment_state == "not_paid":
-                    status = "Not Paid"
-                    style0 = red
-                elif data.payment_state == "reversed":
-                    status = "Reversed"
-                    style0 = magenta_ega
-                elif data.payment_state == "partial":
-                    status = "Partial Paid"
-                    style0 = blue_gray
-                elif data.payment_state == "in_payment":
-                    status = "In Payment"
-                    style0 = violet
-                else:
-                    status = "Invoicing App Legacy"
-                    style0 = gold
-
-                if data.tenancy_id.contract_type == "new_contract":
-                    stage = "Draft"
-                elif data.tenancy_id.contract_type == "running_contract":
-                    stage = "Running"
-                elif data.tenancy_id.contract_type == "cancel_contract":
-                    stage = "Cancel"
-                elif data.tenancy_id.contract_type == "close_contract":
-                    stage = "Close"
-                else:
-                    stage = "Expire"
-                if data.tenancy_id.payment_term == "monthly":
-                    payment_term = "Monthly"
-                elif data.tenancy_id.payment_term == "full_payment":
-                    payment_term = "Full Payment"
-                else:
-                    payment_term = "Quarterly"
-                sheet1.write(c, 0, data.invoice_date, date_format)
-                sheet1.write(c, 1, data.tenancy_id.tenancy_seq, sheet_style)
-                sheet1.write(
-                    c, 2, data.tenancy_id.tenancy_id.name, sheet_style)
-                sheet1.write(
-                    c, 3, data.tenancy_id.property_id.name, sheet_style)
-                sheet1.write(c, 4, data.rent_invoice_id.name, sheet_style)
-                sheet1.write(c, 5, payment_term, sheet_style)
-                sheet1.write(c, 6, amount, sheet_style_amount)
-                sheet1.write(c, 7, status, style0)
-                sheet1.write(c, 8, stage, sheet_style)
-                c += 1
-
-            # Sheet 2
-            sheet2.write_merge(0, 1, 0, 7, sheet2_name, main_heading)
-            sheet2.col(0).width = 2800
-            sheet2.col(1).width = 3500
-            sheet2.col(2).width = 7000
-            sheet2.col(3).width = 7000
-            sheet2.col(4).width = 6000
-            sheet2.col(5).width = 3000
-            sheet2.col(6).width = 5500
-            sheet2.col(7).width = 5500
-            sheet2.row(2).height = 500
-            sheet2.write(2, 0, 'Date', heading)
-            sheet2.write(2, 1, 'Contract Ref.', heading)
-            sheet2.write(2, 2, 'Tenant', heading)
-            sheet2.write(2, 3, 'Property', heading)
-            sheet2.write(2, 4, 'Invoice Ref.', heading)
-            sheet2.write(2, 5, 'Amount', heading)
-            sheet2.write(2, 6, 'Payment Status', heading)
-            sheet2.write(2, 7, 'Contract Status', heading)
-            c = 3
-            rent_invoice = self.env['rent.invoice'].search(
-                [('landlord_id', '=', self.landlord_id.id), ('payment_state', '=', 'paid')])
-            for data in rent_invoice:
-                amount = str(data.rent_invoice_id.amount_total) + \
-                    " " + str(data.currency_id.symbol)
-                status = ""
-                stage = ""
-                if data.payment_state == "paid":
-                    status = "Paid"
-                    style0 = green
-                elif data.payment_state == "not_paid":
-                    status = "Not Paid"
-                    style0 = red
-                elif data.payment_state == "reversed":
-                    status = "Reversed"
-                    style0 = magenta_ega
-                elif data.payment_state == "partial":
-                    status = "Partial Paid"
-                    style0 = blue_gray
-                elif data.payment_state == "in_payment":
-                    status = "In Payment"
-                    style0 = violet
-                else:
-                    status = "Invoicing App Legacy"
-                    style0 = gold
-                if data.tenancy_id.contract_type == "new_contract":
-                    stage = "Draft"
-                elif data.tenancy_id.contract_type == "running_contract":
-                    stage = "Running"
-                elif data.tenancy_id.contract_type == "cancel_contract":
-                    stage = "Cancel"
-                elif data.tenancy_id.contract_type == "close_contract":
-                    stage = "Close"
-                else:
-                    stage = "Expire"
-
-                sheet2.write(c, 0, data.invoice_date, date_format)
-                sheet2.write(c, 1, data.tenancy_id.tenancy_seq, sheet_style)
-                sheet2.write(
-                    c, 2, data.tenancy_id.tenancy_id.name, sheet_style)
-                sheet2.write(
-                    c, 3, data.tenancy_id.property_id.name, sheet_style)
-                sheet2.write(c, 4, data.rent_invoice_id.name, sheet_style)
-                sheet2.write(c, 5, amount, sheet_style_amount)
-                sheet2.write(c, 6, status, style0)
-                sheet2.write(c, 7, stage, sheet_style)
-                c += 1
-
-            # Sheet 3
-            sheet3.write_merge(0, 1, 0, 7, sheet3_name, main_heading)
-            sheet3.col(0).width = 2800
-            sheet3.col(1).width = 3500
-            sheet3.col(2).width = 7000
-            sheet3.col(3).width = 7000
-            sheet3.col(4).width = 6000
-            sheet3.col(5).width = 3000
-            sheet3.col(6).width = 5500
-            sheet3.col(7).width = 5500
-            sheet3.row(2).height = 500
-            sheet3.write(2, 0, 'Date', heading)
-            sheet3.write(2, 1, 'Contract Ref.', heading)
-            sheet3.write(2, 2, 'Tenant', heading)
-            sheet3.write(2, 3, 'Property', heading)
-            sheet3.write(2, 4, 'Invoice Ref.', heading)
-            sheet3.write(2, 5, 'Amount', heading)
-            sheet3.write(2, 6, 'Payment Status', heading)
-            sheet3.write(2, 7, 'Contract Status', heading)
-            c = 3
-            rent_invoice = self.env['rent.invoice'].search(
-                [('landlord_id', '=', self.landlord_id.id), ('payment_state', '=', 'not_paid')])
-            for data in rent_invoice:
-                amount = str(data.rent_invoice_id.amount_total) + \
-                    " " + str(data.currency_id.symbol)
-                status = ""
-                stage = ""
-                if data.payment_state == "paid":
-                    status = "Paid"
-                    style0 = green
-                elif data.payment_state == "not_paid":
-                    status = "Not Paid"
-                    style0 = red
-                elif data.payment_state == "reversed":
-                    status = "Reversed"
-                    style0 = magenta_ega
-                elif data.payment_state == "partial":
-                    status = "Partial Paid"
-                    style0 = blue_gray
-                elif data.payment_state == "in_payment":
-                    status = "In Payment"
-                    style0 = violet
-                else:
-                    status = "Invoicing App Legacy"
-                    style0 = gold
-                if data.tenancy_id.contract_type == "new_contract":
-                    stage = "Draft"
-                elif data.tenancy_id.contract_type == "running_contract":
-                    stage = "Running"
-                elif data.tenancy_id.contract_type == "cancel_contract":
-                    stage = "Cancel"
-                elif data.tenancy_id.contract_type == "close_contract":
-                    stage = "Close"
-                else:
-                    stage = "Expire"
-
-                sheet3.write(c, 0, data.invoice_date, date_format)
-                sheet3.write(c, 1, data.tenancy_id.tenancy_seq, sheet_style)
-                sheet3.write(
-                    c, 2, data.tenancy_id.tenancy_id.name, sheet_style)
-                sheet3.write(
-                    c, 3, data.tenancy_id.property_id.name, sheet_style)
-                sheet3.write(c, 4, data.rent_invoice_id.name, sheet_style)
-                sheet3.write(c, 5, amount, sheet_style_amount)
-                sheet3.write(c, 6, status, style0)
-                sheet3.write(c, 7, stage, sheet_style)
-                c += 1
-
-            # Sheet 4
-            sheet4.write_merge(0, 1, 0, 7, sheet4_name, main_heading)
-            sheet4.col(0).width = 2800
-            sheet4.col(1).width = 3500
-            sheet4.col(2).width = 7000
-            sheet4.col(3).width = 7000
-            sheet4.col(4).width = 6000
-            sheet4.col(5).width = 3000
-            sheet4.col(6).width = 5500
-            sheet4.col(7).width = 5500
-            sheet4.row(2).height = 500
-            sheet4.write(2, 0, 'Date', heading)
-            sheet4.write(2, 1, 'Contract Ref..', heading)
-            sheet4.write(2, 2, 'Tenant', heading)
-            sheet4.write(2, 3, 'Property', heading)
-            sheet4.write(2, 4, 'Invoice Ref.', heading)
-            sheet4.write(2, 5, 'Amount', heading)
-            sheet4.write(2, 6, 'Payment Status', heading)
-            sheet4.write(2, 7, 'Contract Status', heading)
-            c = 3
-            rent_invoice = self.env['rent.invoice'].search(
-                [('landlord_id', '=', self.landlord_id.id), ('payment_state', '=', 'partial')])
-            for data in rent_invoice:
-                amount = str(data.rent_invoice_id.amount_total) + \
-                    " " + str(data.currency_id.symbol)
-                status = ""
-                stage = ""
-                if data.payment_state == "paid":
-                    status = "Paid"
-                    style0 = green
-                elif data.payment_state == "not_paid":
-                    status = "Not Paid"
-                    style0 = red
-                elif data.payment_state == "reversed":
-                    status = "Reversed"
-                    style0 = magenta_ega
-                elif data.payment_state == "partial":
-                    status = "Partial Paid"
-                    style0 = blue_gray
-                elif data.payment_state == "in_payment":
-                    status = "In Payment"
-                    style0 = violet
-                else:
-                    status = "Invoicing App Legacy"
-                    style0 = gold
-                if data.tenancy_id.contract_type == "new_contract":
-                    stage = "Draft"
-                elif data.tenancy_id.contract_type == "running_contract":
-                    stage = "Running"
-                elif data.tenancy_id.contract_type == "cancel_contract":
-                    stage = "Cancel"
-                elif data.tenancy_id.contract_type == "close_contract":
-                    stage = "Close"
-                else:
-                    stage = "Expire"
-
-                sheet4.write(c, 0, data.invoice_date, date_format)
-                sheet4.write(c, 1, data.tenancy_id.tenancy_seq, sheet_style)
-                sheet4.write(
-                    c, 2, data.tenancy_id.tenancy_id.name, sheet_style)
-                sheet4.write(
-                    c, 3, data.tenancy_id.property_id.name, sheet_style)
-                sheet4.write(c, 4, data.rent_invoice_id.name, sheet_style)
-                sheet4.write(c, 5, amount, sheet_style_amount)
-                sheet4.write(c, 6, status, style0)
-                sheet4.write(c, 7, stage, sheet_style)
-                c += 1
-
-            # sheet 5
-            sheet1.write_merge(0, 1, 0, 8, sheet5_name, main_heading)
-            sheet1.col(0).width = 2800
-            sheet1.col(1).width = 3500
-            sheet1.col(2).width = 7000
-            sheet1.col(3).width = 7000
-            sheet1.col(4).width = 6000
-            sheet1.col(5).width = 5500
-            sheet1.col(6).width = 3000
-            sheet1.col(7).width = 5500
-            sheet1.col(8).width = 5500
-            sheet1.row(2).height = 500
-            sheet1.write(2, 0, 'Date', heading)
-            sheet1.write(2, 1, 'Contract Ref.', heading)
-            sheet1.write(2, 2, 'Tenant', heading)
-            sheet1.write(2, 3, 'Property', heading)
-            sheet1.write(2, 4, 'Bill Ref.', heading)
-            sheet1.write(2, 5, 'Payment Term', heading)
-            sheet1.write(2, 6, 'Amount', heading)
-            sheet1.write(2, 7, 'Payment Status', heading)
-            sheet1.write(2, 8, 'Contract Status', heading)
-            c = 3
-            rent_bill = self.env['rent.bill'].search(
-                [('vendor_id', '=', self.landlord_id.id)])
-            for data in rent_bill:
-                amount = str(data.rent_bill_id.amount_total) + \
-                         " " + str(data.currency_id.symbol)
-                status = ""
-                stage = ""
-                if data.payment_state == "paid":
-                    status = "Paid"
-                    style0 = green
-                elif data.payment_state == "not_paid":
-                    status = "Not Paid"
-                    style0 = red
-                elif data.payment_state == "reversed":
-                    status = "Reversed"
-                    style0 = magenta_ega
-                elif data.payment_state == "partial":
-                    status = "Partial Paid"
-                    style0 = blue_gray
-                elif data.payment_state == "in_payment":
-                    status = "In Payment"
-                    style0 = violet
-                else:
-                    status = "Invoicing App Legacy"
-                    style0 = gold
-
-                if data.tenancy_id.contract_type == "new_contract":
-                    stage = "Draft"
-                elif data.tenancy_id.contract_type == "running_contract":
-                    stage = "Running"
-                elif data.tenancy_id.contract_type == "cancel_contract":
-                    stage = "Cancel"
-                elif data.tenancy_id.contract_type == "close_contract":
-                    stage = "Close"
-                else:
-                    stage = "Expire"
-                if data.tenancy_id.payment_term == "monthly":
-                    payment_term = "Monthly"
-                elif data.tenancy_id.payment_term == "full_payment":
-                    payment_term = "Full Payment"
-                else:
-                    payment_term = "Quarterly"
-                sheet1.write(c, 0, data.invoice_date, date_format)
-                sheet1.write(c, 1, data.tenancy_id.tenancy_seq, sheet_style)
-                sheet1.write(
-                    c, 2, data.tenancy_id.tenancy_id.name, sheet_style)
-                sheet1.write(
-                    c, 3, data.tenancy_id.property_id.name, sheet_style)
-                sheet1.write(c, 4, data.rent_bill_id.name, sheet_style)
-                sheet1.write(c, 5, payment_term, sheet_style)
-                sheet1.write(c, 6, amount, sheet_style_amount)
-                sheet1.write(c, 7, status, style0)
-                sheet1.write(c, 8, stage, sheet_style)
-                c += 1
-
-            stream = BytesIO()
-            workbook.save(stream)
-            out = base64.encodebytes(stream.getvalue())
-            attachment = self.env['ir.attachment'].sudo()
-            filename = self.landlord_id.name + ".xls"
-            attachment_id = attachment.create(
-                {'name': filename,
-                 'type': 'binary',
-                 'public': False,
-                 'datas': out})
-            if attachment_id:
-                report = {
-                    'type': 'ir.actions.act_url',
-                    'url': '/web/content/%s?download=true' % (attachment_id.id),
-                    'target': 'self',
-                    'nodestroy': False,
-                }
-                return report
-        elif self.report_for == "sold":
-            name = "Sold Information - " + self.landlord_id.name
-            workbook = xlwt.Workbook(encoding='utf-8')
-            # Font Color
-            red = xlwt.easyxf(
-                "align: vert centre, horiz centre;font: bold on, color-index red")
-            green = xlwt.easyxf(
-                "align: vert centre, horiz centre;font: bold on, color-index green")
-            magenta_ega = xlwt.easyxf(
-                "align: vert centre, horiz centre;font: bold on, color-index magenta_ega")
-            gold = xlwt.easyxf(
-                "align: vert centre, horiz centre;font: bold on, color-index gold")
-            violet = xlwt.easyxf(
-                "align: vert centre, horiz centre;font: bold on, color-index violet")
-            blue_gray = xlwt.easyxf(
-                "align: vert centre, horiz centre;font: bold on, color-index blue_gray")
-            sheet_style = xlwt.easyxf("align: vert centre, horiz centre")
-            heading = xlwt.easyxf(
-                "align: vert centre, horiz centre;font: bold on,height 200")
-            main_heading = xlwt.easyxf(
-                "align: vert centre, horiz centre;font: bold on,height 320")
-            sheet_style_amount = xlwt.easyxf("align: vert centre, horiz right")
-            sheet1 = workbook.add_sheet(
-                'Landlord wise Sold Information', cell_overwrite_ok=True)
-            date_format = xlwt.XFStyle()
-            date_format.num_format_str = 'mm/dd/yyyy'
-            sheet1.write_merge(0, 1, 0, 7, name, main_heading)
-            sheet1.col(0).width = 2800
-            sheet1.col(1).width = 3000
-            sheet1.col(2).width = 7000
-            sheet1.col(3).width = 7000
-            sheet1.col(4).width = 3000
-            sheet1.col(5).width = 5500
-            sheet1.col(6).width = 5500
-            sheet1.col(7).width = 3000
-            sheet1.row(2).height = 500
-            sheet1.write(2, 0, 'Date', heading)
-            sheet1.write(2, 1, 'Sequence', heading)
-            sheet1.write(2, 2, 'Customer', heading)
-            sheet1.write(2, 3, 'Property', heading)
-            sheet1.write(2, 4, 'Sale Price', heading)
-            sheet1.write(2, 5, 'Invoice Reference', heading)
-            sheet1.write(2, 6, 'Payment Status', heading)
-            sheet1.write(2, 7, 'Sold Status', heading)
-            c = 3
-            property_sold = self.env['property.vendor'].search(
-                [('landlord_id', '=', self.landlord_id.id)])
-            for data in property_sold:
-                amount = str(data.total_sell_amount) + " " + \
-                    str(data.currency_id.symbol)
-                if data.sold_invoice_payment_state == "paid":
-                    status = "Paid"
-                    style0 = green
-                elif data.sold_invoice_payment_state == "not_paid":
-                    status = "Not Paid"
-                    style0 = red
-                elif data.sold_invoice_payment_state == "reversed":
-                    status = "Reversed"
-                    style0 = magenta_ega
-                elif data.sold_invoice_payment_state == "partial":
-                    status = "Partial Paid"
-                    style0 = blue_gray
-                elif data.sold_invoice_payment_state == "in_payment":
-                    status = "In Payment"
-                    style0 = violet
-                else:
-                    status = "Invoicing App Legacy"
-                    style0 = gold
-
-                if data.stage == "booked":
-                    stage = "Booked"
-                elif data.stage == "refund":
-                    stage = "Refund"
-                else:
-                    stage = "Sold"
-
-                sheet1.col(c).width = 7000
-                sheet1.write(c, 0, data.date, date_format)
-                sheet1.write(c, 1, data.sold_seq, sheet_style)
-                sheet1.write(c, 2, data.customer_id.name, sheet_style)
-                sheet1.write(c, 3, data.property_id.name, sheet_style)
-                sheet1.write(c, 4, amount, sheet_style_amount)
-                sheet1.write(c, 5, data.sold_invoice_id.name, sheet_style)
-                sheet1.write(c, 6, status, style0)
-                sheet1.write(c, 7, stage, sheet_style)
-                c += 1
-
-            stream = BytesIO()
-            workbook.save(stream)
-            out = base64.encodebytes(stream.getvalue())
 
-            attachment = self.env['ir.attachment'].sudo()
-            filename = self.landlord_id.name + ".xls"
-            attachment_id = attachment.create(
-                {'name': filename,
-                 'type': 'binary',
-                 'public': False,
-                 'datas': out})
-            if attachment_id:
-                report = {
-                    'type': 'ir.actions.act_url',
-                    'url': '/web/content/%s?download=true' % (attachment_id.id),
-                    'target': 'self',
-                    'nodestroy': False,
-                }
-                return report
+        sheet.set_row(row, 20)
+        sheet.write_string(row, 6, "Totals", formats['sub_title'])
+        for col, field_name in enumerate(amount_fields, 7):
+            sheet.write_number(row, col, totals[field_name],
+                               formats['total_due' if field_name == 'remaining_amount' else 'total'])
@@ -0,0 +1,61 @@
+# -*- coding: utf-8 -*-
+# Copyright 2020-Today TechKhedut.
+# Part of TechKhedut. See LICENSE file for full copyright and licensing details.
+from odoo import api, fields, models, _
+from odoo.exceptions import UserError
+
+
+class PropertyScheduleWizard(models.TransientModel):
+    _name = "property.schedule.wizard"
+    _description = "Apply Payment Schedule to Properties"
+
+    payment_schedule_id = fields.Many2one("payment.schedule", string="Payment Schedule",
+                                          required=True, domain=[('active', '=', True)])
+    schedule_type = fields.Selection(related="payment_schedule_id.schedule_type")
+    property_ids = fields.Many2many("property.details", string="Properties")
+    update_contracts = fields.Boolean(string="Apply to Draft Contracts",
+                                      help="Also use the schedule on the draft contracts of the properties")
+    generate_installments = fields.Boolean(string="Generate Rent Installments",
+                                           help="Generate the rent invoices of the updated draft rent contracts")
+
+    @api.model
+    def default_get(self, fields_list):
+        res = super().default_get(fields_list)
+        if self._context.get("active_model") == "property.details":
+            res["property_ids"] = [(6, 0, self._context.get("active_ids", []))]
+        return res
+
+    def action_apply_schedule(self):
+        """Set the schedule on all the selected properties (and their draft
+        contracts) with one write per model"""
+        if not self.property_ids:
+            raise UserError(_("Please select the properties to update."))
+        schedule = self.payment_schedule_id
+        contracts = self.env["property.vendor"]
+        if schedule.schedule_type == "sale":
+            self.property_ids.write({"is_payment_plan": True, "payment_schedule_id": schedule.id})
+            if self.update_contracts:
+                contracts = self.env["property.vendor"].search(
+                    [("property_id", "in", self.property_ids.ids), ("stage", "=", "draft")])
+                contracts.write({"use_schedule": True, "payment_schedule_id": schedule.id})
+        else:
+            self.property_ids.write({"is_payment_plan": True, "rental_payment_schedule_id": schedule.id})
+            if self.update_contracts:
+                contracts = self.env["tenancy.details"].search(
+                    [("property_id", "in", self.property_ids.ids), ("contract_type", "=", "new_contract")])
+                contracts.write({"use_schedule": True, "schedule_from_property": True,
+                                 "payment_schedule_id": schedule.id})
+                if self.generate_installments and contracts:
+                    contracts.action_generate_rent_from_schedule()
+        return {
+            "type": "ir.actions.client",
+            "tag": "display_notification",
+            "params": {
+                "title": _("Payment Schedule Applied"),
+                "message": _("Payment schedule \"%s\" applied to %s properties and %s draft contracts.") % (
+                    schedule.name, len(self.property_ids), len(contracts)),
+                "type": "success",
+                "sticky": False,
+                "next": {"type": "ir.actions.act_window_close"},
+            }
+        }
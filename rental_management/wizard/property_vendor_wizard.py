@@ -410,10 +410,12 @@ class PropertySold(models.TransientModel):
             })
             self.customer_id.broker_invoice_id = partner_invoice_id.id
         
+        invoice_vals_list = []
+
         # 1. Generate DLD Fee Invoice
         if self.include_dld_fee and self.dld_fee_amount > 0:
             dld_due_date = contract_start_date + relativedelta(days=self.dld_due_days)
-            self.env['sale.invoice'].create({
+            invoice_vals_list.append({
                 'property_sold_id': self.customer_id.id,
                 'name': _('DLD Fee - Dubai Land Department'),
                 'amount': self.dld_fee_amount,
@@ -432,7 +434,7 @@ class PropertySold(models.TransientModel):
         # 2. Generate Admin Fee Invoice
         if self.include_admin_fee and self.admin_fee_amount > 0:
             admin_due_date = contract_start_date + relativedelta(days=self.admin_due_days)
-            self.env['sale.invoice'].create({
+            invoice_vals_list.append({
                 'property_sold_id': self.customer_id.id,
                 'name': _('Admin Fee - Administrative Processing'),
                 'amount': self.admin_fee_amount,
@@ -450,45 +452,10 @@ class PropertySold(models.TransientModel):
         booking_amount = abs(self.customer_id.book_price) if self.customer_id.book_price else 0
         remaining_amount = property_base_price - booking_amount
         
-        for line in self.payment_schedule_id.schedule_line_ids.sorted('days_after'):
-            # Calculate amount for this line based on remaining amount
-            line_amount = (remaining_amount * line.percentage) / 100
-            
-            # Calculate frequency in days
-            frequency_days = {
-                'one_time': 0,
-                'monthly': 30,
-                'quarterly': 90,
-                'bi_annual': 180,
-                'annual': 365
-            }.get(line.installment_frequency, 0)
-            
-            # Generate invoices based on number of installments
-            num_installments = max(line.number_of_installments, 1)
-            amount_per_invoice = round(line_amount / num_installments, 2)
-            
-            for installment_num in range(num_installments):
-                # Calculate invoice date
-                days_offset = line.days_after + (installment_num * frequency_days)
-                invoice_date = contract_start_date + relativedelta(days=days_offset)
-                
-                # Create invoice line
-                invoice_name = line.name
-                if line.number_of_installments > 1:
-                    invoice_name = f"{line.name} ({installment_num + 1}/{line.number_of_installments})"
-                
-                self.env['sale.invoice'].create({
-                    'property_sold_id': self.customer_id.id,
-                    'name': invoice_name,
-                    'amount': amount_per_invoice,
-                    'invoice_date': invoice_date,
-                    'invoice_created': False,
-                    'invoice_type': 'installment',
-                    'sequence': sequence,
-                    'desc': line.note or '',
-                    'tax_ids': [(6, 0, self.taxes_ids.ids)] if self.is_taxes else False
-                })
-                sequence += 1
+        invoice_vals_list += self.customer_id._prepare_schedule_installments(
+            self.payment_schedule_id, contract_start_date, remaining_amount, sequence,
+            self.taxes_ids if self.is_taxes else False)
+        self.env['sale.invoice'].create(invoice_vals_list)
         
         return {
             'type': 'ir.actions.client',
@@ -496,7 +463,7 @@ class PropertySold(models.TransientModel):
             'params': {
                 'type': 'success',
                 'message': _('Payment schedule generated successfully with %s invoices based on template: %s') % (
-                    sequence - 1, 
+                    len(invoice_vals_list),
                     self.payment_schedule_id.name
                 ),
                 'sticky': False,